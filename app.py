@@ -1,17 +1,39 @@
 import warnings
 warnings.filterwarnings("ignore")
 
-import streamlit as st
-import pandas as pd
-import numpy as np
-import joblib
-import pickle
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
-import plotly.graph_objects as go
-import shap
+from attrition import metrics, timing
+from attrition.timing import timed_import
+
+st = timed_import("streamlit")
+pd = timed_import("pandas")
+np = timed_import("numpy")
+import hashlib
 import io
+import json
+import os
+import tempfile
+import time
+import uuid
+
+# plotly, matplotlib and shap are imported where the charts and SHAP panel
+# render, so they are not paid for on cold start.
+from attrition.artifacts import artifact_hash, open_artifacts, training_report
+from attrition.columnar import EXPORT_FORMATS, TableWriter, convert_table, read_column, read_rows, sort_order
+from attrition.drift import bin_labels, compare, load_reference, reference_path
+from attrition.drift import report as drift_report
+from attrition.evaluation import DEFAULT_BOOT, bootstrap, calibration, confusion, group_metrics, overall
+from attrition.evaluation import report as evaluation_report
+from attrition.executor import DONE, RUNNING, InferenceExecutor, JobCancelled
+from attrition.explain import DEFAULT_TOP_K, build_explainer
+from attrition.global_shap import DEFAULT_SAMPLE, ShapSummary, stratified_sample
+from attrition.prediction_cache import PredictionCache
+from attrition.score_store import ID_COLUMNS, DuplicateKeysError, ScoreStore, store_path
+from attrition.scoring import (
+    DEFAULT_THRESHOLDS, HISTORY_COLUMNS, RISK_LABELS, SALARY_MAP, MissingColumnsError, Thresholds, apply_thresholds,
+    input_columns, model_input, read_chunks, result_columns, score, score_stream,
+)
+from attrition.segments import DIMENSIONS, build_segments
+from attrition.whatif import cheapest_interventions, scenario_table
 
 # ════════════════════════════════════════════
 # PAGE CONFIG
@@ -156,33 +178,131 @@ div[data-testid="stDataFrame"] { border: 1px solid #e2e8f0; border-radius: 8px;
 # LOAD MODELS
 # ════════════════════════════════════════════
 @st.cache_resource
-def load_all():
-    def _load(path):
-        try:
-            return joblib.load(path)
-        except Exception:
-            with open(path, "rb") as f:
-                return pickle.load(f)
-    return (
-        _load("xgb_attrition_model.pkl"),
-        _load("scaler.pkl"),
-        _load("encoder.pkl"),
-        _load("feature_importances.pkl"),
-        _load("final_columns.pkl"),
-    )
+def load_all(model_hash):
+    # Keyed on the model file's hash so a replaced artifact is reloaded.
+    # With the model bundle this maps the compiled forest and scaler arrays
+    # only; the XGBoost boosters (and the scikit-learn import they pull in)
+    # load on first batch scoring or SHAP request.
+    with metrics.stage("app", "load_all"):
+        return open_artifacts()
+
+def load_scoring_model():
+    # The booster batch scoring and SHAP run on; the first call loads it.
+    with timing.timed("artifact", "booster"):
+        return artifacts.scoring_model
+
+@st.cache_resource
+def load_explainer(_model):
+    with timing.timed("artifact", "shap_explainer"):
+        return build_explainer(_model)
+
+@st.cache_resource
+def get_prediction_cache():
+    return PredictionCache()
+
+@st.cache_resource
+def get_executor():
+    # One worker pool for every session: scoring and SHAP run here, not on the script threads.
+    return InferenceExecutor()
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def segment_aggregates(upload_hash, thresholds, model_hash, with_drivers, _result_path):
+    # Keyed on the upload's content hash (plus everything that changes the scores),
+    # so reruns and re-uploads of the same file reuse the aggregates.
+    explainer = load_explainer(load_scoring_model()) if with_drivers else None
+    with metrics.stage("batch", "segments"):
+        return build_segments(_result_path, final_columns, explainer=explainer, scaler=artifacts.input_scaler)
+
+@st.cache_data(show_spinner=False)
+def drift_reference(path, mtime_ns):
+    # Re-read only when the reference file is replaced.
+    return load_reference(path)
+
+model_hash = artifact_hash("model")
+artifacts     = load_all(model_hash)
+final_columns = artifacts.final_columns
+use_fast_path = artifacts.forest is not None and os.environ.get("ATTRITION_FAST_PATH", "1") != "0"
 
-model, scaler, encoder, feature_imp, final_columns = load_all()
-SALARY_MAP = {"low": 0, "medium": 1, "high": 2}
+TOP_N_OPTIONS  = (10, 25, 50, 100)
+PAGE_SIZES     = (25, 50, 100, 250)
+WHATIF_SIZES   = (100, 1_000, 5_000)
+WHATIF_PREVIEW = 100
+SHAP_SAMPLES   = (500, DEFAULT_SAMPLE, 2_000, 5_000)
+BOOT_SAMPLES   = (100, DEFAULT_BOOT, 500, 1_000)
+JOB_POLL       = 0.5   # seconds between progress polls of a background job
+
+session_id = st.session_state.setdefault("session_id", uuid.uuid4().hex)
+
+@st.fragment(run_every=JOB_POLL)
+def job_progress(job, text, key):
+    # Polls a background job without rerunning the page; the whole app reruns once it has finished.
+    if job.done():
+        st.rerun()
+    if job.state == RUNNING:
+        st.progress(job.fraction or 0.0, text=text.format(rows=job.rows_done, seconds=job.seconds))
+    else:
+        st.progress(0.0, text="Menunggu giliran (server sedang memproses permintaan lain)...")
+    if st.button("Batalkan", key=key):
+        job.cancel()
+
+def shap_waterfall(features):
+    # SHAP for one profile needs the booster, the explainer and matplotlib, so Tab 1 calls it only
+    # after the result is on screen. Returns (png bytes, SHAP values, error).
+    try:
+        explainer = load_explainer(load_scoring_model())
+        model_in  = model_input(pd.DataFrame([features], columns=final_columns), artifacts.input_scaler)
+
+        def _explain(job):
+            with metrics.stage("single", "explain"):
+                return explainer(model_in)
+
+        sample_sv  = get_executor().run(session_id, _explain, kind="single")[0]
+        matplotlib = timed_import("matplotlib")
+        matplotlib.use("Agg")
+        plt  = timed_import("matplotlib.pyplot")
+        shap = timed_import("shap")
+        plt.style.use("default")
+        sample_sv.feature_names = final_columns
+        fig_shap, ax = plt.subplots(figsize=(10, 5))
+        fig_shap.patch.set_facecolor("#ffffff")
+        ax.set_facecolor("#ffffff")
+        shap.plots.waterfall(sample_sv, show=False)
+        plt.tight_layout()
+        png_buf = io.BytesIO()
+        fig_shap.savefig(png_buf, format="png", bbox_inches="tight", dpi=150)
+        plt.close(fig_shap)
+        return png_buf.getvalue(), np.asarray(sample_sv.values), None
+    except Exception as e:
+        return None, None, str(e)
+
+# ════════════════════════════════════════════
+# DECISION THRESHOLDS
+# ════════════════════════════════════════════
+with st.sidebar:
+    st.markdown('<div class="section-label">Decision Thresholds</div>', unsafe_allow_html=True)
+    decision_thr = st.slider("Resign Label Threshold", 0.05, 0.95, DEFAULT_THRESHOLDS.decision, step=0.01)
+    moderate_thr, critical_thr = st.slider(
+        "Risk Bands (Moderate · Critical)", 0.0, 1.0,
+        (DEFAULT_THRESHOLDS.moderate, DEFAULT_THRESHOLDS.critical), step=0.01,
+    )
+thresholds   = Thresholds(decision=decision_thr, moderate=moderate_thr, critical=critical_thr)
+moderate_pct = moderate_thr * 100
+critical_pct = critical_thr * 100
 
 # ════════════════════════════════════════════
 # NAV BAR
 # ════════════════════════════════════════════
-st.markdown("""
+# Angka badge diambil dari laporan `python -m attrition.train` bila ada;
+# tanpa laporan dipakai hasil notebook asli.
+training  = training_report()
+model_auc = training["test_roc_auc"] if training else 0.9853
+n_records = training["dataset"]["rows"] if training else 14_999
+st.markdown(f"""
 <div class="nav-bar">
     <div class="nav-logo">⬡ &nbsp;HR Attrition Intelligence</div>
     <div style="display:flex;gap:8px;">
-        <span class="nav-badge">XGBoost · ROC-AUC 0.9853</span>
-        <span class="nav-badge">n=14,999 records</span>
+        <span class="nav-badge">XGBoost · ROC-AUC {model_auc:.4f}</span>
+        <span class="nav-badge">n={n_records:,} records</span>
     </div>
 </div>
 """, unsafe_allow_html=True)
@@ -219,12 +339,11 @@ with tab1:
     promotion_last_5years = 1 if promotion_label == "Yes" else 0
     salary_encoded        = SALARY_MAP[salary]
 
-    input_data = pd.DataFrame([[
+    features = (
         satisfaction_level, last_evaluation, number_project,
         average_montly_hours, time_spend_company, salary_encoded,
-        work_accident, promotion_last_5years
-    ]], columns=final_columns)
-    scaled_input = scaler.transform(input_data)
+        work_accident, promotion_last_5years,
+    )
 
     st.markdown("<br>", unsafe_allow_html=True)
     _, btn_col, _ = st.columns([2, 1, 2])
@@ -232,10 +351,118 @@ with tab1:
         predict_btn = st.button("⟶  Run Prediction", use_container_width=True, key="single_predict")
 
     if predict_btn:
-        prediction  = model.predict(scaled_input)[0]
-        probability = model.predict_proba(scaled_input)[0][1]
-        prob_pct    = probability * 100
-        is_danger   = prediction == 1
+        predict_start = time.perf_counter()
+        pred_cache = get_prediction_cache()
+        pred_cache.bind_model(model_hash)
+        entry = pred_cache.get(features, thresholds)
+        metrics.count("single", "predictions")
+        metrics.count("single", "cache_hits" if entry is not None else "cache_misses")
+
+        # ── Compute (skipped on a cache hit) ──
+        if entry is None:
+            go = timed_import("plotly.graph_objects")
+            input_data = pd.DataFrame([features], columns=final_columns)
+            predictor  = artifacts.forest if use_fast_path else load_scoring_model()
+
+            def _predict_single(job):
+                # Runs on the shared executor as an interactive job, ahead of queued batch work.
+                with metrics.stage("single", "scale"):
+                    model_in = model_input(input_data, artifacts.input_scaler)
+                with metrics.stage("single", "predict"):
+                    probas, labels, risks = score(predictor, model_in, thresholds)
+                with metrics.stage("single", "whatif"):
+                    scenarios = scenario_table(features, predictor, artifacts.input_scaler, final_columns,
+                                               target=thresholds.moderate)
+                return probas, labels, risks, scenarios
+
+            probas, labels, risks, scenarios = get_executor().run(session_id, _predict_single, kind="single")
+            prob_pct   = probas[0] * 100
+            is_danger  = bool(labels[0] == 1)
+
+            accent    = "#f97316" if is_danger else "#10b981"
+            step_low  = "#dcfce7"
+            step_mid  = "#fef9c3"
+            step_high = "#fee2e2"
+            fig_gauge = go.Figure(go.Indicator(
+                mode="gauge+number", value=prob_pct,
+                number={"suffix": "%", "font": {"size": 42, "color": accent, "family": "DM Mono"}},
+                title={"text": "Attrition Probability", "font": {"size": 13, "color": "#000000", "family": "DM Mono"}},
+                gauge={
+                    "axis": {"range": [0, 100], "tickcolor": "#e2e8f0", "tickfont": {"color": "#000000", "size": 10}},
+                    "bar":  {"color": accent, "thickness": 0.25},
+                    "bgcolor": "#ffffff", "bordercolor": "#e2e8f0",
+                    "steps": [
+                        {"range": [0, moderate_pct],            "color": step_low},
+                        {"range": [moderate_pct, critical_pct], "color": step_mid},
+                        {"range": [critical_pct, 100],          "color": step_high},
+                    ],
+                    "threshold": {"line": {"color": "#000000", "width": 2}, "thickness": 0.8, "value": critical_pct}
+                }
+            ))
+            fig_gauge.update_layout(
+                paper_bgcolor="#ffffff", plot_bgcolor="#ffffff",
+                height=280, margin=dict(t=40, b=10, l=20, r=20), font_color="#000000"
+            )
+
+            radar_labels = ["Satisfaction", "Evaluation", "Projects", "Hours", "Tenure"]
+            radar_vals   = [satisfaction_level, last_evaluation, number_project/10, average_montly_hours/350, time_spend_company/20]
+            radar_closed = radar_vals + [radar_vals[0]]
+            label_closed = radar_labels + [radar_labels[0]]
+            fill_color   = "rgba(249,115,22,0.12)" if is_danger else "rgba(16,185,129,0.12)"
+            line_color   = "#f97316" if is_danger else "#10b981"
+
+            fig_radar = go.Figure()
+            fig_radar.add_trace(go.Scatterpolar(
+                r=radar_closed, theta=label_closed, fill="toself", fillcolor=fill_color,
+                line=dict(color=line_color, width=2), marker=dict(size=5, color=line_color),
+            ))
+            fig_radar.update_layout(
+                paper_bgcolor="#ffffff",
+                polar=dict(
+                    bgcolor="#f8fafc",
+                    radialaxis=dict(visible=True, range=[0,1], tickfont=dict(color="#000000", size=9), gridcolor="#e2e8f0", linecolor="#e2e8f0"),
+                    angularaxis=dict(tickfont=dict(color="#000000", size=11, family="DM Mono"), gridcolor="#e2e8f0", linecolor="#e2e8f0")
+                ),
+                showlegend=False,
+                title=dict(text="Employee Risk Profile", font=dict(size=13, color="#000000", family="DM Mono")),
+                height=280, margin=dict(t=50, b=10, l=40, r=40),
+            )
+
+            imp_series = pd.Series(artifacts.feature_imp, index=final_columns).sort_values(ascending=True)
+            bar_colors = ["#f97316" if v >= imp_series.quantile(0.6) else "#6366f1" if v >= imp_series.quantile(0.3) else "#cbd5e1"
+                          for v in imp_series.values]
+            fig_imp = go.Figure(go.Bar(
+                x=imp_series.values, y=imp_series.index, orientation="h",
+                marker=dict(color=bar_colors, line=dict(width=0)),
+                text=[f"{v:.3f}" for v in imp_series.values],
+                textposition="outside",
+                textfont=dict(family="DM Mono", size=10, color="#000000"),
+            ))
+            fig_imp.update_layout(
+                paper_bgcolor="#ffffff", plot_bgcolor="#ffffff",
+                xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+                yaxis=dict(tickfont=dict(family="DM Mono", size=11, color="#000000"), gridcolor="#f1f5f9"),
+                height=300, margin=dict(t=10, b=10, l=160, r=80), bargap=0.35,
+            )
+
+            entry = {
+                "probability": float(probas[0]),
+                "is_danger"  : is_danger,
+                "risk_level" : str(risks[0]),
+                "figures"    : {"gauge": fig_gauge.to_dict(), "radar": fig_radar.to_dict(), "importance": fig_imp.to_dict()},
+                # SHAP is filled in after the result is on screen (see below).
+                "shap_values": None,
+                "shap_png"   : None,
+                "shap_error" : None,
+                "scenarios"  : scenarios,
+            }
+            pred_cache.put(features, entry, thresholds)
+
+        # ── Render ──
+        render_start = metrics.clock()
+
+        prob_pct    = entry["probability"] * 100
+        is_danger   = entry["is_danger"]
         tone        = "danger" if is_danger else "safe"
 
         st.markdown("<br>", unsafe_allow_html=True)
@@ -271,9 +498,10 @@ with tab1:
                     <div class="result-banner-prob-label">Resign Probability</div>
                 </div>
             </div>""", unsafe_allow_html=True)
+        timing.mark_first_prediction(predict_start)
 
-        risk_level = "CRITICAL" if prob_pct >= 70 else "MODERATE" if prob_pct >= 40 else "LOW"
-        risk_tone  = "danger" if prob_pct >= 70 else "neutral" if prob_pct >= 40 else "safe"
+        risk_level = entry["risk_level"]
+        risk_tone  = {"CRITICAL": "danger", "MODERATE": "neutral", "LOW": "safe"}[risk_level]
         retention  = 100 - prob_pct
 
         st.markdown(f"""
@@ -299,97 +527,42 @@ with tab1:
         c1, c2 = st.columns(2, gap="medium")
 
         with c1:
-            accent    = "#f97316" if is_danger else "#10b981"
-            step_low  = "#dcfce7"
-            step_mid  = "#fef9c3"
-            step_high = "#fee2e2"
-            fig_gauge = go.Figure(go.Indicator(
-                mode="gauge+number", value=prob_pct,
-                number={"suffix": "%", "font": {"size": 42, "color": accent, "family": "DM Mono"}},
-                title={"text": "Attrition Probability", "font": {"size": 13, "color": "#000000", "family": "DM Mono"}},
-                gauge={
-                    "axis": {"range": [0, 100], "tickcolor": "#e2e8f0", "tickfont": {"color": "#000000", "size": 10}},
-                    "bar":  {"color": accent, "thickness": 0.25},
-                    "bgcolor": "#ffffff", "bordercolor": "#e2e8f0",
-                    "steps": [
-                        {"range": [0,  40], "color": step_low},
-                        {"range": [40, 70], "color": step_mid},
-                        {"range": [70,100], "color": step_high},
-                    ],
-                    "threshold": {"line": {"color": "#000000", "width": 2}, "thickness": 0.8, "value": 70}
-                }
-            ))
-            fig_gauge.update_layout(
-                paper_bgcolor="#ffffff", plot_bgcolor="#ffffff",
-                height=280, margin=dict(t=40, b=10, l=20, r=20), font_color="#000000"
-            )
-            st.plotly_chart(fig_gauge, use_container_width=True, config={"displayModeBar": False})
+            st.plotly_chart(entry["figures"]["gauge"], use_container_width=True, config={"displayModeBar": False})
 
         with c2:
-            radar_labels = ["Satisfaction", "Evaluation", "Projects", "Hours", "Tenure"]
-            radar_vals   = [satisfaction_level, last_evaluation, number_project/10, average_montly_hours/350, time_spend_company/20]
-            radar_closed = radar_vals + [radar_vals[0]]
-            label_closed = radar_labels + [radar_labels[0]]
-            fill_color   = "rgba(249,115,22,0.12)" if is_danger else "rgba(16,185,129,0.12)"
-            line_color   = "#f97316" if is_danger else "#10b981"
-
-            fig_radar = go.Figure()
-            fig_radar.add_trace(go.Scatterpolar(
-                r=radar_closed, theta=label_closed, fill="toself", fillcolor=fill_color,
-                line=dict(color=line_color, width=2), marker=dict(size=5, color=line_color),
-            ))
-            fig_radar.update_layout(
-                paper_bgcolor="#ffffff",
-                polar=dict(
-                    bgcolor="#f8fafc",
-                    radialaxis=dict(visible=True, range=[0,1], tickfont=dict(color="#000000", size=9), gridcolor="#e2e8f0", linecolor="#e2e8f0"),
-                    angularaxis=dict(tickfont=dict(color="#000000", size=11, family="DM Mono"), gridcolor="#e2e8f0", linecolor="#e2e8f0")
-                ),
-                showlegend=False,
-                title=dict(text="Employee Risk Profile", font=dict(size=13, color="#000000", family="DM Mono")),
-                height=280, margin=dict(t=50, b=10, l=40, r=40),
-            )
-            st.plotly_chart(fig_radar, use_container_width=True, config={"displayModeBar": False})
+            st.plotly_chart(entry["figures"]["radar"], use_container_width=True, config={"displayModeBar": False})
 
         st.markdown('<div class="section-label">04 &nbsp; Feature Importance</div>', unsafe_allow_html=True)
-        imp_series = pd.Series(feature_imp, index=final_columns).sort_values(ascending=True)
-        bar_colors = ["#f97316" if v >= imp_series.quantile(0.6) else "#6366f1" if v >= imp_series.quantile(0.3) else "#cbd5e1"
-                      for v in imp_series.values]
-        fig_imp = go.Figure(go.Bar(
-            x=imp_series.values, y=imp_series.index, orientation="h",
-            marker=dict(color=bar_colors, line=dict(width=0)),
-            text=[f"{v:.3f}" for v in imp_series.values],
-            textposition="outside",
-            textfont=dict(family="DM Mono", size=10, color="#000000"),
-        ))
-        fig_imp.update_layout(
-            paper_bgcolor="#ffffff", plot_bgcolor="#ffffff",
-            xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
-            yaxis=dict(tickfont=dict(family="DM Mono", size=11, color="#000000"), gridcolor="#f1f5f9"),
-            height=300, margin=dict(t=10, b=10, l=160, r=80), bargap=0.35,
-        )
-        st.plotly_chart(fig_imp, use_container_width=True, config={"displayModeBar": False})
+        st.plotly_chart(entry["figures"]["importance"], use_container_width=True, config={"displayModeBar": False})
 
         st.markdown('<div class="section-label">05 &nbsp; SHAP Explainability</div>', unsafe_allow_html=True)
-        try:
-            plt.style.use("default")
-            explainer   = shap.TreeExplainer(model)
-            shap_values = explainer(scaled_input)
-            sample_sv   = shap_values[0]
-            sample_sv.feature_names = final_columns
-            fig_shap, ax = plt.subplots(figsize=(10, 5))
-            fig_shap.patch.set_facecolor("#ffffff")
-            ax.set_facecolor("#ffffff")
-            shap.plots.waterfall(sample_sv, show=False)
-            plt.tight_layout()
-            st.pyplot(fig_shap, bbox_inches="tight")
-            plt.close(fig_shap)
-        except Exception as e:
-            st.warning(f"SHAP tidak dapat ditampilkan: {e}")
+        shap_slot = st.empty()
+        if entry["shap_png"] is not None:
+            shap_slot.image(entry["shap_png"], use_container_width=True)
+        elif entry["shap_error"] is not None:
+            shap_slot.warning(f"SHAP tidak dapat ditampilkan: {entry['shap_error']}")
+        else:
+            shap_slot.caption("Menghitung SHAP...")
+
+        st.markdown('<div class="section-label">06 &nbsp; Retention Scenarios</div>', unsafe_allow_html=True)
+        scenarios = entry["scenarios"]
+        reaching  = scenarios[scenarios["Reaches Target"]]
+        if entry["probability"] < thresholds.moderate:
+            st.caption(f"Risiko sudah di bawah {moderate_pct:.0f}%; tidak perlu intervensi.")
+        elif reaching.empty:
+            st.warning(f"Tidak ada skenario yang menurunkan risiko di bawah {moderate_pct:.0f}%. "
+                       "Skenario dengan risiko terendah:")
+            reaching = scenarios.sort_values(["Resign Probability (%)", "Cost"])
+        else:
+            best = reaching.iloc[0]
+            st.markdown(f"Intervensi termurah: **{best['Intervention']}** → "
+                        f"**{best['Resign Probability (%)']:.1f}%** (biaya relatif {best['Cost']:g}).")
+        if entry["probability"] >= thresholds.moderate:
+            st.dataframe(reaching.head(10), use_container_width=True, hide_index=True)
 
         if is_danger:
             st.markdown("<br>", unsafe_allow_html=True)
-            st.markdown('<div class="section-label">06 &nbsp; HR Action Recommendations</div>', unsafe_allow_html=True)
+            st.markdown('<div class="section-label">07 &nbsp; HR Action Recommendations</div>', unsafe_allow_html=True)
             st.markdown("""
             <div class="reco-grid">
                 <div class="reco-item"><div class="reco-aspect">Satisfaction</div>
@@ -405,6 +578,77 @@ with tab1:
                 <div class="reco-item"><div class="reco-aspect">Recognition</div>
                     <div class="reco-text">Implement an employee recognition program. Acknowledge contributions publicly.</div></div>
             </div>""", unsafe_allow_html=True)
+        metrics.since("single", "render", render_start)
+
+        # SHAP last: the booster and the explainer are only loaded once everything above is shown.
+        if entry["shap_png"] is None and entry["shap_error"] is None:
+            entry["shap_png"], entry["shap_values"], entry["shap_error"] = shap_waterfall(features)
+            pred_cache.put(features, entry, thresholds)
+            if entry["shap_png"] is not None:
+                shap_slot.image(entry["shap_png"], use_container_width=True)
+            else:
+                shap_slot.warning(f"SHAP tidak dapat ditampilkan: {entry['shap_error']}")
+
+
+# Footer, startup timing and the sidebar panels come before Tab 2: while a batch job is
+# pending Tab 2 ends the script run early with st.stop(). The tabs are containers, so the
+# footer still renders below them.
+# ════════════════════════════════════════════
+# FOOTER
+# ════════════════════════════════════════════
+st.markdown("<br><br>", unsafe_allow_html=True)
+st.markdown(f"""
+<div style="text-align:center;padding:20px 0;border-top:2px solid #e2e8f0;">
+    <span style="font-family:'DM Mono',monospace;font-size:11px;color:#000000;letter-spacing:0.1em;">
+        HR ATTRITION INTELLIGENCE · XGBOOST · ROC-AUC {model_auc:.4f} · BUILT WITH STREAMLIT
+    </span>
+</div>
+""", unsafe_allow_html=True)
+
+timing.mark_first_render()
+with st.sidebar.expander("Startup Timing"):
+    startup = timing.report()
+    if startup["first_render_seconds"] is not None:
+        st.markdown(f"First render: **{startup['first_render_seconds']:.2f}s** after process start")
+    if startup["first_prediction"] is not None:
+        first = startup["first_prediction"]
+        st.markdown(f"First prediction: **{first['seconds'] * 1e3:.0f} ms** after the click "
+                    f"(loaded: {', '.join(first['modules']) or 'no heavy modules'})")
+    st.dataframe(pd.DataFrame(startup["stages"]), use_container_width=True, hide_index=True)
+with st.sidebar.expander("Prediction Cache"):
+    cache_stats = get_prediction_cache().stats()
+    st.markdown(
+        f"Hits **{cache_stats['hits']}** · Misses **{cache_stats['misses']}** · "
+        f"Hit rate **{cache_stats['hit_rate'] * 100:.0f}%**<br>"
+        f"Entries {cache_stats['size']}/{cache_stats['maxsize']} · Evictions {cache_stats['evictions']}",
+        unsafe_allow_html=True,
+    )
+with st.sidebar.expander("Inference Queue"):
+    queue_stats = get_executor().stats()
+    st.markdown(
+        f"Workers **{queue_stats['workers']}** (batch {queue_stats['batch_slots']}) · "
+        f"Running **{queue_stats['running']}** · Queued **{queue_stats['queued']}** · "
+        f"Sessions {queue_stats['sessions']}<br>"
+        f"Done {queue_stats['done']} · Failed {queue_stats['failed']} · Cancelled {queue_stats['cancelled']}",
+        unsafe_allow_html=True,
+    )
+if metrics.enabled():
+    with st.sidebar.expander("Metrics"):
+        snapshot = metrics.registry().snapshot()
+        if snapshot["stages"]:
+            st.dataframe(
+                pd.DataFrame(snapshot["stages"]).drop(columns=["buckets", "sum_seconds"]),
+                use_container_width=True, hide_index=True,
+            )
+        if snapshot["counters"]:
+            st.dataframe(pd.DataFrame(snapshot["counters"]), use_container_width=True, hide_index=True)
+        json_col, prom_col = st.columns(2)
+        json_col.download_button("JSON", metrics.registry().to_json(), file_name="attrition_metrics.json",
+                                 mime="application/json")
+        prom_col.download_button("Prometheus", metrics.registry().to_prometheus(), file_name="attrition_metrics.prom",
+                                 mime="text/plain")
+        if st.button("Reset metrics"):
+            metrics.registry().reset()
 
 
 # ════════════════════════════════════════════
@@ -457,87 +701,203 @@ with tab2:
     )
 
     uploaded_file = st.file_uploader(
-        "Upload file CSV atau Excel",
-        type=["csv", "xlsx", "xls"],
+        "Upload file CSV, Excel, Parquet atau Arrow",
+        type=["csv", "xlsx", "xls", "parquet", "arrow", "feather"],
         help="Sertakan kolom nama_karyawan beserta 8 kolom fitur model"
     )
 
+    with_shap = st.checkbox(
+        f"Sertakan {DEFAULT_TOP_K} faktor SHAP utama per karyawan",
+        value=False,
+        help="Menambahkan kolom Top Driver ke tabel dan file hasil. Lebih lambat untuk file besar.",
+    )
+
+    use_store = st.checkbox(
+        "Gunakan score store (skor ulang hanya karyawan baru atau yang datanya berubah)",
+        value=False,
+        help=f"Skor per karyawan disimpan di {store_path()} dan dipakai ulang pada upload berikutnya. "
+             "Kunci: kolom " + ", ".join(ID_COLUMNS) + " (yang pertama tersedia).",
+    )
+
+    executor   = get_executor()
+    pending    = st.session_state.get("batch_job")
+    upload_key = None
     if uploaded_file is not None:
-        try:
-            if uploaded_file.name.endswith(".csv"):
-                df_raw = pd.read_csv(uploaded_file)
-            else:
-                df_raw = pd.read_excel(uploaded_file)
-        except Exception as e:
-            st.error(f"Gagal membaca file: {e}")
-            st.stop()
+        # Kunci scoring: isi file + versi model (+ opsi yang mengubah kolom hasil). Threshold tidak
+        # termasuk: bucket risiko dihitung ulang dari probabilitas tersimpan (lihat di bawah).
+        digest = st.session_state.get("upload_digest")
+        if digest is None or digest[0] != uploaded_file.file_id:
+            digest = (uploaded_file.file_id, hashlib.sha256(uploaded_file.getvalue()).hexdigest())
+            st.session_state["upload_digest"] = digest
+        upload_key = (digest[1], model_hash, with_shap, use_store)
+    if pending is not None and pending[0] != upload_key:
+        # File dihapus atau diganti: hentikan job sesi ini yang masih berjalan (scoring, skenario,
+        # SHAP) dan buang hasil yang sudah selesai tetapi belum ditampilkan.
+        executor.cancel(session_id)
+        if pending[1].state == DONE:
+            os.unlink(pending[1].result()[1])
+        del st.session_state["batch_job"]
+        pending = None
 
-        st.markdown(f"**{len(df_raw)} baris** terdeteksi dalam file.")
+    if uploaded_file is not None:
+        # Skor ulang hanya jika file berubah; rerun Streamlit memakai hasil yang tersimpan.
+        if st.session_state.get("batch_key") != upload_key and pending is None:
+            executor.cancel(session_id)
+            metrics.count("batch", "uploads")
+            scoring_model = load_scoring_model()
 
-        # Ambil nama karyawan jika ada
-        has_name = "nama_karyawan" in df_raw.columns
-        names    = df_raw["nama_karyawan"].tolist() if has_name else [f"Karyawan {i+1}" for i in range(len(df_raw))]
+            def _score_upload(job, data, filename, thresholds, with_shap, use_store, explainer):
+                # Hasil disimpan sebagai Arrow IPC; format unduhan lain dikonversi dari file ini.
+                with tempfile.NamedTemporaryFile(suffix=".arrow", delete=False) as out_file:
+                    pass
 
-        # Validasi kolom fitur
-        missing_cols = [c for c in final_columns if c not in df_raw.columns]
-        if missing_cols:
-            st.error(f"Kolom berikut tidak ditemukan: `{', '.join(missing_cols)}`")
-            st.stop()
+                def _score(store):
+                    source = io.BytesIO(data)
+                    with TableWriter(out_file.name, "arrow",
+                                     result_columns(final_columns, DEFAULT_TOP_K if with_shap else 0,
+                                                    history=store is not None)) as writer:
+                        return score_stream(
+                            read_chunks(source, filename, columns=input_columns(final_columns)),
+                            scoring_model, artifacts.input_scaler, final_columns, writer,
+                            on_progress=job.progress, source=source, thresholds=thresholds,
+                            explainer=explainer, top_k=DEFAULT_TOP_K, preview_rows=0, store=store,
+                        )
 
-        df_proc = df_raw[final_columns].copy()
+                try:
+                    try:
+                        summary = _score(ScoreStore(store_path(), model_hash) if use_store else None)
+                    except DuplicateKeysError as e:
+                        # Kunci ganda (mis. nama sama): baseline bisa tertukar, jadi store tidak dipakai.
+                        summary = _score(None)
+                        summary.store_key, summary.store_note = e.key, str(e)
+                    # Satu kali sort berdasarkan risiko, dipakai untuk tabel dan semua file unduhan.
+                    order = sort_order(out_file.name, "Resign Probability (%)")
+                    job.check()
+                except BaseException:
+                    os.unlink(out_file.name)
+                    raise
+                summary.drift.source = filename
+                return summary, out_file.name, order
 
-        if df_proc["salary"].dtype == object:
-            df_proc["salary"] = df_proc["salary"].str.lower().map(SALARY_MAP)
+            data    = uploaded_file.getvalue()
+            job     = executor.submit(session_id, _score_upload, data, uploaded_file.name, thresholds, with_shap,
+                                      use_store, load_explainer(scoring_model) if with_shap else None, kind="batch")
+            pending = (upload_key, job, upload_key[0])
+            st.session_state["batch_job"] = pending
 
-        if df_proc.isnull().any().any():
-            st.warning("Ada nilai kosong atau salary tidak valid. Baris tersebut dilewati.")
-            valid_idx = df_proc.dropna().index
-            df_proc   = df_proc.loc[valid_idx]
-            names     = [names[i] for i in valid_idx]
+        if pending is not None:
+            _, job, upload_hash = pending
+            if not job.done():
+                job_progress(job, "{rows:,} baris diproses ({seconds:.0f} s)...", "batch_cancel")
+                st.stop()
+            try:
+                summary, out_path, order = job.result()
+            except JobCancelled:
+                st.info("Pemrosesan file dibatalkan.")
+                if st.button("Proses ulang", key="batch_retry"):
+                    del st.session_state["batch_job"]
+                    st.rerun()
+                st.stop()
+            except MissingColumnsError as e:
+                st.error(f"Kolom berikut tidak ditemukan: `{', '.join(e.missing)}`")
+                st.stop()
+            except Exception as e:
+                st.error(f"Gagal membaca file: {e}")
+                st.stop()
+            del st.session_state["batch_job"]
 
-        scaled_batch = scaler.transform(df_proc)
-        preds        = model.predict(scaled_batch)
-        probas       = model.predict_proba(scaled_batch)[:, 1]
+            old_paths = [st.session_state.get("batch_path"), *st.session_state.get("batch_exports", {}).values()]
+            for old_path in old_paths:
+                if old_path and os.path.exists(old_path):
+                    os.unlink(old_path)
+            st.session_state["batch_key"]     = upload_key
+            st.session_state["batch_hash"]    = upload_hash
+            st.session_state["batch_path"]    = out_path
+            st.session_state["batch_order"]   = order
+            st.session_state["batch_exports"] = {}
+            st.session_state["batch_summary"] = summary
 
-        # Susun hasil dengan nama
-        df_result = pd.DataFrame({
-            "Nama Karyawan"          : names,
-            **{col: df_proc[col].values for col in final_columns},
-            "Resign Probability (%)" : (probas * 100).round(1),
-            "Prediction"             : ["⚠ RESIGN" if p == 1 else "✅ STAY" for p in preds],
-            "Risk Level"             : ["CRITICAL" if p >= 70 else "MODERATE" if p >= 40 else "LOW" for p in (probas * 100)],
-        })
+        summary     = st.session_state["batch_summary"]
+        result_path = st.session_state["batch_path"]
+        if summary.thresholds != thresholds:
+            # Hanya bucket risiko yang bergantung pada threshold: probabilitas tersimpan dibucket ulang,
+            # file tidak dibaca ulang maupun diskor ulang (dan score store tidak disentuh).
+            with metrics.stage("batch", "rebucket"):
+                summary = apply_thresholds(result_path, summary, thresholds)
+            for export_path in st.session_state["batch_exports"].values():
+                os.unlink(export_path)
+            st.session_state["batch_exports"] = {}
+            st.session_state["batch_summary"] = summary
+
+        st.markdown(f"**{summary.total + summary.skipped} baris** terdeteksi dalam file.")
+        if summary.skipped:
+            st.warning(f"{summary.skipped:,} baris tidak lolos validasi (nilai kosong, bukan angka, salary tidak "
+                       "dikenal, di luar rentang, atau bukan bilangan bulat) dan tidak diprediksi.")
+            with st.expander("Laporan Validasi"):
+                st.markdown(" · ".join(f"`{col}` **{n:,}**" for col, n in summary.problems.items()))
+                if summary.skipped > len(summary.rejected):
+                    st.caption(f"Menampilkan {len(summary.rejected):,} baris pertama dari {summary.skipped:,}.")
+                st.dataframe(summary.rejected, use_container_width=True, hide_index=True)
+        if summary.total == 0:
+            st.error("Tidak ada baris valid untuk diprediksi.")
+            st.stop()
+
+        go = timed_import("plotly.graph_objects")
 
         # ── Summary KPI ──
         st.markdown("<br>", unsafe_allow_html=True)
         st.markdown('<div class="section-label">02 &nbsp; Batch Prediction Summary</div>', unsafe_allow_html=True)
 
-        total     = len(df_result)
-        high_risk = int((probas >= 0.7).sum())
-        moderate  = int(((probas >= 0.4) & (probas < 0.7)).sum())
-        low_risk  = int((probas < 0.4).sum())
-        avg_prob  = probas.mean() * 100
+        total     = summary.total
+        high_risk = summary.high_risk
+        moderate  = summary.moderate
+        low_risk  = summary.low_risk
+        avg_prob  = summary.avg_prob
 
         st.markdown(f"""
         <div class="kpi-grid">
             <div class="kpi-card danger">
-                <div class="kpi-label">High Risk (≥70%)</div>
+                <div class="kpi-label">High Risk (≥{critical_pct:.0f}%)</div>
                 <div class="kpi-value danger">{high_risk}</div>
                 <div class="kpi-sub">{high_risk/total*100:.1f}% dari total karyawan</div>
             </div>
             <div class="kpi-card neutral">
-                <div class="kpi-label">Moderate Risk (40–70%)</div>
+                <div class="kpi-label">Moderate Risk ({moderate_pct:.0f}–{critical_pct:.0f}%)</div>
                 <div class="kpi-value neutral">{moderate}</div>
                 <div class="kpi-sub">{moderate/total*100:.1f}% dari total karyawan</div>
             </div>
             <div class="kpi-card safe">
-                <div class="kpi-label">Low Risk (&lt;40%)</div>
+                <div class="kpi-label">Low Risk (&lt;{moderate_pct:.0f}%)</div>
                 <div class="kpi-value safe">{low_risk}</div>
                 <div class="kpi-sub">{low_risk/total*100:.1f}% dari total karyawan</div>
             </div>
         </div>""", unsafe_allow_html=True)
 
+        # ── Week-over-week (score store) ──
+        if use_store and summary.store_note is not None:
+            st.warning(f"Kolom kunci `{summary.store_key}` tidak unik dalam file ini; score store tidak dipakai "
+                       f"agar skor sebelumnya tidak tertukar antar karyawan. ({summary.store_note})")
+        elif use_store and summary.store_key is None:
+            st.info("File tidak memiliki kolom " + " / ".join(ID_COLUMNS) + "; score store tidak dipakai.")
+        elif use_store:
+            st.markdown(
+                f"Score store (kunci `{summary.store_key}`): **{summary.reused:,}** skor dipakai ulang, "
+                f"**{total - summary.reused:,}** dihitung ulang, **{summary.new:,}** karyawan baru. "
+                f"Dibanding upload sebelumnya: **{summary.risk_up:,}** naik level risiko, "
+                f"**{summary.risk_down:,}** turun."
+            )
+            mover_cols = ["Nama Karyawan", "Resign Probability (%)", "Risk Level", *HISTORY_COLUMNS]
+            up_col, down_col = st.columns(2, gap="medium")
+            for col, title, descending in ((up_col, "Kenaikan risiko terbesar", True),
+                                           (down_col, "Penurunan risiko terbesar", False)):
+                movers = read_rows(result_path, sort_order(result_path, HISTORY_COLUMNS[1], descending)[:10])
+                movers = movers.loc[movers[HISTORY_COLUMNS[1]].notna() & (movers[HISTORY_COLUMNS[1]] != 0), mover_cols]
+                with col:
+                    st.markdown(f"**{title}**")
+                    st.dataframe(movers, use_container_width=True, hide_index=True)
+
         # ── Charts ──
+        render_start = metrics.clock()
         st.markdown('<div class="section-label">03 &nbsp; Risk Distribution</div>', unsafe_allow_html=True)
         c1, c2 = st.columns(2, gap="medium")
 
@@ -561,12 +921,13 @@ with tab2:
             st.plotly_chart(fig_pie, use_container_width=True, config={"displayModeBar": False})
 
         with c2:
-            fig_hist = go.Figure(go.Histogram(
-                x=probas * 100, nbinsx=20,
+            edges    = summary.bin_edges
+            fig_hist = go.Figure(go.Bar(
+                x=(edges[:-1] + edges[1:]) / 2, y=summary.hist, width=np.diff(edges),
                 marker=dict(color="#6366f1", line=dict(color="#ffffff", width=1)),
             ))
-            fig_hist.add_vline(x=70, line=dict(color="#f97316", width=1.5, dash="dot"))
-            fig_hist.add_vline(x=40, line=dict(color="#6366f1", width=1.5, dash="dot"))
+            fig_hist.add_vline(x=critical_pct, line=dict(color="#f97316", width=1.5, dash="dot"))
+            fig_hist.add_vline(x=moderate_pct, line=dict(color="#6366f1", width=1.5, dash="dot"))
             fig_hist.update_layout(
                 paper_bgcolor="#ffffff", plot_bgcolor="#f8fafc",
                 xaxis=dict(title="Resign Probability (%)", tickfont=dict(family="DM Mono", size=10, color="#000000"), gridcolor="#e2e8f0", color="#000000"),
@@ -577,30 +938,415 @@ with tab2:
             st.plotly_chart(fig_hist, use_container_width=True, config={"displayModeBar": False})
 
         # ── Tabel Hasil ──
+        # Hanya baris yang terlihat yang dibaca dari file hasil dan dikirim ke browser,
+        # sehingga ukuran halaman tetap sama berapa pun jumlah baris yang diprediksi.
         st.markdown('<div class="section-label">04 &nbsp; Tabel Hasil Prediksi</div>', unsafe_allow_html=True)
-        st.dataframe(
-            df_result.sort_values("Resign Probability (%)", ascending=False),
-            use_container_width=True,
-            height=420,
-        )
+        order = st.session_state["batch_order"]
+        view  = st.radio("Tampilan", ["Top risiko", "Semua karyawan"], horizontal=True, key="table_view")
+
+        if view == "Top risiko":
+            top_n = st.selectbox("Jumlah karyawan", TOP_N_OPTIONS, index=1, key="top_n")
+            rows  = order[:top_n]
+            st.caption(f"{len(rows):,} karyawan dengan risiko tertinggi dari {total:,}.")
+        else:
+            f_col, s_col = st.columns([3, 1])
+            with f_col:
+                levels = st.multiselect("Risk Level", RISK_LABELS, default=list(RISK_LABELS), key="table_levels")
+            with s_col:
+                page_size = st.selectbox("Baris per halaman", PAGE_SIZES, index=1, key="page_size")
+            if len(levels) < len(RISK_LABELS):
+                codes = read_column(result_path, "Risk Level").cat.codes.to_numpy()
+                keep  = np.isin(codes, [RISK_LABELS.index(level) for level in levels])
+                order = order[keep[order]]
+            n_pages = max(1, -(-len(order) // page_size))
+            if st.session_state.get("table_page", 1) > n_pages:
+                st.session_state["table_page"] = n_pages
+            page  = st.number_input("Halaman", min_value=1, max_value=n_pages, value=1, step=1, key="table_page")
+            start = (page - 1) * page_size
+            rows  = order[start:start + page_size]
+            st.caption(f"Halaman {page} dari {n_pages:,} · baris {start + 1 if len(rows) else 0:,}–"
+                       f"{start + len(rows):,} dari {len(order):,}.")
+
+        st.dataframe(read_rows(result_path, rows), use_container_width=True, hide_index=True)
+        metrics.since("batch", "render", render_start)
 
         # ── Download ──
-        csv_out = df_result.sort_values("Resign Probability (%)", ascending=False).to_csv(index=False).encode("utf-8")
+        export_fmt = st.radio("Format unduhan", list(EXPORT_FORMATS), format_func=str.upper,
+                              horizontal=True, key="export_format")
+        suffix, mime = EXPORT_FORMATS[export_fmt]
+        exports      = st.session_state["batch_exports"]
+        if export_fmt not in exports:
+            with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as export_file:
+                pass
+            with metrics.stage("batch", "export"):
+                exports[export_fmt] = convert_table(result_path, export_file.name, export_fmt,
+                                                    order=st.session_state["batch_order"])
+        with open(exports[export_fmt], "rb") as f:
+            export_out = f.read()
         st.download_button(
-            "⬇  Download Hasil Prediksi (CSV)",
-            data=csv_out,
-            file_name="attrition_prediction_results.csv",
-            mime="text/csv",
+            f"⬇  Download Hasil Prediksi ({export_fmt.upper()})",
+            data=export_out,
+            file_name=f"attrition_prediction_results{suffix}",
+            mime=mime,
         )
 
-# ════════════════════════════════════════════
-# FOOTER
-# ════════════════════════════════════════════
-st.markdown("<br><br>", unsafe_allow_html=True)
-st.markdown("""
-<div style="text-align:center;padding:20px 0;border-top:2px solid #e2e8f0;">
-    <span style="font-family:'DM Mono',monospace;font-size:11px;color:#000000;letter-spacing:0.1em;">
-        HR ATTRITION INTELLIGENCE · XGBOOST · ROC-AUC 0.9853 · BUILT WITH STREAMLIT
-    </span>
-</div>
-""", unsafe_allow_html=True)
+        # ── Skenario Retensi ──
+        st.markdown('<div class="section-label">05 &nbsp; Skenario Retensi</div>', unsafe_allow_html=True)
+        at_risk = summary.high_risk + summary.moderate
+        if at_risk == 0:
+            st.caption(f"Tidak ada karyawan dengan risiko ≥ {moderate_pct:.0f}%.")
+        else:
+            st.caption(f"Intervensi termurah (gaji, jam kerja, jumlah proyek, promosi) yang menurunkan risiko "
+                       f"di bawah {moderate_pct:.0f}%, untuk karyawan berisiko tertinggi.")
+            options  = [n for n in WHATIF_SIZES if n < at_risk] + [at_risk]
+            n_whatif = st.selectbox("Jumlah karyawan berisiko", options, index=min(1, len(options) - 1),
+                                    format_func="{:,}".format, key="whatif_rows")
+            whatif_key = (st.session_state["batch_key"], n_whatif, thresholds.moderate)
+            if st.button("Hitung skenario", key="whatif_run"):
+                rows = read_rows(result_path, st.session_state["batch_order"][:n_whatif])
+
+                def _whatif(job, rows, model, target):
+                    with metrics.stage("batch", "whatif"):
+                        return cheapest_interventions(rows[final_columns], model, artifacts.input_scaler, final_columns,
+                                                      target=target, names=rows["Nama Karyawan"].to_numpy(),
+                                                      on_progress=job.progress)
+
+                st.session_state["whatif"] = (whatif_key, executor.submit(
+                    session_id, _whatif, rows, load_scoring_model(), thresholds.moderate, kind="whatif"))
+            stored = st.session_state.get("whatif")
+            whatif = None
+            if stored is not None and stored[0] == whatif_key:
+                if not stored[1].done():
+                    job_progress(stored[1], "Menghitung skenario: {rows:,} karyawan ({seconds:.0f} s)...",
+                                 "whatif_cancel")
+                else:
+                    try:
+                        whatif = stored[1].result()
+                    except JobCancelled:
+                        st.caption("Perhitungan skenario dibatalkan.")
+                    except Exception as e:
+                        st.error(f"Perhitungan skenario gagal: {e}")
+            if whatif is not None:
+                reached = whatif["Reaches Target"]
+                st.markdown(
+                    f"**{int(reached.sum()):,}** dari {len(whatif):,} karyawan dapat diturunkan di bawah "
+                    f"{moderate_pct:.0f}%" + (f"; biaya relatif median {whatif.loc[reached, 'Cost'].median():g}."
+                                             if reached.any() else ".")
+                )
+                st.dataframe(whatif.head(WHATIF_PREVIEW), use_container_width=True, hide_index=True)
+                st.download_button(
+                    "⬇  Download Skenario Retensi (CSV)",
+                    data=whatif.to_csv(index=False).encode("utf-8"),
+                    file_name="attrition_retention_scenarios.csv",
+                    mime="text/csv",
+                )
+
+        # ── SHAP Populasi ──
+        # TreeSHAP dihitung pada sampel berstrata per Risk Level, bukan pada setiap baris;
+        # hasilnya disimpan per file dan ukuran sampel.
+        st.markdown('<div class="section-label">06 &nbsp; SHAP Populasi</div>', unsafe_allow_html=True)
+        shap_size = st.selectbox("Ukuran sampel SHAP", SHAP_SAMPLES, index=SHAP_SAMPLES.index(DEFAULT_SAMPLE),
+                                 format_func="{:,}".format, key="shap_sample")
+        shap_key  = (st.session_state["batch_key"], shap_size, thresholds.moderate, thresholds.critical)
+        if st.button("Hitung SHAP global", key="shap_run"):
+            strata = read_column(result_path, "Risk Level").cat.codes.to_numpy()
+            index, weights = stratified_sample(strata, shap_size)
+            sample = read_rows(result_path, index)[final_columns]
+
+            def _shap_global(job, explainer, sample, weights, strata):
+                with metrics.stage("batch", "explain_global"):
+                    return ShapSummary.compute(explainer, model_input(sample, artifacts.input_scaler),
+                                               sample, weights, strata, final_columns, on_progress=job.progress)
+
+            st.session_state["shap_job"] = (shap_key, executor.submit(
+                session_id, _shap_global, load_explainer(load_scoring_model()), sample, weights, strata[index],
+                kind="shap_global"))
+
+        shap_job = st.session_state.get("shap_job")
+        if shap_job is not None and shap_job[0] == shap_key and not shap_job[1].done():
+            job_progress(shap_job[1], "Menghitung SHAP: {rows:,} baris ({seconds:.0f} s)...", "shap_cancel")
+        elif shap_job is not None and shap_job[0] == shap_key:
+            del st.session_state["shap_job"]
+            try:
+                shap_summary = shap_job[1].result()
+            except JobCancelled:
+                st.caption("Perhitungan SHAP dibatalkan.")
+            except Exception as e:
+                st.error(f"Perhitungan SHAP gagal: {e}")
+            else:
+                # Beeswarm digambar di thread skrip: pyplot tidak thread-safe.
+                matplotlib = timed_import("matplotlib")
+                matplotlib.use("Agg")
+                plt  = timed_import("matplotlib.pyplot")
+                shap = timed_import("shap")
+                plt.style.use("default")
+                plt.figure(figsize=(10, 5))
+                shap.plots.beeswarm(shap_summary.explanation(), max_display=len(final_columns), show=False)
+                png_buf = io.BytesIO()
+                plt.gcf().savefig(png_buf, format="png", bbox_inches="tight", dpi=150)
+                plt.close("all")
+                st.session_state["shap_summary"] = (shap_key, shap_summary, png_buf.getvalue())
+
+        stored = st.session_state.get("shap_summary")
+        if stored is not None and stored[0] == shap_key:
+            _, shap_summary, beeswarm_png = stored
+            if shap_summary.exact:
+                st.caption(f"SHAP dihitung untuk seluruh {shap_summary.population:,} karyawan.")
+            else:
+                st.caption(f"Sampel berstrata {shap_summary.sample_size:,} dari {shap_summary.population:,} karyawan "
+                           f"(per Risk Level). Garis galat: interval 95% untuk rata-rata |SHAP| populasi.")
+            ranking  = shap_summary.ranking()
+            mean_abs = shap_summary.mean_abs
+            bound    = shap_summary.error_bound
+            c1, c2 = st.columns(2, gap="medium")
+            with c1:
+                fig_mean = go.Figure(go.Bar(
+                    x=mean_abs[ranking][::-1], y=[final_columns[i] for i in ranking][::-1], orientation="h",
+                    error_x=dict(type="data", array=bound[ranking][::-1], visible=not shap_summary.exact,
+                                 color="#000000", thickness=1),
+                    marker=dict(color="#6366f1"),
+                ))
+                fig_mean.update_layout(
+                    paper_bgcolor="#ffffff", plot_bgcolor="#f8fafc",
+                    xaxis=dict(title="Rata-rata |SHAP|", tickfont=dict(family="DM Mono", size=10, color="#000000"), gridcolor="#e2e8f0", color="#000000"),
+                    yaxis=dict(tickfont=dict(family="DM Mono", size=11, color="#000000")),
+                    title=dict(text="Pengaruh Fitur (Populasi)", font=dict(size=13, color="#000000", family="DM Mono")),
+                    height=360, margin=dict(t=50, b=10, l=10, r=10), bargap=0.35,
+                )
+                st.plotly_chart(fig_mean, use_container_width=True, config={"displayModeBar": False})
+            with c2:
+                st.image(beeswarm_png, use_container_width=True)
+
+            dep_feature = st.selectbox("Dependence plot", [final_columns[i] for i in ranking], key="shap_dependence")
+            dep_index   = final_columns.index(dep_feature)
+            color_index = shap_summary.interaction_feature(dep_index)
+            fig_dep = go.Figure(go.Scattergl(
+                x=shap_summary.data[:, dep_index], y=shap_summary.values[:, dep_index], mode="markers",
+                marker=dict(size=5, color=shap_summary.data[:, color_index], colorscale="Bluered", opacity=0.7,
+                            colorbar=dict(title=final_columns[color_index])),
+            ))
+            fig_dep.update_layout(
+                paper_bgcolor="#ffffff", plot_bgcolor="#f8fafc",
+                xaxis=dict(title=dep_feature, tickfont=dict(family="DM Mono", size=10, color="#000000"), gridcolor="#e2e8f0", color="#000000"),
+                yaxis=dict(title=f"SHAP {dep_feature}", tickfont=dict(family="DM Mono", size=10, color="#000000"), gridcolor="#e2e8f0", color="#000000"),
+                height=340, margin=dict(t=30, b=10, l=10, r=10),
+            )
+            st.plotly_chart(fig_dep, use_container_width=True, config={"displayModeBar": False})
+
+        # ── Analisis Segmen ──
+        # Agregat semua segmen (dan pasangan segmen untuk drill-down) dibangun sekali per file;
+        # grafik di bawah hanya membaca tabel agregat tersebut.
+        st.markdown('<div class="section-label">07 &nbsp; Analisis Segmen</div>', unsafe_allow_html=True)
+        seg_drivers = with_shap or st.checkbox(
+            "Tentukan top driver SHAP per segmen (sampel acak)", value=False, key="segment_drivers",
+            help="Tanpa kolom Top Driver, driver per segmen dihitung dari SHAP pada sampel hasil prediksi.",
+        )
+        segments = segment_aggregates(st.session_state["batch_hash"], thresholds, model_hash, seg_drivers,
+                                      result_path)
+        dim_names = [d.name for d in DIMENSIONS]
+        seg_dim   = st.radio("Segmen", dim_names, horizontal=True, key="segment_dim")
+
+        def _segment_chart(view, title):
+            fig = go.Figure()
+            for level, color in zip(RISK_LABELS, ("#10b981", "#6366f1", "#f97316")):
+                fig.add_trace(go.Bar(x=view["Segment"], y=view[f"Share {level} (%)"], name=level,
+                                     marker=dict(color=color)))
+            fig.add_trace(go.Scatter(x=view["Segment"], y=view["Mean Probability (%)"], name="Rata-rata prob. (%)",
+                                     mode="lines+markers", yaxis="y2", line=dict(color="#000000", width=1.5)))
+            fig.update_layout(
+                barmode="stack", paper_bgcolor="#ffffff", plot_bgcolor="#f8fafc",
+                xaxis=dict(type="category", tickfont=dict(family="DM Mono", size=10, color="#000000"), color="#000000"),
+                yaxis=dict(title="Porsi (%)", range=[0, 100], tickfont=dict(family="DM Mono", size=10, color="#000000"), gridcolor="#e2e8f0", color="#000000"),
+                yaxis2=dict(title="Rata-rata prob. (%)", overlaying="y", side="right", rangemode="tozero", showgrid=False,
+                            tickfont=dict(family="DM Mono", size=10, color="#000000"), color="#000000"),
+                legend=dict(orientation="h", y=-0.2, font=dict(family="DM Mono", size=10, color="#000000")),
+                title=dict(text=title, font=dict(size=13, color="#000000", family="DM Mono")),
+                height=340, margin=dict(t=50, b=10, l=10, r=10),
+            )
+            return fig
+
+        seg_view = segments.view(seg_dim)
+        st.plotly_chart(_segment_chart(seg_view, f"Risiko per {seg_dim}"), use_container_width=True,
+                        config={"displayModeBar": False})
+        st.dataframe(seg_view, use_container_width=True, hide_index=True)
+        st.caption(f"Top driver: {segments.driver_note}.")
+
+        d_col, b_col = st.columns(2)
+        with d_col:
+            drill_segment = st.selectbox(f"Rinci {seg_dim}", seg_view["Segment"].tolist(), key="segment_drill")
+        with b_col:
+            drill_dim = st.selectbox("berdasarkan", [n for n in dim_names if n != seg_dim], key="segment_by")
+        drill_view = segments.view(drill_dim, within=(seg_dim, drill_segment))
+        st.plotly_chart(_segment_chart(drill_view, f"{seg_dim} = {drill_segment} · per {drill_dim}"),
+                        use_container_width=True, config={"displayModeBar": False})
+        st.dataframe(drill_view, use_container_width=True, hide_index=True)
+
+        # ── Drift Data ──
+        # Histogram batch sudah dikumpulkan per chunk saat scoring; perbandingan dengan
+        # referensi hanya membaca histogram (O(bins) per fitur).
+        st.markdown('<div class="section-label">08 &nbsp; Drift Data</div>', unsafe_allow_html=True)
+        ref_path  = reference_path()
+        reference = drift_reference(str(ref_path), ref_path.stat().st_mtime_ns) if ref_path.exists() else None
+        if reference is None:
+            # Referensi berlaku untuk semua pengguna, jadi hanya dibuat dari CLI, bukan dari sesi browser.
+            st.info(f"Belum ada referensi drift ({ref_path.name}). Referensi dibuat oleh `python -m attrition.train` "
+                    "atau `python -m attrition.drift build HR_comma_sep.csv`.")
+        else:
+            drift_table = compare(reference, summary.drift)
+            drifted     = drift_table.loc[drift_table["Status"] == "DRIFT", "Feature"].tolist()
+            st.caption(f"Referensi: {reference.rows:,} baris ({reference.source or ref_path.name}) · "
+                       f"batch: {summary.drift.rows:,} baris. PSI < 0.1 stabil, 0.1–0.25 perlu dipantau, "
+                       "> 0.25 drift.")
+            if drifted:
+                st.warning("Distribusi bergeser jauh dari data training pada: " + ", ".join(f"`{f}`" for f in drifted)
+                           + ". Skor untuk populasi ini kurang dapat diandalkan.")
+
+            status_colors = {"STABLE": "#10b981", "WATCH": "#6366f1", "DRIFT": "#f97316"}
+            fig_psi = go.Figure(go.Bar(
+                x=drift_table["PSI"][::-1], y=drift_table["Feature"][::-1], orientation="h",
+                marker=dict(color=[status_colors[v] for v in drift_table["Status"][::-1]]),
+                text=drift_table["Status"][::-1], textposition="outside",
+            ))
+            for cut in (0.1, 0.25):
+                fig_psi.add_vline(x=cut, line=dict(color="#94a3b8", dash="dot", width=1))
+            fig_psi.update_layout(
+                paper_bgcolor="#ffffff", plot_bgcolor="#f8fafc",
+                xaxis=dict(title="PSI", tickfont=dict(family="DM Mono", size=10, color="#000000"), gridcolor="#e2e8f0", color="#000000"),
+                yaxis=dict(tickfont=dict(family="DM Mono", size=10, color="#000000"), color="#000000"),
+                height=320, margin=dict(t=10, b=10, l=10, r=40),
+            )
+            st.plotly_chart(fig_psi, use_container_width=True, config={"displayModeBar": False})
+            st.dataframe(drift_table, use_container_width=True, hide_index=True)
+
+            drift_feature = st.selectbox("Bandingkan distribusi", drift_table["Feature"].tolist(), key="drift_feature")
+            labels  = bin_labels(summary.drift.edges[drift_feature])
+            fig_cmp = go.Figure()
+            fig_cmp.add_trace(go.Bar(x=labels, y=reference.shares(drift_feature) * 100, name="Referensi",
+                                     marker=dict(color="#cbd5e1")))
+            fig_cmp.add_trace(go.Bar(x=labels, y=summary.drift.shares(drift_feature) * 100, name="Batch",
+                                     marker=dict(color="#6366f1")))
+            fig_cmp.update_layout(
+                barmode="group", paper_bgcolor="#ffffff", plot_bgcolor="#f8fafc",
+                xaxis=dict(type="category", tickfont=dict(family="DM Mono", size=10, color="#000000"), color="#000000"),
+                yaxis=dict(title="Porsi (%)", tickfont=dict(family="DM Mono", size=10, color="#000000"), gridcolor="#e2e8f0", color="#000000"),
+                legend=dict(orientation="h", y=-0.2, font=dict(family="DM Mono", size=10, color="#000000")),
+                height=300, margin=dict(t=10, b=10, l=10, r=10),
+            )
+            st.plotly_chart(fig_cmp, use_container_width=True, config={"displayModeBar": False})
+
+            st.download_button(
+                "⬇  Download Drift Report (JSON)",
+                json.dumps(drift_report(reference, summary.drift), indent=2),
+                file_name="drift_report.json", mime="application/json",
+            )
+
+        # ── Evaluasi Model ──
+        # Hanya untuk file historis dengan kolom `left`. Outcome dan probabilitas sudah diringkas per
+        # sel (salary × promosi × outcome × bin skor) saat scoring, jadi metrik — juga saat threshold
+        # diubah — dan bootstrap tidak membaca ulang baris.
+        evaluation = summary.evaluation
+        if evaluation is not None and evaluation.rows:
+            st.markdown('<div class="section-label">09 &nbsp; Evaluasi Model</div>', unsafe_allow_html=True)
+            cutoffs = (thresholds.moderate, thresholds.critical)
+            eval_m  = overall(evaluation, thresholds)
+            st.caption(f"{evaluation.rows:,} baris berlabel (kolom `left`)"
+                       + (f"; {evaluation.unlabelled:,} baris tanpa label 0/1 diabaikan." if evaluation.unlabelled
+                          else "."))
+
+            boot_size = st.selectbox("Replikasi bootstrap", BOOT_SAMPLES, index=BOOT_SAMPLES.index(DEFAULT_BOOT),
+                                     format_func="{:,}".format, key="eval_boot")
+            boot_key  = (st.session_state["batch_key"], boot_size, cutoffs)
+            if st.button("Hitung interval kepercayaan 95%", key="eval_run"):
+                def _bootstrap(job, evaluation, thresholds, n_boot):
+                    # Satu proses saja: resampling per sel murah (±2 s untuk 1.000 replikasi), dan job ini
+                    # berjalan di executor bersama sehingga tidak boleh mengambil semua core.
+                    with metrics.stage("batch", "evaluate_bootstrap"):
+                        return bootstrap(evaluation, thresholds, n_boot, workers=1, on_progress=job.progress)
+
+                st.session_state["eval_job"] = (boot_key, executor.submit(
+                    session_id, _bootstrap, evaluation, thresholds, boot_size, kind="evaluation"))
+
+            eval_job  = st.session_state.get("eval_job")
+            intervals = None
+            if eval_job is not None and eval_job[0] == boot_key and not eval_job[1].done():
+                job_progress(eval_job[1], "Bootstrap: {rows:,} replikasi ({seconds:.0f} s)...", "eval_cancel")
+            elif eval_job is not None and eval_job[0] == boot_key:
+                try:
+                    intervals = eval_job[1].result()
+                except JobCancelled:
+                    del st.session_state["eval_job"]
+                    st.caption("Bootstrap dibatalkan.")
+                except Exception as e:
+                    del st.session_state["eval_job"]
+                    st.error(f"Bootstrap gagal: {e}")
+
+            def _with_ci(name, value, pct=False):
+                scale = 100 if pct else 1
+                text  = f"{value * scale:.1f}%" if pct else f"{value:.4f}"
+                if intervals is not None and name in intervals:
+                    low, high = intervals[name]
+                    text += f" [{low * scale:.1f}–{high * scale:.1f}]" if pct else f" [{low:.4f}–{high:.4f}]"
+                return text
+
+            st.markdown(f"""
+            <div class="kpi-grid">
+                <div class="kpi-card neutral">
+                    <div class="kpi-label">ROC-AUC</div>
+                    <div class="kpi-value neutral">{eval_m['roc_auc']:.4f}</div>
+                    <div class="kpi-sub">{_with_ci('roc_auc', eval_m['roc_auc'])}</div>
+                </div>
+                <div class="kpi-card safe">
+                    <div class="kpi-label">Brier Score</div>
+                    <div class="kpi-value safe">{eval_m['brier']:.4f}</div>
+                    <div class="kpi-sub">{_with_ci('brier', eval_m['brier'])}</div>
+                </div>
+                <div class="kpi-card danger">
+                    <div class="kpi-label">Resign Aktual vs Prediksi</div>
+                    <div class="kpi-value danger">{eval_m['base_rate'] * 100:.1f}%</div>
+                    <div class="kpi-sub">rata-rata probabilitas {eval_m['mean_prob'] * 100:.1f}%</div>
+                </div>
+            </div>
+            """, unsafe_allow_html=True)
+
+            c1, c2 = st.columns(2, gap="medium")
+            with c1:
+                calib = calibration(evaluation)
+                calib = calib[calib["Rows"] > 0]
+                fig_cal = go.Figure()
+                fig_cal.add_trace(go.Scatter(x=[0, 100], y=[0, 100], mode="lines", name="Kalibrasi sempurna",
+                                             line=dict(color="#cbd5e1", dash="dot")))
+                fig_cal.add_trace(go.Scatter(x=calib["Predicted (%)"], y=calib["Observed (%)"], mode="lines+markers",
+                                             name="Model", line=dict(color="#6366f1", width=2),
+                                             text=calib["Rows"].map("{:,} baris".format)))
+                fig_cal.update_layout(
+                    paper_bgcolor="#ffffff", plot_bgcolor="#f8fafc",
+                    xaxis=dict(title="Prediksi (%)", range=[0, 100], tickfont=dict(family="DM Mono", size=10, color="#000000"), gridcolor="#e2e8f0", color="#000000"),
+                    yaxis=dict(title="Aktual resign (%)", range=[0, 100], tickfont=dict(family="DM Mono", size=10, color="#000000"), gridcolor="#e2e8f0", color="#000000"),
+                    legend=dict(orientation="h", y=-0.25, font=dict(family="DM Mono", size=10, color="#000000")),
+                    title=dict(text="Kurva Kalibrasi", font=dict(size=13, color="#000000", family="DM Mono")),
+                    height=340, margin=dict(t=50, b=10, l=10, r=10),
+                )
+                st.plotly_chart(fig_cal, use_container_width=True, config={"displayModeBar": False})
+            with c2:
+                for cut in cutoffs:
+                    st.markdown(f"**Confusion matrix · threshold {cut * 100:.0f}%** — "
+                                f"TPR {_with_ci(f'tpr@{cut:g}', eval_m[f'tpr@{cut:g}'], pct=True)}, "
+                                f"FPR {_with_ci(f'fpr@{cut:g}', eval_m[f'fpr@{cut:g}'], pct=True)}")
+                    st.dataframe(confusion(evaluation, cut), use_container_width=True)
+
+            groups = group_metrics(evaluation, thresholds)
+            groups["Group"] = groups["Group"].map({"salary": "Salary", "promotion_last_5years": "Promosi"})
+            st.markdown("**Metrik per kelompok** — selisih TPR/FPR antar kelompok menunjukkan perlakuan model "
+                        "yang tidak setara.")
+            st.dataframe(groups.round(4), use_container_width=True, hide_index=True)
+            if intervals is None:
+                st.caption("Interval kepercayaan belum dihitung; tekan tombol di atas untuk bootstrap.")
+
+            st.download_button(
+                "⬇  Download Evaluation Report (JSON)",
+                json.dumps(evaluation_report(evaluation, thresholds, intervals, source=summary.drift.source), indent=2),
+                file_name="evaluation_report.json", mime="application/json",
+            )
+
+if metrics.enabled():
+    metrics.flush()
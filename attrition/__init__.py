@@ -0,0 +1 @@
+"""Scoring helpers shared by the HR Attrition Intelligence app."""
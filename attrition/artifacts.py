@@ -0,0 +1,126 @@
+"""Loading of the model artifacts.
+
+The versioned bundle in ``model_bundle/`` (see ``attrition.bundle``) is
+preferred; the five pickles produced by the training notebook remain as a
+fallback when no bundle is present.
+"""
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path
+
+from attrition import timing
+from attrition.bundle import BUNDLE_NAME, MANIFEST, ModelBundle, load_bundle, open_bundle, read_manifest
+
+ARTIFACT_DIR = Path(__file__).resolve().parent.parent
+BUNDLE_ENV   = "ATTRITION_MODEL_BUNDLE"   # e.g. a variant written by ``python -m attrition.compact``
+
+TRAINING_REPORT = "training_report.json"
+
+ARTIFACT_FILES = {
+    "model"        : "xgb_attrition_model.pkl",
+    "scaler"       : "scaler.pkl",
+    "encoder"      : "encoder.pkl",
+    "feature_imp"  : "feature_importances.pkl",
+    "final_columns": "final_columns.pkl",
+}
+
+
+def bundle_dir(base_dir=ARTIFACT_DIR):
+    """Path of the bundle under ``base_dir``, or None if there is none.
+
+    For the default ``base_dir``, ``ATTRITION_MODEL_BUNDLE`` selects another
+    bundle directory.
+    """
+    override = os.environ.get(BUNDLE_ENV)
+    path = Path(override) if override and Path(base_dir) == ARTIFACT_DIR else Path(base_dir) / BUNDLE_NAME
+    return path if (path / MANIFEST).exists() else None
+
+
+def load_artifact(path):
+    import joblib
+
+    path = Path(path)
+    with timing.timed("artifact", path.name):
+        try:
+            return joblib.load(path)
+        except Exception:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+
+
+def load_pickles(base_dir=ARTIFACT_DIR):
+    """Return the five pickled artifacts, in ``ARTIFACT_FILES`` order."""
+    return tuple(load_artifact(Path(base_dir) / filename) for filename in ARTIFACT_FILES.values())
+
+
+def load_artifacts(base_dir=ARTIFACT_DIR):
+    """Return ``(model, scaler, encoder, feature_imp, final_columns)``."""
+    path = bundle_dir(base_dir)
+    if path is None:
+        return load_pickles(base_dir)
+    with timing.timed("artifact", BUNDLE_NAME):
+        return load_bundle(path)
+
+
+def open_artifacts(base_dir=ARTIFACT_DIR):
+    """Return a ``ModelBundle`` for the app.
+
+    From a bundle nothing heavier than NumPy is imported until a booster is
+    requested; from the pickles everything is loaded, folded and compiled
+    up front.
+    """
+    path = bundle_dir(base_dir)
+    if path is None:
+        return ModelBundle.from_artifacts(*load_pickles(base_dir))
+    with timing.timed("artifact", BUNDLE_NAME):
+        return open_bundle(path)
+
+
+def load_final_columns(base_dir=ARTIFACT_DIR):
+    """The model's feature columns, without loading the model."""
+    path = bundle_dir(base_dir)
+    if path is not None:
+        return list(read_manifest(path)["final_columns"])
+    return list(load_artifact(Path(base_dir) / ARTIFACT_FILES["final_columns"]))
+
+
+def training_report(base_dir=ARTIFACT_DIR):
+    """The report ``python -m attrition.train`` wrote next to the artifacts, or None."""
+    path = Path(base_dir) / TRAINING_REPORT
+    return json.loads(path.read_text()) if path.exists() else None
+
+
+_hash_memo = {}
+
+
+def _file_hash(path):
+    st  = path.stat()
+    sig = (str(path), st.st_size, st.st_mtime_ns)
+    if sig not in _hash_memo:
+        _hash_memo[sig] = hashlib.sha256(path.read_bytes()).hexdigest()
+    return _hash_memo[sig]
+
+
+def _bundle_hash(path):
+    # The booster and the compiled forest both score, so the model version
+    # covers every file digest in the manifest (not its timestamp).
+    st  = (path / MANIFEST).stat()
+    sig = (str(path), st.st_size, st.st_mtime_ns)
+    if sig not in _hash_memo:
+        files = json.dumps(read_manifest(path)["files"], sort_keys=True)
+        _hash_memo[sig] = hashlib.sha256(files.encode()).hexdigest()
+    return _hash_memo[sig]
+
+
+def artifact_hash(name, base_dir=ARTIFACT_DIR):
+    """SHA-256 of an artifact file; re-hashed only when its size or mtime changes.
+
+    With a bundle present, the model hash is derived from the bundle's file
+    digests, so variants sharing a booster but not a forest differ.
+    """
+    path = bundle_dir(base_dir)
+    if path is not None and name == "model":
+        return _bundle_hash(path)
+    return _file_hash(Path(base_dir) / ARTIFACT_FILES[name])
@@ -0,0 +1,166 @@
+"""Offline bulk scorer: the Tab 2 pipeline without a browser.
+
+The input (CSV, Excel, Parquet or Arrow IPC) is read in row shards,
+projected to the model's columns, and scored in a process pool; each
+worker loads the artifacts once. Scored shards are streamed to disk, so
+memory is bounded by the shards in flight whatever the file size.
+Validation, salary mapping, dropping of invalid rows and the risk buckets
+are the same code the Streamlit tab uses, so the output has the same
+columns and values as the in-app download. Run from the repository root::
+
+    python -m attrition.bulk roster.parquet -o scored.csv --workers 8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from attrition.artifacts import ARTIFACT_DIR, load_final_columns, open_artifacts
+from attrition.columnar import TableWriter, convert_table, read_rows, sort_order
+from attrition.scoring import (
+    DEFAULT_CHUNK, DEFAULT_THRESHOLDS, MissingColumnsError, Thresholds, input_columns, prepare_chunk,
+    read_chunks, result_columns, score_chunk,
+)
+
+PROB_COLUMN = "Resign Probability (%)"
+
+_worker = {}
+
+
+def _init_worker(base_dir, thresholds):
+    # The bundle's stored folded booster (see attrition.bundle); nothing is re-folded per worker.
+    bundle = open_artifacts(base_dir)
+    model  = bundle.scoring_model
+    # One booster thread per process; parallelism comes from the pool.
+    model.set_params(n_jobs=1)
+    _worker.update(model=model, scaler=bundle.input_scaler, final_columns=list(bundle.final_columns),
+                   thresholds=thresholds)
+
+
+def _score_shard(df_chunk, row_offset):
+    w = _worker
+    names, df_proc, report = prepare_chunk(df_chunk, w["final_columns"], row_offset=row_offset)
+    if not len(df_proc):
+        return pd.DataFrame(columns=result_columns(w["final_columns"])), len(report)
+    df_out, _ = score_chunk(df_proc, names, w["model"], w["scaler"], w["final_columns"], w["thresholds"])
+    return df_out, len(report)
+
+
+def output_format(path):
+    """``TableWriter`` format for an output path, or ``"excel"``."""
+    suffix = Path(path).suffix.lower()
+    if suffix == ".parquet":
+        return "parquet"
+    if suffix in (".arrow", ".feather"):
+        return "arrow"
+    if suffix in (".xlsx", ".xls"):
+        return "excel"
+    return "csv"
+
+
+def _shards(pool, chunks, workers, log):
+    """Submit shards to ``pool`` and yield ``(df_out, n_skipped)`` in input order.
+
+    At most two shards per worker are read ahead of the one being written,
+    so neither the input nor the results are ever held whole.
+    """
+    in_flight = deque()
+    offset    = 0
+    for df_chunk in chunks:
+        in_flight.append(pool.submit(_score_shard, df_chunk, offset))
+        offset += len(df_chunk)
+        while len(in_flight) >= 2 * workers:
+            yield in_flight.popleft().result()
+        if log is not None:
+            log(f"read {offset:,} rows")
+    while in_flight:
+        yield in_flight.popleft().result()
+
+
+def score_file(input_path, output_path, workers=None, chunksize=DEFAULT_CHUNK, order="risk",
+               thresholds=DEFAULT_THRESHOLDS, base_dir=ARTIFACT_DIR, log=None):
+    """Score ``input_path`` into ``output_path`` and return ``(n_scored, n_skipped)``.
+
+    ``order="input"`` keeps the rows in file order and streams each scored
+    shard straight into the output. ``order="risk"`` sorts by resign
+    probability, highest first (ties keep input order): shards are streamed
+    into a temporary Arrow file next to the output, which is then sorted
+    once with ``sort_order`` and rewritten batch by batch, as the app does
+    for its downloads. Excel output also goes through the temporary file.
+    """
+    workers       = workers or os.cpu_count() or 1
+    fmt           = output_format(output_path)
+    final_columns = load_final_columns(base_dir)
+    direct        = order == "input" and fmt != "excel"
+    if direct:
+        target = output_path
+    else:
+        handle, target = tempfile.mkstemp(suffix=".arrow", dir=Path(output_path).resolve().parent)
+        os.close(handle)
+    scored = skipped = 0
+    done   = False
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(base_dir, thresholds)) as pool, \
+                open(input_path, "rb") as source, \
+                TableWriter(target, fmt if direct else "arrow", result_columns(final_columns)) as writer:
+            chunks = read_chunks(source, str(input_path), chunksize=chunksize, columns=input_columns(final_columns))
+            for df_out, n_skipped in _shards(pool, chunks, workers, log):
+                if len(df_out):
+                    writer.write(df_out)
+                scored  += len(df_out)
+                skipped += n_skipped
+
+        if not direct:
+            rows = sort_order(target, PROB_COLUMN) if order == "risk" else None
+            if fmt == "excel":
+                # Excel caps a sheet at ~1M rows, so one DataFrame is fine here.
+                read_rows(target, np.arange(scored) if rows is None else rows).to_excel(output_path, index=False)
+            else:
+                convert_table(target, output_path, fmt, order=rows, chunksize=chunksize)
+        done = True
+    finally:
+        # The temporary file always goes; a direct output only when scoring failed part-way.
+        if (not direct or not done) and os.path.exists(target):
+            os.unlink(target)
+    return scored, skipped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score an HR export with the attrition model.")
+    parser.add_argument("input", help="CSV, XLSX/XLS, Parquet or Arrow IPC/Feather file")
+    parser.add_argument("-o", "--output", required=True, help="result file (.csv, .parquet, .arrow or .xlsx)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNK, help="rows per shard")
+    parser.add_argument("--order", choices=("risk", "input"), default="risk",
+                        help="sort by resign probability (default) or keep input order")
+    parser.add_argument("--decision", type=float, default=DEFAULT_THRESHOLDS.decision)
+    parser.add_argument("--moderate", type=float, default=DEFAULT_THRESHOLDS.moderate)
+    parser.add_argument("--critical", type=float, default=DEFAULT_THRESHOLDS.critical)
+    args = parser.parse_args(argv)
+
+    thresholds = Thresholds(decision=args.decision, moderate=args.moderate, critical=args.critical)
+    start = time.perf_counter()
+    try:
+        n_scored, n_skipped = score_file(
+            args.input, args.output, workers=args.workers, chunksize=args.chunksize,
+            order=args.order, thresholds=thresholds,
+            log=lambda msg: print(msg, file=sys.stderr, flush=True),
+        )
+    except MissingColumnsError as e:
+        parser.exit(2, f"error: {e}\n")
+    elapsed = time.perf_counter() - start
+    print(f"scored {n_scored:,} rows ({n_skipped:,} skipped) in {elapsed:.1f}s "
+          f"({n_scored / elapsed if elapsed else 0:,.0f} rows/s) -> {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""Versioned model bundle replacing the five loose pickles.
+
+Layout of a bundle directory::
+
+    manifest.json             format version, library versions, columns,
+                              salary classes, forest metadata and a
+                              SHA-256 per file
+    booster.ubj               XGBoost native UBJSON model
+    booster_fused.ubj         the same model with the scaler folded into its
+                              split thresholds (see ``attrition.fusion``)
+    forest_*.npy              CompiledForest node arrays of the model with
+                              the scaler folded in, in the narrowest dtypes
+    scaler_mean.npy           StandardScaler parameters as plain arrays
+    scaler_scale.npy
+    feature_importances.npy
+
+Loading needs no pickle. Arrays are memory-mapped, every file is checked
+against the manifest and shapes are validated against the column list.
+Loading a booster is not faster than unpickling: the XGBoost import (which
+pulls in scikit-learn and SciPy) dominates either way. What the bundle saves
+is work around it. ``open_bundle`` defers that import until a booster is
+actually needed, so single-row scoring through the compiled forest starts
+without it (the app's first prediction shows about 1.2 s after process
+start instead of 2.7 s from the pickles; see ``benchmarks.bench_startup``),
+and the folded booster is read from ``booster_fused.ubj`` instead of being
+re-folded in every process. Build a bundle from the current pickles with::
+
+    python -m attrition.bundle build
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+FORMAT_VERSION  = 2
+FORMAT_VERSIONS = (1, 2)      # readable; v1 predates "precision" and booster_fused.ubj
+BUNDLE_NAME     = "model_bundle"
+MANIFEST        = "manifest.json"
+
+BOOSTER_FILE = "booster.ubj"
+FUSED_FILE   = "booster_fused.ubj"
+ARRAY_FILES  = {
+    "scaler_mean" : "scaler_mean.npy",
+    "scaler_scale": "scaler_scale.npy",
+    "feature_imp" : "feature_importances.npy",
+}
+FOREST_FILES = {
+    name: f"forest_{name}.npy"
+    for name in ("feature", "threshold", "left", "right", "default_left", "value")
+}
+# dtype of the forest's thresholds and leaf values; the booster itself is always float32.
+PRECISIONS        = {"float32": np.float32, "float16": np.float16}
+DEFAULT_PRECISION = "float32"   # what v1 bundles were written with
+
+
+class BundleError(ValueError):
+    """Raised when a bundle is missing files, fails its hash check or is inconsistent."""
+
+
+class ArrayScaler:
+    """``StandardScaler.transform`` over plain mean/scale arrays."""
+
+    def __init__(self, mean, scale, feature_names=None):
+        self.mean_  = mean
+        self.scale_ = scale
+        self.feature_names_in_ = None if feature_names is None else np.asarray(feature_names, dtype=object)
+        self.n_features_in_    = len(mean)
+
+    def transform(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+
+class ArrayLabelEncoder:
+    """``LabelEncoder`` stand-in holding only the fitted classes."""
+
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes)
+
+    def transform(self, values):
+        index = {c: i for i, c in enumerate(self.classes_.tolist())}
+        return np.array([index[v] for v in values])
+
+
+def _sha256(path):
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def _versions():
+    import sklearn
+    import xgboost
+
+    return {"xgboost": xgboost.__version__, "scikit_learn": sklearn.__version__, "numpy": np.__version__}
+
+
+def build_bundle(model, scaler, encoder, feature_imp, final_columns, out_dir, precision="float32"):
+    """Write a bundle for the given artifacts to ``out_dir`` and return its manifest.
+
+    ``precision="float16"`` stores the compiled forest's thresholds and leaf
+    values at half precision; splits then fall on the nearest float16 value.
+    """
+    from attrition.fast_tree import CompiledForest
+    from attrition.fusion import fold_scaler
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    fused  = fold_scaler(model, scaler)
+    forest = CompiledForest.from_model(fused)
+    model.save_model(out_dir / BOOSTER_FILE)
+    fused.save_model(out_dir / FUSED_FILE)
+    for name, filename in FOREST_FILES.items():
+        arr = getattr(forest, name)
+        if arr.dtype.kind == "i":
+            # Smallest signed type that holds every index (node counts are tiny).
+            arr = arr.astype(np.min_scalar_type(-int(arr.max(initial=0)) - 1))
+        elif arr.dtype.kind == "f":
+            arr = arr.astype(PRECISIONS[precision])
+        np.save(out_dir / filename, arr)
+    arrays = {
+        "scaler_mean" : np.asarray(scaler.mean_, dtype=np.float64),
+        "scaler_scale": np.asarray(scaler.scale_, dtype=np.float64),
+        "feature_imp" : np.asarray(feature_imp, dtype=np.float32),
+    }
+    for key, filename in ARRAY_FILES.items():
+        np.save(out_dir / filename, arrays[key])
+
+    files = [BOOSTER_FILE, FUSED_FILE, *ARRAY_FILES.values(), *FOREST_FILES.values()]
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "created"       : datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "versions"      : _versions(),
+        "final_columns" : list(final_columns),
+        "salary_classes": [str(c) for c in getattr(encoder, "classes_", [])],
+        "forest"        : {"base_margin": float(forest.base_margin), "depth": int(forest.depth)},
+        "precision"     : precision,
+        "files"         : {name: _sha256(out_dir / name) for name in files},
+    }
+    (out_dir / MANIFEST).write_text(json.dumps(manifest, indent=2) + "\n")
+    return manifest
+
+
+def read_manifest(bundle_dir):
+    path = Path(bundle_dir) / MANIFEST
+    try:
+        manifest = json.loads(path.read_text())
+    except FileNotFoundError:
+        raise BundleError(f"no manifest at {path}")
+    if manifest.get("format_version") not in FORMAT_VERSIONS:
+        raise BundleError(f"unsupported bundle format {manifest.get('format_version')!r}")
+    manifest.setdefault("precision", DEFAULT_PRECISION)
+    if manifest["precision"] not in PRECISIONS:
+        raise BundleError(f"unknown precision {manifest['precision']!r}; expected one of {', '.join(PRECISIONS)}")
+    return manifest
+
+
+def _load_classifier(path):
+    import xgboost as xgb
+
+    model = xgb.XGBClassifier()
+    model.load_model(path)
+    return model
+
+
+class ModelBundle:
+    """Artifacts of one bundle; the XGBoost booster loads on first access.
+
+    ``forest`` is the compiled, scaler-folded model and scores raw features.
+    ``scoring_model``/``input_scaler`` follow the convention of
+    ``attrition.scoring.model_input``: when the scaler can be folded the
+    booster is folded too and ``input_scaler`` is None.
+    """
+
+    def __init__(self, final_columns, scaler, encoder, feature_imp, forest, model_loader, fused_loader=None):
+        self.final_columns = final_columns
+        self.scaler        = scaler
+        self.encoder       = encoder
+        self.feature_imp   = feature_imp
+        self.forest        = forest
+        self.folded        = forest is not None
+        self._loaders      = {"model": model_loader, "fused": fused_loader or self._fold}
+        self._loaded       = {}
+        self._lock         = threading.RLock()
+
+    @classmethod
+    def from_artifacts(cls, model, scaler, encoder, feature_imp, final_columns):
+        """Bundle already-loaded artifacts (e.g. the pickles), folding and compiling eagerly."""
+        from attrition.fast_tree import CompiledForest
+        from attrition.fusion import fold_scaler
+
+        try:
+            fused  = fold_scaler(model, scaler)
+            forest = CompiledForest.from_model(fused)
+        except ValueError:
+            fused, forest = None, None
+        bundle = cls(list(final_columns), scaler, encoder, feature_imp, forest, lambda: model)
+        bundle._loaded["fused"] = fused
+        return bundle
+
+    def _fold(self):
+        from attrition.fusion import fold_scaler
+
+        return fold_scaler(self.model, self.scaler)
+
+    def _get(self, key):
+        with self._lock:
+            if key not in self._loaded:
+                self._loaded[key] = self._loaders[key]()
+            return self._loaded[key]
+
+    @property
+    def model(self):
+        return self._get("model")
+
+    @property
+    def scoring_model(self):
+        return self._get("fused") if self.folded else self.model
+
+    @property
+    def input_scaler(self):
+        return None if self.folded else self.scaler
+
+    def as_tuple(self):
+        return self.model, self.scaler, self.encoder, self.feature_imp, self.final_columns
+
+
+def open_bundle(bundle_dir, verify=True):
+    """Validate a bundle and return a ``ModelBundle`` without importing XGBoost."""
+    from attrition.fast_tree import CompiledForest
+
+    bundle_dir = Path(bundle_dir)
+    manifest   = read_manifest(bundle_dir)
+    for name, digest in manifest["files"].items():
+        path = bundle_dir / name
+        if not path.exists():
+            raise BundleError(f"bundle file missing: {name}")
+        if verify and _sha256(path) != digest:
+            raise BundleError(f"hash mismatch for {name}; the bundle is corrupt or out of sync")
+
+    final_columns = list(manifest["final_columns"])
+    n_features    = len(final_columns)
+    arrays = {key: np.load(bundle_dir / filename, mmap_mode="r") for key, filename in ARRAY_FILES.items()}
+    for key, arr in arrays.items():
+        if arr.shape != (n_features,):
+            raise BundleError(f"{key} has shape {arr.shape}, expected ({n_features},)")
+
+    nodes  = {name: np.load(bundle_dir / filename, mmap_mode="r") for name, filename in FOREST_FILES.items()}
+    shapes = {arr.shape for arr in nodes.values()}
+    n_nodes = nodes["feature"].shape[-1]
+    if (len(shapes) != 1 or int(nodes["feature"].max(initial=0)) >= n_features
+            or max(int(nodes["left"].max(initial=0)), int(nodes["right"].max(initial=0))) >= n_nodes):
+        raise BundleError("forest arrays are inconsistent with each other or with final_columns")
+    dtype = np.dtype(PRECISIONS[manifest["precision"]])
+    for name in ("threshold", "value"):
+        if nodes[name].dtype != dtype:
+            raise BundleError(f"forest_{name}.npy is {nodes[name].dtype}, manifest precision is {dtype}")
+    forest = CompiledForest(**nodes, **manifest["forest"])
+
+    return ModelBundle(
+        final_columns,
+        ArrayScaler(arrays["scaler_mean"], arrays["scaler_scale"], final_columns),
+        ArrayLabelEncoder(manifest["salary_classes"]),
+        arrays["feature_imp"],
+        forest,
+        lambda: _load_classifier(bundle_dir / BOOSTER_FILE),
+        # Bundles built before booster_fused.ubj existed fold the booster on first use.
+        (lambda: _load_classifier(bundle_dir / FUSED_FILE)) if FUSED_FILE in manifest["files"] else None,
+    )
+
+
+def load_bundle(bundle_dir, verify=True):
+    """Return ``(model, scaler, encoder, feature_imp, final_columns)`` from a bundle."""
+    bundle = open_bundle(bundle_dir, verify=verify)
+    model  = bundle.model
+    if model.n_features_in_ != len(bundle.final_columns):
+        raise BundleError(f"booster expects {model.n_features_in_} features, "
+                          f"manifest lists {len(bundle.final_columns)}")
+    return bundle.as_tuple()
+
+
+def main(argv=None):
+    from attrition.artifacts import ARTIFACT_DIR, load_pickles
+
+    parser = argparse.ArgumentParser(description="Build or check the model bundle.")
+    sub    = parser.add_subparsers(dest="command", required=True)
+    build  = sub.add_parser("build", help="convert the five pickles into a bundle")
+    build.add_argument("--src", default=str(ARTIFACT_DIR), help="directory holding the pickles")
+    build.add_argument("--out", default=str(ARTIFACT_DIR / BUNDLE_NAME))
+    check  = sub.add_parser("check", help="validate a bundle and compare load time with the pickles")
+    check.add_argument("--bundle", default=str(ARTIFACT_DIR / BUNDLE_NAME))
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        manifest = build_bundle(*load_pickles(args.src), args.out)
+        print(f"wrote {args.out} ({len(manifest['files'])} files, format v{manifest['format_version']})")
+        return
+
+    start  = time.perf_counter()
+    bundle = open_bundle(args.bundle)
+    opened = time.perf_counter() - start
+    model, _, _, _, final_columns = load_bundle(args.bundle)
+    print(f"bundle ok: {len(final_columns)} features, {bundle.forest.n_trees} trees; "
+          f"opened in {opened * 1e3:.1f} ms, full load {(time.perf_counter() - start - opened) * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Parquet and Arrow IPC input/output for the batch path.
+
+Readers project the file down to the columns scoring needs before anything
+is decoded, and hand pandas the Arrow buffers directly: null-free numeric
+columns become zero-copy NumPy views, so the only copy on the way to the
+model is the one into its float32 feature matrix. ``TableWriter`` streams
+scored chunks to CSV, Parquet or Arrow IPC, and ``convert_table`` turns a
+stored Arrow result into any of the download formats batch by batch,
+optionally in the row order computed once by ``sort_order``.
+"""
+import csv
+import os
+
+import numpy as np
+import pandas as pd
+
+EXPORT_FORMATS = {
+    # key: (file suffix, MIME type)
+    "csv"    : (".csv", "text/csv"),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+    "arrow"  : (".arrow", "application/vnd.apache.arrow.file"),
+}
+IPC_SUFFIXES = (".arrow", ".feather", ".ipc")
+
+
+def arrow_frame(batch):
+    """DataFrame over a ``RecordBatch``; null-free numeric columns are not copied."""
+    import pyarrow as pa
+
+    data = {}
+    for name, col in zip(batch.schema.names, batch.columns):
+        if col.null_count == 0 and (pa.types.is_integer(col.type) or pa.types.is_floating(col.type)):
+            data[name] = col.to_numpy(zero_copy_only=True)
+        else:
+            data[name] = col.to_pandas()
+    return pd.DataFrame(data, copy=False)
+
+
+def _present(names, columns):
+    return None if columns is None else [c for c in names if c in set(columns)]
+
+
+def parquet_chunks(source, chunksize, columns=None):
+    import pyarrow.parquet as pq
+
+    with pq.ParquetFile(source) as pf:
+        for batch in pf.iter_batches(batch_size=chunksize, columns=_present(pf.schema_arrow.names, columns)):
+            yield arrow_frame(batch)
+
+
+def _ipc_reader(source):
+    import pyarrow as pa
+
+    try:
+        reader = pa.ipc.open_file(source)
+        return (reader.get_batch(i) for i in range(reader.num_record_batches)), reader.schema
+    except pa.ArrowInvalid:
+        # Not the random-access file format; try the streaming format.
+        source.seek(0)
+        reader = pa.ipc.open_stream(source)
+        return iter(reader), reader.schema
+
+
+def ipc_chunks(source, chunksize, columns=None):
+    """Yield an Arrow IPC file or stream (incl. Feather v2) as DataFrames."""
+    batches, schema = _ipc_reader(source)
+    keep = _present(schema.names, columns)
+    for batch in batches:
+        if keep is not None:
+            batch = batch.select(keep)
+        for start in range(0, batch.num_rows, chunksize):
+            yield arrow_frame(batch.slice(start, chunksize))
+
+
+class TableWriter:
+    """Append DataFrames with identical columns to one CSV, Parquet or Arrow IPC file.
+
+    CSV goes through ``DataFrame.to_csv``, so its text matches the in-app
+    export byte for byte; for CSV ``path`` may also be an open text stream,
+    which is left open. The header or Arrow schema is fixed by the first
+    chunk (``columns`` is only used for an empty result), with all-null
+    columns widened to strings so later chunks still fit.
+    """
+
+    def __init__(self, path, fmt, columns):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"unknown export format {fmt!r}; expected one of {', '.join(EXPORT_FORMATS)}")
+        self.path    = path
+        self.fmt     = fmt
+        self.columns = list(columns)
+        self._owns   = not hasattr(path, "write")
+        self._file   = None
+        self._writer = None
+        self._schema = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _open(self, df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.Schema.from_pandas(df, preserve_index=False)
+        self._schema = pa.schema([
+            f.with_type(pa.string()) if pa.types.is_null(f.type) else f for f in schema
+        ]).remove_metadata()
+        if self.fmt == "parquet":
+            self._writer = pq.ParquetWriter(self.path, self._schema)
+        else:
+            self._writer = pa.ipc.new_file(self.path, self._schema)
+
+    def write(self, df):
+        if self.fmt == "csv":
+            if self._file is None:
+                self._file = open(self.path, "w", encoding="utf-8", newline="") if self._owns else self.path
+                csv.writer(self._file, lineterminator="\n").writerow(df.columns)
+            df.to_csv(self._file, header=False, index=False)
+            return
+
+        import pyarrow as pa
+
+        if self._writer is None:
+            self._open(df)
+        self._writer.write_table(pa.Table.from_pandas(df, schema=self._schema, preserve_index=False))
+
+    def close(self):
+        if self.fmt == "csv":
+            if self._file is None:
+                self.write(pd.DataFrame(columns=self.columns))
+            if self._owns:
+                self._file.close()
+            return
+        if self._writer is None:
+            self._open(pd.DataFrame({c: pd.Series(dtype=object) for c in self.columns}))
+        self._writer.close()
+
+
+def _open_table(arrow_path):
+    import pyarrow as pa
+
+    # Memory-mapped, so read_all() maps the file instead of copying it.
+    return pa.ipc.open_file(pa.memory_map(str(arrow_path))).read_all()
+
+
+def sort_order(arrow_path, column, descending=True):
+    """Row order of a stored Arrow result by ``column``; ties keep file order."""
+    values = _open_table(arrow_path).column(column).to_numpy()
+    return np.argsort(-values if descending else values, kind="stable")
+
+
+def read_column(arrow_path, column):
+    """One column of a stored Arrow result as a Series (categoricals stay categorical)."""
+    return _open_table(arrow_path).column(column).to_pandas()
+
+
+def read_columns(arrow_path, names):
+    """Columns of a stored Arrow result as a DataFrame, in the order given.
+
+    Names missing from the file are skipped, as with the chunk readers'
+    ``columns``; categoricals stay categorical.
+    """
+    table = _open_table(arrow_path)
+    return table.select([c for c in names if c in set(table.schema.names)]).to_pandas()
+
+
+def read_rows(arrow_path, rows):
+    """The given rows of a stored Arrow result, in that order, as a DataFrame."""
+    return _open_table(arrow_path).take(np.asarray(rows)).to_pandas()
+
+
+def replace_columns(arrow_path, columns):
+    """Replace whole columns of a stored Arrow result in place (written to a temp file, then swapped).
+
+    ``columns`` maps existing column names to Series or arrays of the same
+    length; the other columns are copied unchanged.
+    """
+    import pyarrow as pa
+
+    table = _open_table(arrow_path)
+    for name, values in columns.items():
+        table = table.set_column(table.schema.get_field_index(name), name, pa.array(values))
+    tmp = f"{arrow_path}.tmp"
+    with pa.ipc.new_file(tmp, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, arrow_path)
+
+
+def convert_table(arrow_path, out_path, fmt, order=None, chunksize=50_000):
+    """Rewrite a stored Arrow IPC result as ``fmt``, ``chunksize`` rows at a time.
+
+    With ``order`` (e.g. from ``sort_order``) the rows are written in that order.
+    """
+    table = _open_table(arrow_path)
+    if order is None:
+        order = np.arange(table.num_rows)
+    with TableWriter(out_path, fmt, table.schema.names) as writer:
+        for start in range(0, len(order), chunksize):
+            writer.write(table.take(order[start:start + chunksize]).to_pandas())
+    return out_path
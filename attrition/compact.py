@@ -0,0 +1,261 @@
+"""Compact model variants and the accuracy / size / latency trade-off between them.
+
+Starting from the current artifacts, the tool writes one bundle per variant
+and a ``compaction_report.json`` next to them::
+
+    python -m attrition.compact HR_comma_sep.csv --out model_variants --gains 1 5 --float16
+
+Variants, each built on the previous step:
+
+``original``
+    The model as trained.
+``truncated``
+    The first ``n`` trees, where ``n`` is the booster's ``best_iteration``
+    when it was trained with early stopping. Otherwise ``n`` is the smallest
+    prefix whose validation ROC-AUC is within ``tolerance`` of the best
+    prefix.
+``pruned_g<gain>``
+    Starting from the truncated model, every split whose two children are
+    leaves and whose loss reduction (``loss_changes``) is below ``gain`` is
+    collapsed into a leaf. This repeats bottom-up until no such split is
+    left. The new leaf takes the node's own weight (``base_weights`` times
+    the learning rate), as XGBoost's ``prune`` updater does.
+``…_f16``
+    The same booster, with the compiled forest (the single-row fast path)
+    stored as float16.
+
+Validation and test rows are the ``attrition.train`` splits of the dataset
+(same seed), so a model trained with ``python -m attrition.train`` is
+evaluated on the rows it never saw. Every variant is reloaded from its
+bundle the way the app loads it. The report lists ROC-AUC for the batch path
+(booster) and the single-row path (compiled forest), the bundle size, load
+times, and single-row and batch per-row latency. Point the app at a variant
+with ``ATTRITION_MODEL_BUNDLE=model_variants/pruned_g1``.
+"""
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+
+import numpy as np
+
+from attrition.artifacts import ARTIFACT_DIR, load_pickles
+from attrition.bundle import build_bundle, load_bundle, open_bundle
+from attrition.train import DEFAULT_SEED, DEFAULT_SPLITS, load_dataset, split
+
+REPORT_NAME       = "compaction_report.json"
+DEFAULT_GAINS     = (1.0,)
+DEFAULT_TOLERANCE = 0.0005
+LATENCY_CALLS     = 200
+
+LEAF = -1
+# Per-node arrays of XGBoost's JSON tree format, renumbered together when pruning.
+NODE_FIELDS = ("base_weights", "default_left", "loss_changes", "split_conditions", "split_indices",
+               "split_type", "sum_hessian")
+
+
+def _trees(doc):
+    return doc["learner"]["gradient_booster"]["model"]["trees"]
+
+
+def _load(model, raw):
+    """An estimator of ``model``'s type loaded from a saved booster, the way ``bundle`` loads one."""
+    clf = type(model)()
+    clf.load_model(bytearray(raw))
+    return clf
+
+
+def _from_json(model, doc):
+    return _load(model, json.dumps(doc).encode())
+
+
+def staged_auc(model, X, y):
+    """Validation ROC-AUC of every prefix ``model[:k]``, k = 1 … n_trees."""
+    import xgboost as xgb
+    from sklearn.metrics import roc_auc_score
+
+    booster = model.get_booster()
+    dmatrix = xgb.DMatrix(X)
+    return np.array([roc_auc_score(y, booster.predict(dmatrix, iteration_range=(0, k), output_margin=True))
+                     for k in range(1, booster.num_boosted_rounds() + 1)])
+
+
+def best_iteration(model, X_val=None, y_val=None, tolerance=DEFAULT_TOLERANCE):
+    """Number of trees to keep: the early-stopping best iteration, else chosen on validation data."""
+    booster = model.get_booster()
+    if "best_iteration" in booster.attributes():
+        return int(booster.attributes()["best_iteration"]) + 1
+    if X_val is None:
+        return booster.num_boosted_rounds()
+    auc = staged_auc(model, X_val, y_val)
+    return int(np.argmax(auc >= auc.max() - tolerance)) + 1
+
+
+def truncate(model, n_trees):
+    return _load(model, model.get_booster()[:n_trees].save_raw("ubj"))
+
+
+def learning_rate(model):
+    config = json.loads(model.get_booster().save_config())
+    return float(config["learner"]["gradient_booster"]["tree_train_param"]["eta"])
+
+
+def prune_tree(tree, min_gain, eta):
+    """Collapse low-gain splits of one JSON tree in place; returns the number of nodes removed."""
+    left  = np.asarray(tree["left_children"])
+    right = np.asarray(tree["right_children"])
+    gain  = np.asarray(tree["loss_changes"], dtype=np.float64)
+    leaf  = left == LEAF
+    # Children always have larger ids than their parent, so one reverse sweep
+    # sees a node only after everything below it has been decided.
+    for node in range(len(left) - 1, -1, -1):
+        if not leaf[node] and leaf[left[node]] and leaf[right[node]] and gain[node] < min_gain:
+            leaf[node] = True
+    keep  = np.zeros(len(left), dtype=bool)
+    stack = [0]
+    while stack:
+        node = stack.pop()
+        keep[node] = True
+        if not leaf[node]:
+            stack += [int(left[node]), int(right[node])]
+    removed = int((~keep).sum())
+    if not removed:
+        return 0
+
+    old_ids = np.flatnonzero(keep)
+    new_id  = np.full(len(left), LEAF)
+    new_id[old_ids] = np.arange(len(old_ids))
+    collapsed = leaf[old_ids] & (left[old_ids] != LEAF)
+    for name in NODE_FIELDS:
+        tree[name] = [tree[name][i] for i in old_ids]
+    for i in np.flatnonzero(collapsed):
+        # Inner nodes store the unscaled weight; leaves store weight × eta.
+        tree["base_weights"][i]     = tree["base_weights"][i] * eta
+        tree["split_conditions"][i] = tree["base_weights"][i]
+        tree["split_indices"][i]    = 0
+        tree["loss_changes"][i]     = 0.0
+        tree["default_left"][i]     = 0
+    tree["left_children"]  = [int(new_id[left[i]]) if not leaf[i] else LEAF for i in old_ids]
+    tree["right_children"] = [int(new_id[right[i]]) if not leaf[i] else LEAF for i in old_ids]
+    # The root (always node 0, always kept) keeps XGBoost's "no parent" marker.
+    parents = np.asarray(tree["parents"])[old_ids]
+    tree["parents"] = [int(parents[0])] + [int(new_id[p]) for p in parents[1:]]
+    tree["tree_param"]["num_nodes"] = str(len(old_ids))
+    return removed
+
+
+def prune(model, min_gain):
+    """Copy of ``model`` with every low-gain leaf split collapsed; also returns the nodes removed."""
+    doc     = json.loads(model.get_booster().save_raw("json"))
+    eta     = learning_rate(model)
+    removed = sum(prune_tree(tree, min_gain, eta) for tree in _trees(doc))
+    return _from_json(model, doc), removed
+
+
+def _n_nodes(model):
+    return sum(len(t["left_children"]) for t in _trees(json.loads(model.get_booster().save_raw("json"))))
+
+
+def _dir_size(path):
+    return sum(f.stat().st_size for f in Path(path).iterdir() if f.is_file())
+
+
+def measure(path, X_test, y_test, calls=LATENCY_CALLS):
+    """Load a bundle like the app does and time it; ROC-AUC on the test rows."""
+    from sklearn.metrics import roc_auc_score
+
+    start  = time.perf_counter()
+    bundle = open_bundle(path)
+    opened = time.perf_counter() - start
+    start  = time.perf_counter()
+    load_bundle(path)
+    loaded = time.perf_counter() - start
+
+    model  = bundle.scoring_model        # folded booster, raw features in
+    forest = bundle.forest
+    X_in   = X_test.astype(np.float32)
+    start  = time.perf_counter()
+    probas = model.predict_proba(X_in)[:, 1]
+    batch  = time.perf_counter() - start
+    row    = X_in[:1]
+    forest.predict_proba(row)
+    single = []
+    for _ in range(calls):
+        t = time.perf_counter()
+        forest.predict_proba(row)
+        single.append(time.perf_counter() - t)
+    return {
+        "roc_auc"          : round(float(roc_auc_score(y_test, probas)), 5),
+        "forest_roc_auc"   : round(float(roc_auc_score(y_test, forest.predict_proba(X_in)[:, 1])), 5),
+        "bundle_bytes"     : _dir_size(path),
+        "open_ms"          : round(opened * 1e3, 2),
+        "load_ms"          : round(loaded * 1e3, 2),
+        "single_row_us"    : round(statistics.median(single) * 1e6, 1),
+        "batch_per_row_us" : round(batch / len(X_in) * 1e6, 3),
+        "depth"            : int(forest.depth),
+    }
+
+
+def compact(data_path, out_dir, gains=DEFAULT_GAINS, float16=False, tolerance=DEFAULT_TOLERANCE,
+            base_dir=ARTIFACT_DIR, seed=DEFAULT_SEED):
+    """Write every variant bundle to ``out_dir`` and return the report."""
+    model, scaler, encoder, feature_imp, final_columns = load_pickles(base_dir)
+    X, y, _, _ = load_dataset(data_path, list(final_columns))
+    _, val_idx, test_idx = split(y, DEFAULT_SPLITS, seed)
+    X_val = (X[val_idx] - scaler.mean_) / scaler.scale_     # the unfolded model scores scaled rows
+
+    n_trees  = best_iteration(model, X_val, y[val_idx], tolerance)
+    variants = {"original": model, "truncated": truncate(model, n_trees)}
+    removed  = {"original": 0, "truncated": 0}
+    for gain in gains:
+        name = f"pruned_g{gain:g}"
+        variants[name], removed[name] = prune(variants["truncated"], gain)
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    builds = [(name, m, "float32") for name, m in variants.items()]
+    if float16:
+        builds += [(f"{name}_f16", m, "float16") for name, m in variants.items() if name != "original"]
+
+    rows = []
+    for name, variant, precision in builds:
+        imp = feature_imp if variant is model else variant.feature_importances_
+        build_bundle(variant, scaler, encoder, imp, final_columns, out_dir / name, precision=precision)
+        rows.append({"variant": name, "trees": variant.get_booster().num_boosted_rounds(),
+                     "nodes": _n_nodes(variant), "nodes_pruned": removed[name.removesuffix("_f16")],
+                     "precision": precision, **measure(out_dir / name, X[test_idx], y[test_idx])})
+
+    report = {
+        "dataset"  : {"path": str(data_path), "validation_rows": len(val_idx), "test_rows": len(test_idx),
+                      "seed": seed},
+        "tolerance": tolerance,
+        "gains"    : list(gains),
+        "variants" : rows,
+    }
+    (out_dir / REPORT_NAME).write_text(json.dumps(report, indent=2) + "\n")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write compacted model variants and compare them.")
+    parser.add_argument("data", help="labelled dataset with a 'left' column (csv/xlsx/parquet/arrow)")
+    parser.add_argument("--out", default=str(ARTIFACT_DIR / "model_variants"))
+    parser.add_argument("--gains", type=float, nargs="+", default=list(DEFAULT_GAINS),
+                        help="loss-change thresholds below which leaf splits are collapsed")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="validation ROC-AUC a truncated ensemble may give up")
+    parser.add_argument("--float16", action="store_true", help="also write float16 forest variants")
+    args = parser.parse_args(argv)
+
+    report = compact(args.data, args.out, args.gains, args.float16, args.tolerance)
+    cols   = ["variant", "trees", "nodes", "roc_auc", "forest_roc_auc", "bundle_bytes", "open_ms", "load_ms",
+              "single_row_us", "batch_per_row_us"]
+    print("  ".join(f"{c:>16}" for c in cols))
+    for row in report["variants"]:
+        print("  ".join(f"{row[c]:>16}" for c in cols))
+    print(f"report: {Path(args.out) / REPORT_NAME}")
+
+
+if __name__ == "__main__":
+    main()
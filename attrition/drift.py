@@ -0,0 +1,246 @@
+"""Feature and prediction drift against the population the model was trained on.
+
+A ``DriftSketch`` is a fixed-edge histogram per model feature plus one of
+the resign probability: a few hundred integers, never raw rows. Because
+every sketch uses the same edges (``FEATURE_EDGES``, stored in the file as
+well), sketches merge by adding counts. A batch is therefore sketched chunk
+by chunk while it is scored, and comparing it with the reference costs
+O(bins) per feature whatever the number of rows.
+
+The reference sketch is written by ``python -m attrition.train`` (or built
+from the training data with ``python -m attrition.drift build``) next to the
+artifacts. Per feature ``compare`` reports
+
+* PSI, ``Σ (c − r) · ln(c / r)`` over the bin shares. Below 0.1 is
+  ``STABLE``, 0.1–0.25 ``WATCH`` and above that ``DRIFT``.
+* KS, the largest gap between the two binned CDFs. This is a lower bound of
+  the exact two-sample statistic.
+"""
+import argparse
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from attrition.artifacts import ARTIFACT_DIR
+
+REFERENCE_ENV     = "ATTRITION_DRIFT_REFERENCE"
+REFERENCE_FILE    = "drift_reference.json"
+DEFAULT_REFERENCE = ARTIFACT_DIR / REFERENCE_FILE
+FORMAT_VERSION    = 1
+
+SCORE = "resign_probability"
+
+# Interior bin edges; values below the first or above the last edge fall in
+# the two open-ended bins, so out-of-range batches still register.
+FEATURE_EDGES = {
+    "satisfaction_level"   : tuple(np.round(np.arange(0.05, 0.951, 0.05), 2)),
+    "last_evaluation"      : tuple(np.round(np.arange(0.05, 0.951, 0.05), 2)),
+    "number_project"       : (3, 4, 5, 6, 7),
+    "average_montly_hours" : tuple(range(100, 301, 20)),
+    "time_spend_company"   : (3, 4, 5, 6, 7, 8, 9, 10),
+    "salary"               : (1, 2),
+    "Work_accident"        : (1,),
+    "promotion_last_5years": (1,),
+    SCORE                  : tuple(np.round(np.arange(0.05, 0.951, 0.05), 2)),
+}
+
+PSI_WATCH = 0.1
+PSI_DRIFT = 0.25
+STATUSES  = ("STABLE", "WATCH", "DRIFT")
+EPSILON   = 1e-4    # share floor for empty bins, keeps PSI finite
+
+
+def reference_path():
+    return Path(os.environ.get(REFERENCE_ENV, DEFAULT_REFERENCE))
+
+
+def bin_labels(edges):
+    """Readable label per bin, including the two open-ended ones."""
+    edges = [f"{e:g}" for e in edges]
+    return [f"<{edges[0]}", *(f"{a}–{b}" for a, b in zip(edges, edges[1:])), f"≥{edges[-1]}"]
+
+
+def _codes(values, edges):
+    return np.searchsorted(edges, values, side="right")
+
+
+@dataclass
+class DriftSketch:
+    """Mergeable per-feature histograms of a scored population."""
+
+    edges : dict = field(default_factory=lambda: {k: np.asarray(v, dtype=np.float64)
+                                                  for k, v in FEATURE_EDGES.items()})
+    counts: dict = None
+    rows  : int  = 0
+    source: str  = ""
+
+    def __post_init__(self):
+        if self.counts is None:
+            self.counts = {k: np.zeros(len(v) + 1, dtype=np.int64) for k, v in self.edges.items()}
+
+    def update(self, df_proc, probas):
+        """Add a chunk: encoded features (as from ``prepare_chunk``) and their probabilities."""
+        for name, edges in self.edges.items():
+            if name == SCORE:
+                values = probas
+            elif name in df_proc.columns:
+                values = df_proc[name].to_numpy(dtype=np.float64)
+            else:
+                continue
+            self.counts[name] += np.bincount(_codes(values, edges), minlength=len(edges) + 1)
+        self.rows += len(probas)
+
+    def merge(self, other):
+        _check_edges(self, other)
+        for name in self.counts:
+            self.counts[name] = self.counts[name] + other.counts[name]
+        self.rows += other.rows
+        return self
+
+    def shares(self, name):
+        counts = self.counts[name]
+        return counts / max(int(counts.sum()), 1)
+
+    def to_dict(self):
+        return {
+            "version" : FORMAT_VERSION,
+            "rows"    : self.rows,
+            "source"  : self.source,
+            "created" : date.today().isoformat(),
+            "features": {name: {"edges": self.edges[name].tolist(), "counts": self.counts[name].tolist()}
+                         for name in self.edges},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"unsupported drift sketch version {data.get('version')!r}")
+        features = data["features"]
+        return cls(edges={k: np.asarray(v["edges"], dtype=np.float64) for k, v in features.items()},
+                   counts={k: np.asarray(v["counts"], dtype=np.int64) for k, v in features.items()},
+                   rows=int(data["rows"]), source=data.get("source", ""))
+
+    def save(self, path):
+        """Write the sketch as JSON, atomically."""
+        path = Path(path)
+        tmp  = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(self.to_dict(), indent=1) + "\n")
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        return cls.from_dict(json.loads(Path(path).read_text()))
+
+
+def load_reference(path=None):
+    """The reference sketch, or None when none has been written."""
+    path = Path(path) if path is not None else reference_path()
+    return DriftSketch.load(path) if path.exists() else None
+
+
+def _check_edges(a, b, names=None):
+    for name in names or a.edges:
+        if name not in b.edges or not np.array_equal(a.edges[name], b.edges[name]):
+            raise ValueError(f"sketches use different bins for {name!r}")
+
+
+def psi(reference, current):
+    """Population stability index of two histograms (counts or shares) with equal bins."""
+    r = np.maximum(np.asarray(reference, dtype=np.float64) / max(np.sum(reference), 1), EPSILON)
+    c = np.maximum(np.asarray(current, dtype=np.float64) / max(np.sum(current), 1), EPSILON)
+    return float(np.sum((c - r) * np.log(c / r)))
+
+
+def ks(reference, current):
+    """Largest gap between the binned CDFs of two histograms with equal bins."""
+    r = np.cumsum(reference) / max(np.sum(reference), 1)
+    c = np.cumsum(current) / max(np.sum(current), 1)
+    return float(np.max(np.abs(c - r)))
+
+
+def status(value):
+    return STATUSES[int(np.searchsorted([PSI_WATCH, PSI_DRIFT], value, side="right"))]
+
+
+def compare(reference, current):
+    """PSI, KS and status per feature (and the score), largest PSI first."""
+    names = [n for n in current.edges if n in reference.edges and current.counts[n].sum()]
+    _check_edges(current, reference, names)
+    rows = []
+    for name in names:
+        value = psi(reference.counts[name], current.counts[name])
+        rows.append({"Feature": name, "PSI": round(value, 4),
+                     "KS": round(ks(reference.counts[name], current.counts[name]), 4), "Status": status(value)})
+    return pd.DataFrame(rows, columns=["Feature", "PSI", "KS", "Status"]).sort_values(
+        "PSI", ascending=False, ignore_index=True)
+
+
+def report(reference, current):
+    """JSON-serialisable drift report: the comparison plus both histograms per feature."""
+    table = compare(reference, current)
+    return {
+        "reference" : {"rows": reference.rows, "source": reference.source},
+        "current"   : {"rows": current.rows, "source": current.source},
+        "thresholds": {"watch": PSI_WATCH, "drift": PSI_DRIFT},
+        "drifted"   : table.loc[table["Status"] == "DRIFT", "Feature"].tolist(),
+        "features"  : [
+            {**row, "edges": current.edges[row["Feature"]].tolist(),
+             "reference_share": reference.shares(row["Feature"]).round(6).tolist(),
+             "current_share"  : current.shares(row["Feature"]).round(6).tolist()}
+            for row in table.to_dict("records")
+        ],
+    }
+
+
+def sketch_file(path, chunksize=100_000):
+    """Score a dataset file with the app's model and return its sketch."""
+    from attrition.artifacts import open_artifacts
+    from attrition.scoring import model_input, prepare_chunk, read_chunks
+
+    bundle = open_artifacts()
+    model  = bundle.scoring_model
+    path   = Path(path)
+    sketch = DriftSketch(source=path.name)
+    offset = 0
+    with open(path, "rb") as source:
+        for df_chunk in read_chunks(source, path.name, chunksize, columns=bundle.final_columns):
+            _, df_proc, _ = prepare_chunk(df_chunk, bundle.final_columns, row_offset=offset)
+            offset += len(df_chunk)
+            if len(df_proc):
+                probas = model.predict_proba(model_input(df_proc, bundle.input_scaler))[:, 1]
+                sketch.update(df_proc, probas)
+    return sketch
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a drift reference or report drift against it.")
+    sub    = parser.add_subparsers(dest="command", required=True)
+    build  = sub.add_parser("build", help="sketch the training data as the drift reference")
+    build.add_argument("data", help="dataset file (csv/xlsx/parquet/arrow)")
+    build.add_argument("--out", default=None, help=f"reference file (default: {reference_path()})")
+    check  = sub.add_parser("report", help="print the JSON drift report of a file against the reference")
+    check.add_argument("data")
+    check.add_argument("--reference", default=None)
+    args = parser.parse_args(argv)
+
+    sketch = sketch_file(args.data)
+    if args.command == "build":
+        out = Path(args.out) if args.out else reference_path()
+        sketch.save(out)
+        print(f"{sketch.rows:,} rows sketched → {out}")
+        return
+    reference = load_reference(args.reference)
+    if reference is None:
+        raise SystemExit("no drift reference; run `python -m attrition.drift build` first")
+    json.dump(report(reference, sketch), sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
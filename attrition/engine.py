@@ -0,0 +1,166 @@
+"""Headless scoring engine shared by the HTTP service and offline tools.
+
+``ScoringEngine`` opens the model bundle once (see ``attrition.bundle``):
+the compiled, scaler-folded forest serves small requests and the folded
+booster loads on first use, as does the SHAP explainer. Records (dicts) and
+DataFrames go through the same ``prepare_chunk`` as batch uploads, and
+records are checked against the same ``VALID_RANGES`` and ``INTEGER_COLUMNS``,
+rejected ones with the same ``validate_chunk`` report. No Streamlit dependency.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from attrition.artifacts import ARTIFACT_DIR, open_artifacts
+from attrition.explain import build_explainer, shap_matrix
+from attrition.scoring import (
+    DEFAULT_THRESHOLDS, INTEGER_COLUMNS, NAME_COLUMN, SALARY_MAP, VALID_RANGES, MissingColumnsError, model_input,
+    prepare_chunk, score, validate_chunk,
+)
+
+# Below this many rows the compiled forest beats the booster (see benchmarks/bench_compiled.py).
+FAST_PATH_MAX_ROWS = 32
+
+
+class InvalidRowsError(ValueError):
+    """Raised when records have empty, unparseable or out-of-range feature values.
+
+    ``report`` is the per-column report of ``validate_chunk`` (1-based
+    ``Baris``); ``rows`` holds the 0-based indices of the rejected records.
+    """
+
+    def __init__(self, report):
+        self.report = report
+        self.rows   = (report["Baris"].to_numpy() - 1).tolist()
+        super().__init__(f"invalid or missing feature values in rows: {self.rows[:20]}")
+
+    def problems(self):
+        """One ``{"row", "name", "errors": {column: problem}}`` dict per rejected record."""
+        columns = self.report.columns[2:]
+        return [
+            {
+                "row"   : row,
+                "name"  : None if pd.isna(name) else str(name),
+                "errors": {col: msg for col, msg in zip(columns, messages) if msg},
+            }
+            for row, name, *messages in zip(self.rows, self.report.iloc[:, 1], *(self.report[c] for c in columns))
+        ]
+
+
+class ScoringEngine:
+    def __init__(self, base_dir=ARTIFACT_DIR, thresholds=DEFAULT_THRESHOLDS):
+        self.bundle        = open_artifacts(base_dir)
+        self.final_columns = list(self.bundle.final_columns)
+        self.thresholds    = thresholds
+        self.fast_model    = self.bundle.forest
+        self._lo, self._hi = np.array([VALID_RANGES.get(c, (-np.inf, np.inf)) for c in self.final_columns]).T
+        self._integral     = np.isin(self.final_columns, INTEGER_COLUMNS)
+        self._explainer      = None
+        self._explainer_lock = threading.Lock()
+
+    @property
+    def scoring_model(self):
+        return self.bundle.scoring_model
+
+    @property
+    def input_scaler(self):
+        return self.bundle.input_scaler
+
+    @property
+    def explainer(self):
+        with self._explainer_lock:
+            if self._explainer is None:
+                self._explainer = build_explainer(self.scoring_model)
+            return self._explainer
+
+    def features(self, data):
+        """Validate records or a DataFrame and return the encoded ``(n, 8)`` feature matrix."""
+        if isinstance(data, pd.DataFrame):
+            _, df_proc, report = prepare_chunk(data.reset_index(drop=True), self.final_columns)
+            if len(report):
+                raise InvalidRowsError(report)
+            return df_proc.to_numpy(dtype=np.float64)
+        X = self._record_features(data)
+        with np.errstate(invalid="ignore"):
+            bad = np.isnan(X) | (X < self._lo) | (X > self._hi) | (self._integral & (X != np.round(X)))
+        if bad.any():
+            # Only a rejected request pays for a DataFrame: the report comes from validate_chunk.
+            raw   = pd.DataFrame({col: [r[col] for r in data] for col in self.final_columns}, dtype=object)
+            names = np.array(self.names(data, len(X)), dtype=object)
+            _, report = validate_chunk(pd.DataFrame(X, columns=self.final_columns), raw, names)
+            raise InvalidRowsError(report)
+        return X
+
+    def _record_features(self, records):
+        # Plain loop: for the handful of rows in an API request this is far
+        # cheaper than building and coercing a DataFrame.
+        missing = [c for c in self.final_columns if any(c not in r for r in records)]
+        if missing:
+            raise MissingColumnsError(missing)
+        X = np.empty((len(records), len(self.final_columns)), dtype=np.float64)
+        for i, r in enumerate(records):
+            for j, col in enumerate(self.final_columns):
+                v = r[col]
+                if col == "salary" and isinstance(v, str):
+                    # A label, or an already encoded code sent as a string ("1").
+                    v = SALARY_MAP.get(v.lower(), v)
+                X[i, j] = _to_float(v)
+        return X
+
+    def names(self, data, n_rows):
+        if isinstance(data, pd.DataFrame):
+            if NAME_COLUMN in data.columns:
+                names = data[NAME_COLUMN].astype(object)
+                return names.where(names.notna(), None).tolist()
+        elif all(NAME_COLUMN in r for r in data):
+            return [r[NAME_COLUMN] for r in data]
+        return [None] * n_rows
+
+    def predict_proba(self, X):
+        """Score a feature matrix from ``features``."""
+        if self.input_scaler is not None:
+            X = pd.DataFrame(X, columns=self.final_columns)
+        X     = model_input(X, self.input_scaler)
+        model = self.fast_model if self.fast_model is not None and len(X) <= FAST_PATH_MAX_ROWS else self.scoring_model
+        return score(model, X, self.thresholds)
+
+    def predict(self, data):
+        """Score records and return one result dict per input row."""
+        X = self.features(data)
+        return self.format_results(self.names(data, len(X)), *self.predict_proba(X))
+
+    @staticmethod
+    def format_results(names, probas, labels, risks):
+        return [
+            {
+                NAME_COLUMN  : name,
+                "probability": round(float(p), 6),
+                "prediction" : "RESIGN" if y == 1 else "STAY",
+                "risk_level" : str(r),
+            }
+            for name, p, y, r in zip(names, probas, labels, risks)
+        ]
+
+    def explain(self, data):
+        """Per-feature SHAP values (log-odds) for each record."""
+        return self.explain_features(self.features(data))
+
+    def explain_features(self, X):
+        """SHAP values for a feature matrix from ``features``."""
+        if self.input_scaler is not None:
+            X = pd.DataFrame(X, columns=self.final_columns)
+        values = shap_matrix(self.explainer, model_input(X, self.input_scaler))
+        base   = float(np.ravel(self.explainer.expected_value)[-1])
+        return [
+            {"base_value": base, "shap_values": dict(zip(self.final_columns, map(float, row)))}
+            for row in values
+        ]
+
+
+def _to_float(value):
+    # None is an empty field; lists, objects and unparseable strings are NaN as well.
+    try:
+        return np.nan if value is None else float(value)
+    except (TypeError, ValueError):
+        return np.nan
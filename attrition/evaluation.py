@@ -0,0 +1,251 @@
+"""Model evaluation on uploads that carry the real outcome (``left``).
+
+While a labelled upload is scored, ``EvaluationSketch.update`` bins every
+row by salary band × promotion × outcome × predicted probability
+(``SCORE_BINS`` bins of 0.1 percentage points). It keeps the row count and
+the sums of p and p² per cell. Every metric is then a few array reductions
+over those ~12k cells, whatever the number of rows:
+
+* ROC-AUC is Mann–Whitney over the binned scores, with ties within a bin
+  counted as half.
+* Brier score is ``Σp² − 2·Σ_{y=1} p + n₁``, exact from the sums.
+* The calibration curve is mean predicted vs observed rate per decile.
+* The confusion matrices and TPR / FPR / precision use the moderate and
+  critical cut-offs (default 40% and 70%).
+* Per-group metrics come from the same reductions with the group axis kept.
+
+Bootstrap intervals resample the cells rather than the rows: one multinomial
+draw over the cell counts is a row-level bootstrap of the binned data.
+Replicates are drawn in blocks, each with its own seed stream, and the blocks
+are spread over a process pool (``workers``), so the intervals are
+reproducible for a given seed whatever the number of workers.
+"""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+SCORE_BINS   = 1_000
+CALIB_BINS   = 10
+DEFAULT_BOOT = 200
+BOOT_BLOCK   = 50       # replicates drawn at once per worker (memory: BLOCK × cells)
+CI_LEVEL     = 0.95
+
+# Group dimensions: encoded feature column → level labels in code order (salary as in SALARY_MAP).
+GROUPS = {
+    "salary"               : ("low", "medium", "high"),
+    "promotion_last_5years": ("no", "yes"),
+}
+
+
+class EvaluationSketch:
+    """Counts and probability sums per (salary, promotion, outcome, score bin) cell."""
+
+    def __init__(self):
+        self.shape  = (*(len(levels) for levels in GROUPS.values()), 2, SCORE_BINS)
+        self.counts = np.zeros(self.shape, dtype=np.int64)
+        self.sum_p  = np.zeros(self.shape)
+        self.sum_p2 = np.zeros(self.shape)
+        self.unlabelled = 0
+
+    @property
+    def rows(self):
+        return int(self.counts.sum())
+
+    def update(self, df_proc, probas, labels):
+        """Add a chunk: encoded features, probabilities and raw label values (rows without 0/1 are skipped)."""
+        y     = pd.to_numeric(pd.Series(np.asarray(labels)), errors="coerce").to_numpy()
+        known = (y == 0) | (y == 1)
+        self.unlabelled += int((~known).sum())
+        if not known.any():
+            return
+        p     = np.asarray(probas, dtype=np.float64)[known]
+        codes = [df_proc[col].to_numpy()[known].astype(np.int64) for col in GROUPS]
+        bins  = np.minimum((p * SCORE_BINS).astype(np.int64), SCORE_BINS - 1)
+        cell  = np.ravel_multi_index((*codes, y[known].astype(np.int64), bins), self.shape)
+        size  = self.counts.size
+        self.counts += np.bincount(cell, minlength=size).reshape(self.shape)
+        self.sum_p  += np.bincount(cell, weights=p, minlength=size).reshape(self.shape)
+        self.sum_p2 += np.bincount(cell, weights=p * p, minlength=size).reshape(self.shape)
+
+
+def _cut(threshold):
+    return int(round(threshold * SCORE_BINS))
+
+
+def _metrics(counts, sum_p, sum_p2, thresholds):
+    """Every metric over the trailing (outcome, bin) axes; leading axes are kept (groups, replicates)."""
+    counts = counts.astype(np.float64)
+    neg, pos = counts[..., 0, :], counts[..., 1, :]
+    n_neg, n_pos = neg.sum(-1), pos.sum(-1)
+    n     = n_neg + n_pos
+    below = np.cumsum(neg, axis=-1) - neg
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = {
+            "rows"     : n,
+            "base_rate": n_pos / n,
+            "mean_prob": sum_p.sum((-1, -2)) / n,
+            "roc_auc"  : (pos * (below + 0.5 * neg)).sum(-1) / (n_neg * n_pos),
+            "brier"    : (sum_p2.sum((-1, -2)) - 2 * sum_p[..., 1, :].sum(-1) + n_pos) / n,
+        }
+        for t in thresholds:
+            cut = _cut(t)
+            tp, fp = pos[..., cut:].sum(-1), neg[..., cut:].sum(-1)
+            out[f"tpr@{t:g}"]       = tp / n_pos
+            out[f"fpr@{t:g}"]       = fp / n_neg
+            out[f"precision@{t:g}"] = tp / (tp + fp)
+    return out
+
+
+def _cutoffs(thresholds):
+    return (thresholds.moderate, thresholds.critical)
+
+
+def overall(sketch, thresholds):
+    """Metrics over every labelled row, as plain floats."""
+    axes = tuple(range(len(GROUPS)))
+    m = _metrics(sketch.counts.sum(axes), sketch.sum_p.sum(axes), sketch.sum_p2.sum(axes), _cutoffs(thresholds))
+    return {k: float(v) for k, v in m.items()}
+
+
+def _group_arrays(sketch, column):
+    """Counts and sums with only ``column``'s group axis left."""
+    axis  = list(GROUPS).index(column)
+    other = tuple(i for i in range(len(GROUPS)) if i != axis)
+    return sketch.counts.sum(other), sketch.sum_p.sum(other), sketch.sum_p2.sum(other)
+
+
+def group_metrics(sketch, thresholds):
+    """One row per group level (salary bands, promoted or not) with its metrics."""
+    frames = []
+    for column, levels in GROUPS.items():
+        m = _metrics(*_group_arrays(sketch, column), _cutoffs(thresholds))
+        frames.append(pd.DataFrame({"Group": column, "Level": levels, **m}))
+    table = pd.concat(frames, ignore_index=True)
+    table["rows"] = table["rows"].astype(np.int64)
+    return table[table["rows"] > 0].reset_index(drop=True)
+
+
+def calibration(sketch, n_bins=CALIB_BINS):
+    """Mean predicted probability vs observed resign rate per probability band."""
+    axes   = tuple(range(len(GROUPS)))
+    counts = sketch.counts.sum(axes).reshape(2, n_bins, -1).sum(-1)
+    sum_p  = sketch.sum_p.sum(axes).reshape(2, n_bins, -1).sum(-1)
+    n      = counts.sum(0)
+    edges  = np.linspace(0, 100, n_bins + 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        table = pd.DataFrame({
+            "Band (%)"     : [f"{a:g}–{b:g}" for a, b in zip(edges[:-1], edges[1:])],
+            "Rows"         : n,
+            "Predicted (%)": (sum_p.sum(0) / n * 100).round(2),
+            "Observed (%)" : (counts[1] / n * 100).round(2),
+        })
+    return table
+
+
+def confusion(sketch, threshold):
+    """2 × 2 confusion matrix (rows: actual, columns: predicted) at ``threshold``."""
+    axes   = tuple(range(len(GROUPS)))
+    counts = sketch.counts.sum(axes)
+    cut    = _cut(threshold)
+    matrix = np.array([[counts[0, :cut].sum(), counts[0, cut:].sum()],
+                       [counts[1, :cut].sum(), counts[1, cut:].sum()]])
+    return pd.DataFrame(matrix, index=["Actual stay", "Actual left"],
+                        columns=[f"Predicted < {threshold * 100:g}%", f"Predicted ≥ {threshold * 100:g}%"])
+
+
+def _bootstrap_block(counts, mean_p, mean_p2, cutoffs, n_boot, seed):
+    """``n_boot`` replicates of the overall and per-group metrics; runs in a worker process."""
+    rng   = np.random.default_rng(seed)
+    flat  = counts.ravel()
+    total = int(flat.sum())
+    probs = flat / total
+    parts = []
+    for start in range(0, n_boot, BOOT_BLOCK):
+        k    = min(BOOT_BLOCK, n_boot - start)
+        reps = rng.multinomial(total, probs, size=k).reshape(k, *counts.shape).astype(np.float64)
+        sp, sp2 = reps * mean_p, reps * mean_p2
+        block = {}
+        g_axes = tuple(range(1, 1 + len(GROUPS)))
+        for name, value in _metrics(reps.sum(g_axes), sp.sum(g_axes), sp2.sum(g_axes), cutoffs).items():
+            block[name] = value
+        for i, column in enumerate(GROUPS):
+            other = tuple(1 + j for j in range(len(GROUPS)) if j != i)
+            for name, value in _metrics(reps.sum(other), sp.sum(other), sp2.sum(other), cutoffs).items():
+                block[f"{column}:{name}"] = value
+        parts.append(block)
+    return {name: np.concatenate([p[name] for p in parts]) for name in parts[0]}
+
+
+def bootstrap(sketch, thresholds, n_boot=DEFAULT_BOOT, workers=None, seed=0, level=CI_LEVEL, on_progress=None):
+    """Percentile intervals for every overall and per-group metric.
+
+    Returns ``{metric: (low, high)}`` for the overall metrics and
+    ``{"<group>:<metric>": (low array, high array)}`` per group level.
+    Replicates are drawn in blocks of ``BOOT_BLOCK``, each with its own seed,
+    and ``on_progress(replicates_done, fraction)`` is called as blocks finish;
+    an exception it raises (e.g. ``JobCancelled``) drops the blocks not yet started.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        safe    = np.maximum(sketch.counts, 1)
+        mean_p  = sketch.sum_p / safe
+        mean_p2 = sketch.sum_p2 / safe
+    sizes   = [min(BOOT_BLOCK, n_boot - start) for start in range(0, n_boot, BOOT_BLOCK)]
+    seeds   = np.random.SeedSequence(seed).spawn(len(sizes))
+    args    = [(sketch.counts, mean_p, mean_p2, _cutoffs(thresholds), size, s) for size, s in zip(sizes, seeds)]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(sizes)))
+    parts   = [None] * len(args)
+
+    def _done(i, part):
+        parts[i] = part
+        if on_progress is not None:
+            reps = sum(size for size, p in zip(sizes, parts) if p is not None)
+            on_progress(reps, reps / n_boot)
+
+    if workers == 1:
+        for i, a in enumerate(args):
+            _done(i, _bootstrap_block(*a))
+    else:
+        pool = ProcessPoolExecutor(workers, mp_context=get_context("spawn"))
+        try:
+            futures = {pool.submit(_bootstrap_block, *a): i for i, a in enumerate(args)}
+            for future in as_completed(futures):
+                _done(futures[future], future.result())
+        finally:
+            pool.shutdown(cancel_futures=True)
+    reps  = {name: np.concatenate([p[name] for p in parts]) for name in parts[0]}
+    alpha = (1 - level) / 2 * 100
+    return {name: tuple(np.nanpercentile(values, [alpha, 100 - alpha], axis=0)) for name, values in reps.items()}
+
+
+def report(sketch, thresholds, intervals=None, source=""):
+    """JSON-serialisable evaluation report; ``intervals`` from ``bootstrap`` adds the CIs."""
+    def clean(value):
+        value = float(value)
+        return None if np.isnan(value) else round(value, 6)
+
+    metrics = overall(sketch, thresholds)
+    groups  = group_metrics(sketch, thresholds)
+    doc = {
+        "source"    : source,
+        "rows"      : sketch.rows,
+        "unlabelled": sketch.unlabelled,
+        "thresholds": {"moderate": thresholds.moderate, "critical": thresholds.critical},
+        "metrics"   : {k: clean(v) for k, v in metrics.items()},
+        "calibration": calibration(sketch).to_dict("records"),
+        "confusion" : {f"{t:g}": confusion(sketch, t).to_numpy().tolist() for t in _cutoffs(thresholds)},
+        "groups"    : [{k: (clean(v) if isinstance(v, (float, np.floating)) else v) for k, v in row.items()}
+                       for row in groups.to_dict("records")],
+    }
+    if intervals is not None:
+        doc["bootstrap"] = {"level": CI_LEVEL}
+        doc["metrics_ci"] = {k: [clean(v[0]), clean(v[1])] for k, v in intervals.items() if ":" not in k}
+        for row in doc["groups"]:
+            column = row["Group"]
+            index  = GROUPS[column].index(row["Level"])
+            row["ci"] = {k.split(":", 1)[1]: [clean(v[0][index]), clean(v[1][index])]
+                         for k, v in intervals.items() if k.startswith(column + ":")}
+    return json.loads(json.dumps(doc, default=lambda o: o.item() if hasattr(o, "item") else str(o)))
@@ -0,0 +1,266 @@
+"""Shared in-process inference executor for concurrent Streamlit sessions.
+
+Every browser session runs its script in its own thread, but all of them
+share the one cached model. Scoring and SHAP are submitted here as jobs
+instead of running on the script thread, which waits for short interactive
+jobs and polls long batch jobs without blocking on them.
+
+* A bounded pool of ``workers`` threads runs the jobs. At most
+  ``batch_slots`` of them (default ``workers - 1``) take batch jobs, so an
+  interactive job (a single prediction, a what-if table) always finds a
+  free worker even while batch uploads are running.
+* Jobs wait in one queue per session and priority. Workers serve the
+  sessions round-robin and a session runs at most ``per_session`` jobs of a
+  priority at once, so one user's large upload cannot hold the pool while
+  another user waits.
+* ``cancel(session, kind)`` drops a session's queued jobs of that kind and
+  flags its running one, which stops at its next ``job.progress`` or
+  ``job.check`` call (after the current chunk or block). A job cancelled
+  after its last check still ends CANCELLED and its result is dropped. The
+  app uses this when a user re-uploads or presses "Batalkan".
+
+Job functions receive their ``Job`` as the first argument and report
+progress with ``job.progress(rows_done, fraction)``. The signature is that
+of the ``on_progress`` callbacks of ``score_stream``, ``cheapest_interventions``,
+``ShapSummary.compute`` and ``evaluation.bootstrap``, so a job passes it directly.
+"""
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+from attrition import metrics
+
+WORKERS_ENV = "ATTRITION_WORKERS"
+
+INTERACTIVE = 0
+BATCH       = 1
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+
+class JobCancelled(Exception):
+    """Raised inside a job (from ``progress``) or by ``result`` once the job has been cancelled."""
+
+
+def default_workers():
+    # One per CPU (up to 4) for batch work plus one kept free for interactive jobs.
+    return int(os.environ.get(WORKERS_ENV) or min(4, os.cpu_count() or 1) + 1)
+
+
+class Job:
+    """One unit of work and its state, result and progress, readable from any thread."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, session, kind, priority, fn, args, kwargs):
+        self.id        = next(self._ids)
+        self.session   = session
+        self.kind      = kind
+        self.priority  = priority
+        self.state     = QUEUED
+        self.rows_done = 0
+        self.fraction  = None
+        self.error     = None
+        self.submitted = time.perf_counter()
+        self.started   = None
+        self.finished  = None
+        self._fn       = fn
+        self._args     = args
+        self._kwargs   = kwargs
+        self._value    = None
+        self._cancel   = threading.Event()
+        self._done     = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def progress(self, rows_done, fraction=None):
+        """Record progress; raises ``JobCancelled`` when the job should stop."""
+        self.rows_done, self.fraction = rows_done, fraction
+        self.check()
+
+    def check(self):
+        if self._cancel.is_set():
+            raise JobCancelled(f"job {self.id} cancelled")
+
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def result(self, timeout=None):
+        """The job's return value; re-raises its exception, or ``JobCancelled``."""
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"job {self.id} still {self.state}")
+        if self.state == CANCELLED:
+            raise JobCancelled(f"job {self.id} cancelled")
+        if self.error is not None:
+            raise self.error
+        return self._value
+
+    @property
+    def seconds(self):
+        """Run time so far (or in total), excluding the time spent queued."""
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    def _run(self):
+        self.started = time.perf_counter()
+        metrics.since("executor", f"{self.kind}_queued", self.submitted)
+        try:
+            self.check()
+            self.state = RUNNING
+            with metrics.stage("executor", self.kind):
+                self._value = self._fn(self, *self._args, **self._kwargs)
+            # Cancelled after its last check: the caller asked not to have the result.
+            self.check()
+            self.state = DONE
+        except JobCancelled:
+            self.state = CANCELLED
+        except BaseException as e:
+            self.error, self.state = e, FAILED
+        finally:
+            self.finished = time.perf_counter()
+            self._args = self._kwargs = None
+            self._done.set()
+
+
+class InferenceExecutor:
+    """Bounded worker pool with per-session fair queues; see the module docstring."""
+
+    def __init__(self, workers=None, batch_slots=None, per_session=1):
+        self.workers     = workers or default_workers()
+        self.batch_slots = batch_slots or max(1, self.workers - 1)
+        self.per_session = per_session
+        self._cond       = threading.Condition()
+        self._queues     = {INTERACTIVE: OrderedDict(), BATCH: OrderedDict()}   # session -> deque of jobs
+        self._running    = {}                                                   # (priority, session) -> count
+        self._active     = {INTERACTIVE: 0, BATCH: 0}
+        self._counts     = {"submitted": 0, DONE: 0, FAILED: 0, CANCELLED: 0}
+        self._threads    = []
+        self._current    = []                                                   # job per worker, or None
+        self._closed     = False
+
+    def submit(self, session, fn, *args, kind="job", priority=BATCH, **kwargs):
+        """Queue ``fn(job, *args, **kwargs)`` for ``session``; returns the ``Job`` immediately."""
+        job = Job(session, kind, priority, fn, args, kwargs)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("executor is shut down")
+            self._queues[priority].setdefault(session, deque()).append(job)
+            self._counts["submitted"] += 1
+            if len(self._threads) < self.workers:
+                index  = len(self._threads)
+                thread = threading.Thread(target=self._work, args=(index,), name=f"inference-{index}", daemon=True)
+                self._threads.append(thread)
+                self._current.append(None)
+                thread.start()
+            self._cond.notify()
+        metrics.count("executor", f"{kind}_submitted")
+        return job
+
+    def run(self, session, fn, *args, kind="job", timeout=None, **kwargs):
+        """Submit an interactive job and wait for its result."""
+        return self.submit(session, fn, *args, kind=kind, priority=INTERACTIVE, **kwargs).result(timeout)
+
+    def cancel(self, session, kind=None):
+        """Cancel ``session``'s queued and running jobs (of ``kind``, if given); returns how many."""
+        cancelled = 0
+        with self._cond:
+            for queues in self._queues.values():
+                pending = queues.get(session)
+                if not pending:
+                    continue
+                keep = deque()
+                for job in pending:
+                    if kind is None or job.kind == kind:
+                        job.cancel()
+                        job.state, job.finished = CANCELLED, time.perf_counter()
+                        job._done.set()
+                        self._counts[CANCELLED] += 1
+                        cancelled += 1
+                    else:
+                        keep.append(job)
+                queues[session] = keep
+            for job in self._running_jobs:
+                if job.session == session and (kind is None or job.kind == kind) and not job.cancelled:
+                    job.cancel()
+                    cancelled += 1
+        if cancelled:
+            metrics.count("executor", "cancelled", cancelled)
+        return cancelled
+
+    def stats(self):
+        with self._cond:
+            return {
+                "workers"    : self.workers,
+                "batch_slots": self.batch_slots,
+                "running"    : sum(self._active.values()),
+                "queued"     : sum(len(q) for queues in self._queues.values() for q in queues.values()),
+                "sessions"   : len({s for queues in self._queues.values() for s, q in queues.items() if q}
+                                   | {job.session for job in self._running_jobs}),
+                **self._counts,
+            }
+
+    def shutdown(self, wait=True):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    # ── Scheduling ──────────────────────────────────────────────────────────
+
+    @property
+    def _running_jobs(self):
+        return [job for job in self._current if job is not None]
+
+    def _next(self):
+        """Pop the next job: interactive before batch, sessions round-robin. Caller holds the lock."""
+        for priority in (INTERACTIVE, BATCH):
+            if priority == BATCH and self._active[BATCH] >= self.batch_slots:
+                continue
+            queues = self._queues[priority]
+            for session in list(queues):
+                pending = queues[session]
+                if not pending:
+                    del queues[session]
+                    continue
+                if self._running.get((priority, session), 0) >= self.per_session:
+                    continue
+                job = pending.popleft()
+                queues.move_to_end(session)
+                return job
+        return None
+
+    def _work(self, index):
+        while True:
+            with self._cond:
+                job = self._next()
+                while job is None and not self._closed:
+                    self._cond.wait()
+                    job = self._next()
+                if job is None:
+                    return
+                key = (job.priority, job.session)
+                self._running[key] = self._running.get(key, 0) + 1
+                self._active[job.priority] += 1
+                self._current[index] = job
+            job._run()
+            with self._cond:
+                self._current[index] = None
+                self._running[key] -= 1
+                if not self._running[key]:
+                    del self._running[key]
+                self._active[job.priority] -= 1
+                self._counts[job.state] += 1
+                self._cond.notify_all()
@@ -0,0 +1,44 @@
+"""SHAP explanations for single profiles and scored batches.
+
+The TreeExplainer is expensive to build, so callers construct it once with
+``build_explainer`` and keep it next to the model. Batch explanations run
+chunk by chunk and reduce each row to its top-k driving features.
+"""
+import numpy as np
+import pandas as pd
+
+DEFAULT_TOP_K = 3
+
+
+def build_explainer(model):
+    import shap
+
+    return shap.TreeExplainer(model)
+
+
+def driver_columns(top_k=DEFAULT_TOP_K):
+    cols = []
+    for i in range(1, top_k + 1):
+        cols += [f"Top Driver {i}", f"Top Driver {i} SHAP"]
+    return cols
+
+
+def shap_matrix(explainer, X, chunksize=None):
+    """Return SHAP values for the positive class as an ``(n_rows, n_features)`` array."""
+    if chunksize is None or len(X) <= chunksize:
+        return np.asarray(explainer.shap_values(X))
+    return np.vstack([np.asarray(explainer.shap_values(X[i:i + chunksize]))
+                      for i in range(0, len(X), chunksize)])
+
+
+def top_drivers(shap_values, final_columns, top_k=DEFAULT_TOP_K):
+    """Name and signed SHAP value of each row's ``top_k`` features by |SHAP|."""
+    top_k  = min(top_k, shap_values.shape[1])
+    order  = np.argsort(-np.abs(shap_values), axis=1)[:, :top_k]
+    values = np.take_along_axis(shap_values, order, axis=1)
+    names  = np.asarray(final_columns, dtype=object)[order]
+    data   = {}
+    for i in range(top_k):
+        data[f"Top Driver {i + 1}"]      = names[:, i]
+        data[f"Top Driver {i + 1} SHAP"] = values[:, i].astype(np.float64).round(3)
+    return pd.DataFrame(data)
@@ -0,0 +1,79 @@
+"""Fold the StandardScaler into the booster's split thresholds.
+
+Standard scaling is strictly increasing per feature, so ``(x - mean) / scale
+< t`` holds exactly when ``x < t * scale + mean``. Rewriting every split
+condition this way yields a model that scores raw ``final_columns`` values
+and lets callers skip ``scaler.transform`` and its extra array copy.
+"""
+import json
+
+import numpy as np
+
+
+def _scaler_params(scaler, n_features):
+    mean  = getattr(scaler, "mean_", None)
+    scale = getattr(scaler, "scale_", None)
+    mean  = np.zeros(n_features) if mean is None else np.asarray(mean, dtype=np.float64)
+    scale = np.ones(n_features) if scale is None else np.asarray(scale, dtype=np.float64)
+    if np.any(scale <= 0):
+        raise ValueError("scaler has a non-positive scale; splits cannot be folded")
+    return mean, scale
+
+
+def raw_thresholds(thresholds, mean, scale, iterations=64):
+    """Map float32 split thresholds from scaled space to raw float32 space.
+
+    The scaled path computes ``(x - mean) / scale`` in float64 and XGBoost
+    then compares ``float32(scaled_x) < t``. The float64 boundary of that test
+    is located by bisection; the raw threshold is the smallest float32 that
+    does not go left, so every float32 input takes the same branch on both
+    paths.
+    """
+    t  = np.asarray(thresholds, dtype=np.float32)
+    lo = np.nextafter(t, np.float32(-np.inf)).astype(np.float64) * scale + mean
+    hi = t.astype(np.float64) * scale + mean
+
+    def goes_left(x):
+        return ((np.asarray(x, dtype=np.float64) - mean) / scale).astype(np.float32) < t
+
+    # Invariant: goes_left(lo) and not goes_left(hi).
+    lo = np.where(goes_left(lo), lo, lo - (hi - lo))
+    for _ in range(iterations):
+        mid  = (lo + hi) / 2
+        left = goes_left(mid)
+        lo   = np.where(left, mid, lo)
+        hi   = np.where(left, hi, mid)
+
+    # hi sits within a float64 ulp of the boundary, so the answer is the
+    # nearest float32 or one of its neighbours.
+    raw  = hi.astype(np.float32)
+    raw  = np.where(goes_left(raw), np.nextafter(raw, np.float32(np.inf)), raw)
+    down = np.nextafter(raw, np.float32(-np.inf))
+    return np.where(goes_left(down), raw, down)
+
+
+def fold_scaler(model, scaler):
+    """Return a copy of ``model`` that scores unscaled feature arrays directly."""
+    import xgboost as xgb
+
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    doc     = json.loads(booster.save_raw("json"))
+    trees   = doc["learner"]["gradient_booster"]["model"]["trees"]
+    n_feat  = int(doc["learner"]["learner_model_param"]["num_feature"])
+    mean, scale = _scaler_params(scaler, n_feat)
+
+    for tree in trees:
+        split = np.asarray(tree["split_indices"], dtype=np.int64)
+        inner = np.asarray(tree["left_children"]) != -1
+        cond  = np.asarray(tree["split_conditions"], dtype=np.float32)
+        cond[inner] = raw_thresholds(cond[inner], mean[split[inner]], scale[split[inner]])
+        tree["split_conditions"] = [float(c) for c in cond]
+
+    fused_booster = xgb.Booster()
+    fused_booster.load_model(bytearray(json.dumps(doc), "utf-8"))
+    if not hasattr(model, "get_booster"):
+        return fused_booster
+    fused = type(model)(**model.get_params())
+    fused._Booster = fused_booster
+    fused.n_classes_ = getattr(model, "n_classes_", 2)
+    return fused
@@ -0,0 +1,203 @@
+"""Per-stage latency histograms and counters for the scoring pipelines.
+
+Stages are timed with ``stage(pipeline, name)`` around the work (``load_all``,
+``read``, ``validate``, ``scale``, ``predict``, ``explain``, ``render``,
+``export``) and events are counted with ``count``. Unlike ``attrition.timing``,
+which records each startup stage once, every call is observed, into
+Prometheus-style cumulative buckets.
+
+Collection is off unless ``ATTRITION_METRICS=1``. When it is off, ``stage``
+returns one shared no-op context manager and ``count``/``since`` return at
+once, so instrumented code pays a function call per stage and nothing else.
+With ``ATTRITION_METRICS_FILE`` set, ``flush`` writes the metrics there after
+each script run: Prometheus text format for ``.prom``/``.txt`` paths,
+JSON otherwise.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+
+METRICS_ENV   = "ATTRITION_METRICS"
+EXPORT_ENV    = "ATTRITION_METRICS_FILE"
+PROM_SUFFIXES = (".prom", ".txt")
+
+# Upper bounds in seconds; the last bucket is +Inf.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count   = 0
+        self.errors  = 0
+        self.sum     = 0.0
+        self.max     = 0.0
+
+    def observe(self, seconds, error=False):
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count  += 1
+        self.errors += error
+        self.sum    += seconds
+        self.max     = max(self.max, seconds)
+
+    def quantile(self, q):
+        """Estimate by linear interpolation inside the bucket holding the q-th observation."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for i, n in enumerate(self.buckets):
+            if n and seen + n >= rank:
+                lo = BUCKETS[i - 1] if i else 0.0
+                hi = BUCKETS[i] if i < len(BUCKETS) else self.max
+                return min(lo + (hi - lo) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+
+class Registry:
+    """Thread-safe store of stage histograms and event counters."""
+
+    def __init__(self):
+        self.started   = time.time()
+        self.version   = 0
+        self._stages   = {}
+        self._counters = {}
+        self._lock     = threading.Lock()
+
+    def observe(self, pipeline, stage, seconds, error=False):
+        with self._lock:
+            hist = self._stages.get((pipeline, stage))
+            if hist is None:
+                hist = self._stages[pipeline, stage] = Histogram()
+            hist.observe(seconds, error)
+            self.version += 1
+
+    def count(self, pipeline, event, value=1):
+        with self._lock:
+            self._counters[pipeline, event] = self._counters.get((pipeline, event), 0) + value
+            self.version += 1
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+            self.started  = time.time()
+            self.version += 1
+
+    def snapshot(self):
+        with self._lock:
+            stages = [
+                {"pipeline": pipeline, "stage": stage, "count": h.count, "errors": h.errors,
+                 "sum_seconds": round(h.sum, 6), "mean_ms": round(h.sum / h.count * 1e3, 3),
+                 "p50_ms": round(h.quantile(0.5) * 1e3, 3), "p95_ms": round(h.quantile(0.95) * 1e3, 3),
+                 "max_ms": round(h.max * 1e3, 3),
+                 "buckets": dict(zip([*map(str, BUCKETS), "+Inf"], h.buckets))}
+                for (pipeline, stage), h in sorted(self._stages.items())
+            ]
+            counters = [{"pipeline": pipeline, "event": event, "value": value}
+                        for (pipeline, event), value in sorted(self._counters.items())]
+        return {"started": self.started, "stages": stages, "counters": counters}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        lines = [
+            "# HELP attrition_stage_seconds Latency of one pipeline stage.",
+            "# TYPE attrition_stage_seconds histogram",
+        ]
+        with self._lock:
+            stages   = sorted(self._stages.items())
+            counters = sorted(self._counters.items())
+        for (pipeline, stage), h in stages:
+            labels = f'pipeline="{pipeline}",stage="{stage}"'
+            cumulative = 0
+            for bound, n in zip([*map(repr, BUCKETS), "+Inf"], h.buckets):
+                cumulative += n
+                lines.append(f'attrition_stage_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"attrition_stage_seconds_sum{{{labels}}} {h.sum!r}")
+            lines.append(f"attrition_stage_seconds_count{{{labels}}} {h.count}")
+        lines += ["# HELP attrition_stage_errors_total Stage runs that raised.",
+                  "# TYPE attrition_stage_errors_total counter"]
+        for (pipeline, stage), h in stages:
+            lines.append(f'attrition_stage_errors_total{{pipeline="{pipeline}",stage="{stage}"}} {h.errors}')
+        lines += ["# HELP attrition_events_total Pipeline events (rows scored, cache hits, ...).",
+                  "# TYPE attrition_events_total counter"]
+        for (pipeline, event), value in counters:
+            lines.append(f'attrition_events_total{{pipeline="{pipeline}",event="{event}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+class _Stage:
+    __slots__ = ("registry", "pipeline", "name", "start")
+
+    def __init__(self, registry, pipeline, name):
+        self.registry = registry
+        self.pipeline = pipeline
+        self.name     = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.registry.observe(self.pipeline, self.name, time.perf_counter() - self.start, exc_type is not None)
+
+
+_NOOP     = nullcontext()
+_registry = Registry() if os.environ.get(METRICS_ENV, "0") not in ("", "0") else None
+_flushed  = None
+
+
+def enabled():
+    return _registry is not None
+
+
+def registry():
+    """The process-wide registry, or None when collection is off."""
+    return _registry
+
+
+def stage(pipeline, name):
+    """Context manager timing one run of ``name`` in ``pipeline``."""
+    if _registry is None:
+        return _NOOP
+    return _Stage(_registry, pipeline, name)
+
+
+def clock():
+    """Start time for ``since``; for stages that span too much code to indent."""
+    return time.perf_counter() if _registry is not None else 0.0
+
+
+def since(pipeline, name, start):
+    if _registry is not None:
+        _registry.observe(pipeline, name, time.perf_counter() - start)
+
+
+def count(pipeline, event, value=1):
+    if _registry is not None:
+        _registry.count(pipeline, event, value)
+
+
+def write(path):
+    """Write the metrics to ``path`` (Prometheus text or JSON by suffix), atomically."""
+    path = Path(path)
+    text = _registry.to_prometheus() if path.suffix in PROM_SUFFIXES else _registry.to_json() + "\n"
+    tmp  = path.with_name(path.name + ".tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+def flush():
+    """Write to ``ATTRITION_METRICS_FILE`` if set and anything changed since the last flush."""
+    global _flushed
+    path = os.environ.get(EXPORT_ENV)
+    if _registry is None or not path or _registry.version == _flushed:
+        return
+    _flushed = _registry.version
+    write(path)
@@ -0,0 +1,75 @@
+"""Bounded LRU cache for single-profile prediction results.
+
+Tab 1 users click through the same few profiles repeatedly. Entries are keyed
+on the quantised 8-feature vector plus the decision thresholds and hold
+whatever the caller computed for that profile (probability, SHAP values,
+figure specs). The cache is tied to a model hash and empties itself when the
+model artifact changes.
+"""
+import threading
+from collections import OrderedDict
+
+QUANT_DECIMALS = 4
+DEFAULT_SIZE   = 256
+
+
+def quantise(features, decimals=QUANT_DECIMALS):
+    return tuple(round(float(v), decimals) for v in features)
+
+
+class PredictionCache:
+    def __init__(self, maxsize=DEFAULT_SIZE, model_hash=None):
+        self.maxsize    = maxsize
+        self.model_hash = model_hash
+        self.hits       = 0
+        self.misses     = 0
+        self.evictions  = 0
+        self._entries   = OrderedDict()
+        self._lock      = threading.Lock()
+
+    def bind_model(self, model_hash):
+        """Drop every entry if ``model_hash`` differs from the one the cache was built for."""
+        with self._lock:
+            if model_hash != self.model_hash:
+                self._entries.clear()
+                self.model_hash = model_hash
+
+    @staticmethod
+    def key(features, thresholds=None):
+        return quantise(features), thresholds
+
+    def get(self, features, thresholds=None):
+        key = self.key(features, thresholds)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, features, entry, thresholds=None):
+        key = self.key(features, thresholds)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size"     : len(self._entries),
+                "maxsize"  : self.maxsize,
+                "hits"     : self.hits,
+                "misses"   : self.misses,
+                "evictions": self.evictions,
+                "hit_rate" : self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,140 @@
+"""Persistent per-employee scores for incremental re-scoring of weekly uploads.
+
+The store is one Parquet file with a row per employee: the identifier, a
+hash of the 8 encoded feature values, the model version (the artifact hash)
+the probability was computed with, the probability and the upload date. On
+the next upload, rows whose identifier, feature hash and model version all
+match reuse the stored probability; only new or changed rows are scaled and
+scored. The stored probability is also the baseline for the week-over-week
+risk delta. A second upload on the same day keeps the earlier baseline
+(``prev_proba``), so re-running a file does not reset the deltas to zero.
+
+A key must identify one employee within an upload. ``lookup`` raises
+``DuplicateKeysError`` as soon as a key repeats (names often do), before
+anything is recorded, so the caller can score the upload without the store
+instead of crossing baselines between employees.
+"""
+import os
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from attrition.artifacts import ARTIFACT_DIR
+
+STORE_ENV     = "ATTRITION_SCORE_STORE"
+DEFAULT_STORE = ARTIFACT_DIR / "score_store.parquet"
+
+# Checked in this order; the first column present in the upload is the key.
+ID_COLUMNS = ("id_karyawan", "employee_id", "nama_karyawan")
+
+
+class DuplicateKeysError(ValueError):
+    """Raised by ``ScoreStore.lookup`` when a key occurs more than once in one upload."""
+
+    def __init__(self, examples, key=None):
+        self.examples = list(examples)
+        self.key      = key
+        super().__init__(f"{key or 'employee key'} is not unique in this upload "
+                         f"(e.g. {', '.join(map(repr, self.examples))})")
+
+
+def store_path():
+    return Path(os.environ.get(STORE_ENV, DEFAULT_STORE))
+
+
+def id_column(columns):
+    """The identifier column of an upload, or None if it has none."""
+    return next((c for c in ID_COLUMNS if c in columns), None)
+
+
+def feature_hash(df_proc):
+    """64-bit hash per row of the encoded features, independent of column dtypes."""
+    values = pd.DataFrame(df_proc.to_numpy(dtype=np.float64))
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+class ScoreStore:
+    """Stored scores for one model version; ``save`` writes the merged file.
+
+    ``lookup`` and ``record`` work on whole arrays so a chunk costs one index
+    lookup, not a loop over employees. One instance serves one upload: the
+    64-bit hashes of the keys seen by ``lookup`` are kept sorted to detect
+    duplicates across chunks.
+    """
+
+    def __init__(self, path, model_version):
+        self.path          = Path(path)
+        self.model_version = model_version
+        self._pending      = []
+        self._seen         = np.empty(0, dtype=np.uint64)   # sorted hashes of the keys looked up so far
+        if self.path.exists():
+            stored = pd.read_parquet(self.path)
+            self._stored = stored.set_index("employee_id")
+        else:
+            self._stored = pd.DataFrame(
+                {"feature_hash": pd.Series(dtype=np.uint64), "model_version": pd.Series(dtype=object),
+                 "proba": pd.Series(dtype=np.float64), "prev_proba": pd.Series(dtype=np.float64),
+                 "scored_on": pd.Series(dtype=object)},
+                index=pd.Index([], dtype=object, name="employee_id"),
+            )
+        self._hashes   = self._stored["feature_hash"].to_numpy()
+        self._versions = self._stored["model_version"].to_numpy()
+        self._probas   = self._stored["proba"].to_numpy()
+        # Scores written today are this week's; their baseline is prev_proba.
+        self._baseline = np.where(self._stored["scored_on"].to_numpy() == date.today().isoformat(),
+                                  self._stored["prev_proba"].to_numpy(), self._probas)
+
+    def __len__(self):
+        return len(self._stored)
+
+    def lookup(self, ids, hashes):
+        """Return ``(reuse, stored, previous)`` for aligned ``ids`` and feature ``hashes``.
+
+        ``reuse`` marks rows whose ``stored`` probability is still valid;
+        ``previous`` is the baseline for the risk delta. Both are NaN for
+        employees the store has not seen. Raises ``DuplicateKeysError`` when
+        an id repeats within the chunk or an earlier one of the upload.
+        """
+        ids      = pd.Index(ids, dtype=object).astype(str)
+        hashed   = pd.util.hash_array(ids.to_numpy(), categorize=False)   # keys are mostly unique
+        earlier  = np.zeros(len(ids), dtype=bool)
+        if len(self._seen):
+            at      = np.minimum(np.searchsorted(self._seen, hashed), len(self._seen) - 1)
+            earlier = self._seen[at] == hashed
+        repeated = ids[earlier | ids.duplicated()]
+        if len(repeated):
+            raise DuplicateKeysError(repeated.unique()[:3])
+        # Both runs are sorted, so the stable sort (timsort) is a linear merge.
+        self._seen = np.sort(np.concatenate([self._seen, np.sort(hashed)]), kind="stable")
+        pos = self._stored.index.get_indexer(ids)
+        if not len(self._stored):
+            missing = np.full(len(pos), np.nan)
+            return np.zeros(len(pos), dtype=bool), missing, missing
+        known = pos >= 0
+        safe  = np.where(known, pos, 0)
+        reuse = known & (self._hashes[safe] == hashes) & (self._versions[safe] == self.model_version)
+        return reuse, np.where(known, self._probas[safe], np.nan), np.where(known, self._baseline[safe], np.nan)
+
+    def record(self, ids, hashes, probas, previous):
+        self._pending.append(pd.DataFrame({
+            "employee_id"  : pd.Index(ids, dtype=object).astype(str),
+            "feature_hash" : hashes,
+            "model_version": self.model_version,
+            "proba"        : np.asarray(probas, dtype=np.float64),
+            "prev_proba"   : np.asarray(previous, dtype=np.float64),
+            "scored_on"    : date.today().isoformat(),
+        }))
+
+    def save(self):
+        """Merge recorded rows over the stored ones (latest wins) and replace the file."""
+        if not self._pending:
+            return
+        merged = pd.concat([*reversed(self._pending), self._stored.reset_index()], ignore_index=True)
+        merged = merged.drop_duplicates("employee_id", keep="first")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        merged.to_parquet(tmp, index=False)
+        os.replace(tmp, self.path)
+        self._pending = []
@@ -0,0 +1,464 @@
+"""Scoring for the attrition model, shared by the single and batch tabs.
+
+``score`` runs the booster once per call and derives labels and risk levels
+from the probabilities. Batch uploads are read, validated, encoded, scaled and scored one chunk at a time
+and written straight to the output file, so memory stays bounded by the chunk
+size rather than by the size of the HRIS export.
+"""
+import os
+from dataclasses import dataclass, field, replace
+
+import numpy as np
+import pandas as pd
+
+from attrition import metrics
+from attrition.columnar import IPC_SUFFIXES, TableWriter, ipc_chunks, parquet_chunks, read_column, replace_columns
+from attrition.drift import DriftSketch
+from attrition.evaluation import EvaluationSketch
+from attrition.explain import driver_columns, shap_matrix, top_drivers
+from attrition.score_store import ID_COLUMNS, DuplicateKeysError, feature_hash, id_column
+
+SALARY_MAP = {"low": 0, "medium": 1, "high": 2}
+
+NAME_COLUMN   = "nama_karyawan"
+LABEL_COLUMN  = "left"          # actual outcome, present in historical (labelled) uploads
+DEFAULT_CHUNK = 50_000
+HIST_BINS     = 20
+PREVIEW_ROWS  = 1_000
+
+RISK_LABELS       = ("LOW", "MODERATE", "CRITICAL")
+PREDICTION_LABELS = ("✅ STAY", "⚠ RESIGN")
+HISTORY_COLUMNS   = ("Previous Probability (%)", "Change (pp)")
+REPORT_ROWS       = 1_000
+
+# Plausible bounds per feature (inclusive); rows outside them are rejected
+# and listed in the validation report instead of being scored.
+VALID_RANGES = {
+    "satisfaction_level"   : (0, 1),
+    "last_evaluation"      : (0, 1),
+    "number_project"       : (0, 20),
+    "average_montly_hours" : (0, 744),   # 24 h x 31 days
+    "time_spend_company"   : (0, 60),
+    "salary"               : (0, 2),
+    "Work_accident"        : (0, 1),
+    "promotion_last_5years": (0, 1),
+}
+# Codes and flags: a value between two codes (0.5) is rejected, not scored.
+INTEGER_COLUMNS = ("salary", "Work_accident", "promotion_last_5years")
+
+
+class MissingColumnsError(ValueError):
+    """Raised when an upload lacks one or more of the model's feature columns."""
+
+    def __init__(self, missing):
+        self.missing = list(missing)
+        super().__init__(f"missing columns: {', '.join(self.missing)}")
+
+
+@dataclass(frozen=True)
+class Thresholds:
+    """Probability cut-offs for the class label and the three risk levels."""
+
+    decision : float = 0.5
+    moderate : float = 0.4
+    critical : float = 0.7
+
+    def risk_codes(self, probas):
+        """Index into ``RISK_LABELS`` for each probability, in one bucketing pass."""
+        return np.searchsorted([self.moderate, self.critical], probas, side="right").astype(np.int8)
+
+    def risk_levels(self, probas):
+        return np.asarray(RISK_LABELS)[self.risk_codes(probas)]
+
+    def risk_level(self, proba):
+        return str(self.risk_levels(proba))
+
+
+DEFAULT_THRESHOLDS = Thresholds()
+
+
+def score(model, X, thresholds=DEFAULT_THRESHOLDS):
+    """Run the booster once and derive ``(probas, labels, risk_levels)`` from it.
+
+    Labels use ``proba > thresholds.decision``, which matches
+    ``XGBClassifier.predict`` at the default 0.5 cut-off.
+    """
+    probas = model.predict_proba(X)[:, 1]
+    labels = (probas > thresholds.decision).astype(np.int8)
+    return probas, labels, thresholds.risk_levels(probas)
+
+
+def model_input(df_proc, scaler=None):
+    """Feature array the model consumes: scaled when a ``scaler`` is given,
+    otherwise the raw values for a model with the scaler folded in."""
+    if scaler is None:
+        return np.asarray(df_proc, dtype=np.float32)
+    return scaler.transform(df_proc)
+
+
+def result_columns(final_columns, top_k=0, history=False):
+    return ["Nama Karyawan", *final_columns, "Resign Probability (%)", "Prediction", "Risk Level",
+            *driver_columns(top_k), *(HISTORY_COLUMNS if history else ())]
+
+
+@dataclass
+class BatchSummary:
+    """Running counts for a streamed batch; never holds the full probability array."""
+
+    thresholds: Thresholds = DEFAULT_THRESHOLDS
+    n_bins    : int   = HIST_BINS
+    total     : int   = 0
+    high_risk : int   = 0
+    moderate  : int   = 0
+    low_risk  : int   = 0
+    skipped   : int   = 0
+    prob_sum  : float = 0.0
+    hist      : np.ndarray = field(default=None)
+    preview   : pd.DataFrame = field(default=None)
+    rejected  : pd.DataFrame = field(default=None)
+    problems  : dict = field(default_factory=dict)
+    store_key : str = None
+    store_note: str = None      # why a requested score store was not used
+    reused    : int = 0
+    new       : int = 0
+    risk_up   : int = 0
+    risk_down : int = 0
+    drift     : DriftSketch = field(default_factory=DriftSketch)
+    evaluation: EvaluationSketch = None     # set when the upload has a LABEL_COLUMN
+
+    def __post_init__(self):
+        if self.hist is None:
+            self.hist = np.zeros(self.n_bins, dtype=np.int64)
+
+    @property
+    def bin_edges(self):
+        return np.linspace(0, 100, self.n_bins + 1)
+
+    @property
+    def avg_prob(self):
+        return self.prob_sum / self.total * 100 if self.total else 0.0
+
+    def update(self, probas):
+        low, moderate, high = np.bincount(self.thresholds.risk_codes(probas), minlength=len(RISK_LABELS))
+        self.total     += len(probas)
+        self.high_risk += int(high)
+        self.moderate  += int(moderate)
+        self.low_risk  += int(low)
+        self.prob_sum  += float(probas.sum())
+        self.hist      += np.histogram(probas * 100, bins=self.bin_edges)[0]
+
+    def update_history(self, probas, stored, previous, reused):
+        """Count reused scores, unseen employees and risk-level moves against the baseline."""
+        seen = ~np.isnan(previous)
+        move = self.thresholds.risk_codes(probas[seen]) - self.thresholds.risk_codes(previous[seen])
+        self.reused    += int(reused.sum())
+        self.new       += int(np.isnan(stored).sum())
+        self.risk_up   += int((move > 0).sum())
+        self.risk_down += int((move < 0).sum())
+
+    def add_rejected(self, report, n=REPORT_ROWS):
+        """Count a chunk's rejected rows per column and keep the first ``n`` for display."""
+        self.skipped += len(report)
+        if not len(report):
+            return
+        for col, count in (report.iloc[:, 2:] != "").sum().items():
+            if count:
+                self.problems[col] = self.problems.get(col, 0) + int(count)
+        if self.rejected is None or len(self.rejected) < n:
+            merged = report if self.rejected is None else pd.concat([self.rejected, report], ignore_index=True)
+            self.rejected = merged.iloc[:n]
+
+    def keep_top(self, df_chunk, n=PREVIEW_ROWS):
+        """Keep only the ``n`` highest-risk rows seen so far for on-screen display."""
+        merged = df_chunk if self.preview is None else pd.concat([self.preview, df_chunk], ignore_index=True)
+        self.preview = merged.nlargest(n, "Resign Probability (%)")
+
+
+def _excel_chunks(source, chunksize):
+    from openpyxl import load_workbook
+
+    wb   = load_workbook(source, read_only=True, data_only=True)
+    rows = wb.active.iter_rows(values_only=True)
+    try:
+        header = [str(h) if h is not None else "" for h in next(rows)]
+    except StopIteration:
+        wb.close()
+        return
+    buf = []
+    for row in rows:
+        buf.append(row)
+        if len(buf) >= chunksize:
+            yield pd.DataFrame(buf, columns=header)
+            buf = []
+    if buf:
+        yield pd.DataFrame(buf, columns=header)
+    wb.close()
+
+
+def input_columns(final_columns):
+    """Columns the batch path reads from an upload; everything else is skipped.
+
+    The score store's ``ID_COLUMNS`` are included so ``id_column`` sees the
+    upload's real identifier; absent ones are simply not read.
+    """
+    return list(dict.fromkeys([*ID_COLUMNS, NAME_COLUMN, *final_columns, LABEL_COLUMN]))
+
+
+def read_chunks(source, filename, chunksize=DEFAULT_CHUNK, columns=None):
+    """Yield the upload as DataFrames of at most ``chunksize`` rows.
+
+    With ``columns``, CSV, Parquet and Arrow IPC inputs are projected to
+    those columns while parsing; absent ones are left for ``prepare_chunk``
+    to report.
+    """
+    name = filename.lower()
+    if name.endswith(".csv"):
+        usecols = None if columns is None else set(columns).__contains__
+        yield from pd.read_csv(source, chunksize=chunksize, usecols=usecols)
+    elif name.endswith(".parquet"):
+        yield from parquet_chunks(source, chunksize, columns)
+    elif name.endswith(IPC_SUFFIXES):
+        yield from ipc_chunks(source, chunksize, columns)
+    elif name.endswith(".xlsx"):
+        yield from _excel_chunks(source, chunksize)
+    else:
+        # Legacy .xls has no streaming reader; parse once and slice.
+        df = pd.read_excel(source)
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start:start + chunksize]
+
+
+def encode_salary(values):
+    """Salary labels as ``SALARY_MAP`` codes (float, NaN when unknown).
+
+    Goes through a categorical so only the distinct labels are lower-cased
+    and looked up; numeric columns are taken as already encoded.
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype=np.float64)
+    cat   = values.astype("category")
+    known = cat.cat.categories.astype(str).str.lower().map(SALARY_MAP)
+    # code -1 (missing) picks the trailing NaN
+    lut   = np.append(np.asarray(known, dtype=np.float64), np.nan)
+    return lut[cat.cat.codes.to_numpy()]
+
+
+def validate_chunk(df_proc, raw, names, row_offset=0):
+    """Per-row validation of an encoded chunk, using array operations only.
+
+    ``raw`` holds the same columns before encoding, to tell empty cells from
+    unparseable ones. Returns ``(valid, report)``: a boolean mask over the
+    chunk and one report row per rejected row, with the 1-based data row
+    number, the name and, per feature, what is wrong (empty if nothing).
+    """
+    values  = df_proc.to_numpy(dtype=np.float64)
+    empty   = raw.isna().to_numpy()
+    unread  = np.isnan(values) & ~empty
+    lo, hi  = np.array([VALID_RANGES.get(c, (-np.inf, np.inf)) for c in df_proc.columns]).T
+    outside = ~np.isnan(values) & ((values < lo) | (values > hi))
+    partial = np.isin(df_proc.columns, INTEGER_COLUMNS) & (values != np.round(values)) & ~np.isnan(values)
+    bad     = empty | unread | outside | partial
+    valid   = ~bad.any(axis=1)
+
+    rows   = np.flatnonzero(~valid)
+    report = {"Baris": rows + row_offset + 1, "Nama Karyawan": names[rows]}
+    for j, col in enumerate(df_proc.columns):
+        unread_msg = "label tidak dikenal" if col == "salary" else "bukan angka"
+        report[col] = np.select(
+            [empty[rows, j], unread[rows, j], outside[rows, j], partial[rows, j]],
+            ["kosong", unread_msg, f"di luar rentang {lo[j]:g}–{hi[j]:g}", "bukan bilangan bulat"],
+            default="",
+        )
+    return valid, pd.DataFrame(report)
+
+
+def prepare_chunk(df_chunk, final_columns, row_offset=0):
+    """Check columns, encode salary and validate the rows of one chunk.
+
+    Returns ``(names, df_proc, report)`` where ``names`` and ``df_proc`` are
+    aligned on the rows that passed validation and ``report`` lists the
+    rejected ones (see ``validate_chunk``).
+    """
+    missing_cols = [c for c in final_columns if c not in df_chunk.columns]
+    if missing_cols:
+        raise MissingColumnsError(missing_cols)
+
+    if NAME_COLUMN in df_chunk.columns:
+        names = df_chunk[NAME_COLUMN].to_numpy()
+    else:
+        numbers = pd.Series(np.arange(row_offset + 1, row_offset + len(df_chunk) + 1)).astype(str)
+        names   = ("Karyawan " + numbers).to_numpy(dtype=object)
+
+    raw     = df_chunk[final_columns]
+    df_proc = pd.DataFrame({
+        col: encode_salary(raw[col]) if col == "salary"
+        else raw[col] if pd.api.types.is_numeric_dtype(raw[col])
+        else pd.to_numeric(raw[col], errors="coerce")
+        for col in final_columns
+    }, index=raw.index)
+
+    valid, report = validate_chunk(df_proc, raw, names, row_offset)
+    if valid.all():
+        return names, df_proc, report
+    return names[valid], df_proc.loc[valid], report
+
+
+def score_chunk(df_proc, names, model, scaler, final_columns, thresholds=DEFAULT_THRESHOLDS,
+                explainer=None, top_k=0, known=None):
+    """Score one validated chunk; with an ``explainer`` also append its top-k SHAP drivers.
+
+    Pass ``scaler=None`` when ``model`` has the scaler folded in (see ``attrition.fusion``).
+    ``known=(mask, probas)`` supplies probabilities that are already known
+    (e.g. from a ``ScoreStore``); only the remaining rows are scaled and scored.
+    """
+    X = None
+    if known is None or explainer is not None:
+        with metrics.stage("batch", "scale"):
+            X = model_input(df_proc, scaler)
+    if known is None:
+        with metrics.stage("batch", "predict"):
+            probas = model.predict_proba(X)[:, 1]
+    else:
+        mask, stored = known
+        probas = stored.astype(np.float32)
+        fresh  = ~mask
+        if fresh.any():
+            if X is not None:
+                X_fresh = X[fresh]
+            else:
+                with metrics.stage("batch", "scale"):
+                    X_fresh = model_input(df_proc.loc[fresh], scaler)
+            with metrics.stage("batch", "predict"):
+                probas[fresh] = model.predict_proba(X_fresh)[:, 1]
+    preds  = (probas > thresholds.decision).astype(np.int8)
+    df_out = pd.DataFrame({
+        "Nama Karyawan"          : names,
+        **{col: df_proc[col].values for col in final_columns},
+        "Resign Probability (%)" : (probas * 100).round(1),
+        "Prediction"             : pd.Categorical.from_codes(preds, PREDICTION_LABELS),
+        "Risk Level"             : pd.Categorical.from_codes(thresholds.risk_codes(probas), RISK_LABELS),
+    })
+    if explainer is not None and top_k:
+        with metrics.stage("batch", "explain"):
+            drivers = top_drivers(shap_matrix(explainer, X), final_columns, top_k)
+        df_out  = pd.concat([df_out, drivers], axis=1)
+    return df_out, probas
+
+
+def apply_thresholds(result_path, summary, thresholds):
+    """Re-bucket a stored Arrow result for new ``thresholds``; returns the updated summary.
+
+    Only ``Prediction`` and ``Risk Level`` (and the risk counts) depend on the
+    thresholds, so the upload is not read or scored again. The buckets come
+    from the stored probability, i.e. the 0.1 pp value shown and exported.
+    """
+    probas = read_column(result_path, "Resign Probability (%)").to_numpy() / 100
+    codes  = thresholds.risk_codes(probas)
+    replace_columns(result_path, {
+        "Prediction": pd.Categorical.from_codes((probas > thresholds.decision).astype(np.int8), PREDICTION_LABELS),
+        "Risk Level": pd.Categorical.from_codes(codes, RISK_LABELS),
+    })
+    low, moderate, high = np.bincount(codes, minlength=len(RISK_LABELS))
+    changes = {"thresholds": thresholds, "high_risk": int(high), "moderate": int(moderate), "low_risk": int(low)}
+    if summary.store_note is None and summary.store_key is not None:
+        previous = read_column(result_path, HISTORY_COLUMNS[0]).to_numpy() / 100
+        seen     = ~np.isnan(previous)
+        move     = codes[seen].astype(np.int64) - thresholds.risk_codes(previous[seen])
+        changes.update(risk_up=int((move > 0).sum()), risk_down=int((move < 0).sum()))
+    return replace(summary, **changes)
+
+
+def _source_progress(source):
+    try:
+        if hasattr(source, "size"):
+            size = source.size
+        elif hasattr(source, "getbuffer"):
+            size = source.getbuffer().nbytes
+        else:
+            size = os.fstat(source.fileno()).st_size
+        return lambda: min(source.tell() / size, 1.0) if size else None
+    except (AttributeError, OSError, ValueError):
+        return lambda: None
+
+
+def score_stream(chunks, model, scaler, final_columns, out, on_progress=None, source=None,
+                 thresholds=DEFAULT_THRESHOLDS, explainer=None, top_k=0, preview_rows=PREVIEW_ROWS,
+                 store=None):
+    """Score ``chunks`` and append each scored chunk to ``out``.
+
+    ``out`` is a text stream, which receives CSV, or a ``TableWriter``.
+    ``summary.preview`` keeps the ``preview_rows`` highest-risk rows; pass 0
+    when the caller sorts the stored result itself.
+
+    With a ``ScoreStore``, employees are keyed on the first ``ID_COLUMNS``
+    column of the upload. Unchanged rows reuse the stored probability,
+    ``HISTORY_COLUMNS`` are appended, and the store is saved at the end.
+    Uploads without an identifier column are scored in full. A key that
+    repeats within the upload raises ``DuplicateKeysError`` before the store
+    is touched; score the upload again without the store.
+
+    Passing an ``explainer`` with ``top_k > 0`` adds each employee's top-k SHAP
+    drivers as extra columns.
+
+    When the upload carries the actual outcome (``LABEL_COLUMN``),
+    ``summary.evaluation`` accumulates it with the probabilities for
+    ``attrition.evaluation``.
+
+    ``on_progress(rows_done, fraction)`` is called after every chunk; fraction
+    is derived from ``source.tell()`` when the source is seekable, else None.
+    """
+    summary  = BatchSummary(thresholds=thresholds)
+    fraction = _source_progress(source) if source is not None else (lambda: None)
+    offset   = 0
+    writer   = out if isinstance(out, TableWriter) else TableWriter(
+        out, "csv", result_columns(final_columns, top_k if explainer is not None else 0, history=store is not None))
+
+    chunks = iter(chunks)
+    while True:
+        with metrics.stage("batch", "read"):
+            df_chunk = next(chunks, None)
+        if df_chunk is None:
+            break
+        if store is not None and summary.store_key is None:
+            summary.store_key = id_column(df_chunk.columns)
+        with metrics.stage("batch", "validate"):
+            names, df_proc, report = prepare_chunk(df_chunk, final_columns, row_offset=offset)
+        offset += len(df_chunk)
+        summary.add_rejected(report)
+        if len(df_proc):
+            known = None
+            if summary.store_key is not None:
+                ids    = df_chunk.loc[df_proc.index, summary.store_key].to_numpy()
+                hashes = feature_hash(df_proc)
+                try:
+                    reuse, stored, previous = store.lookup(ids, hashes)
+                except DuplicateKeysError as e:
+                    raise DuplicateKeysError(e.examples, summary.store_key) from None
+                known  = (reuse, stored)
+            df_out, probas = score_chunk(df_proc, names, model, scaler, final_columns, thresholds,
+                                         explainer=explainer, top_k=top_k, known=known)
+            if known is not None:
+                store.record(ids, hashes, probas, previous)
+                summary.update_history(probas, stored, previous, reuse)
+                df_out[HISTORY_COLUMNS[0]] = (previous * 100).round(1)
+                df_out[HISTORY_COLUMNS[1]] = ((probas - previous) * 100).round(1)
+            writer.write(df_out)
+            summary.update(probas)
+            summary.drift.update(df_proc, probas)
+            if LABEL_COLUMN in df_chunk.columns:
+                if summary.evaluation is None:
+                    summary.evaluation = EvaluationSketch()
+                summary.evaluation.update(df_proc, probas, df_chunk.loc[df_proc.index, LABEL_COLUMN])
+            if preview_rows:
+                summary.keep_top(df_out, preview_rows)
+        if on_progress is not None:
+            on_progress(offset, fraction())
+
+    if writer is not out:
+        writer.close()
+    if summary.store_key is not None:
+        store.save()
+    metrics.count("batch", "rows_scored", summary.total)
+    metrics.count("batch", "rows_rejected", summary.skipped)
+    metrics.count("batch", "rows_reused", summary.reused)
+    return summary
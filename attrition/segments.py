@@ -0,0 +1,145 @@
+"""Per-segment aggregates of a scored batch: salary, tenure band, projects and promotion.
+
+``build_segments`` reads the stored Arrow result once (only the segment
+columns, probability, risk level and driver column), assigns every row a code
+per dimension with ``np.digitize`` and reduces with ``np.bincount``. Every
+dimension and every pair of dimensions is aggregated in the same pass, so
+the drill-down views in the app (a segment broken down by a second
+dimension) are lookups in the returned table and never touch the rows again.
+
+Per segment the table holds the row count, mean resign probability, the
+share of each risk level and the top SHAP driver. The driver is the most
+frequent ``Top Driver 1`` when the upload was scored with SHAP. Otherwise it
+is the feature with the largest mean |SHAP| over a random sample of the
+result, when an explainer is given.
+"""
+import itertools
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from attrition.columnar import read_columns, read_rows
+from attrition.explain import shap_matrix
+from attrition.scoring import RISK_LABELS, model_input
+
+SHAP_SAMPLE = 500
+
+
+@dataclass(frozen=True)
+class Dimension:
+    name  : str
+    column: str
+    bins  : tuple     # np.digitize edges
+    labels: tuple     # one per bin, len(bins) + 1
+
+
+DIMENSIONS = (
+    Dimension("Salary", "salary", (1, 2), ("low", "medium", "high")),
+    Dimension("Masa Kerja", "time_spend_company", (3, 4, 5, 7), ("≤2 th", "3 th", "4 th", "5–6 th", "≥7 th")),
+    Dimension("Jumlah Proyek", "number_project", (3, 4, 5, 6, 7), ("≤2", "3", "4", "5", "6", "≥7")),
+    Dimension("Promosi", "promotion_last_5years", (1,), ("Tidak", "Ya")),
+)
+
+PROBA_COLUMN  = "Resign Probability (%)"
+DRIVER_COLUMN = "Top Driver 1"
+SHARE_COLUMNS = [f"Share {level} (%)" for level in RISK_LABELS]
+
+
+def _aggregate(codes, n_cells, probas, risk, drivers, n_drivers):
+    """Count, mean probability, risk shares and modal driver for each of ``n_cells`` codes."""
+    count  = np.bincount(codes, minlength=n_cells)
+    safe   = np.maximum(count, 1)
+    mean   = np.bincount(codes, weights=probas, minlength=n_cells) / safe
+    shares = np.bincount(codes * len(RISK_LABELS) + risk, minlength=n_cells * len(RISK_LABELS))
+    shares = shares.reshape(n_cells, len(RISK_LABELS)) / safe[:, None] * 100
+    table  = {"Count": count, "Mean Probability (%)": mean.round(1),
+              **{col: shares[:, i].round(1) for i, col in enumerate(SHARE_COLUMNS)}}
+    if drivers is not None:
+        # drivers: per-row driver codes (-1 for none), or a per-cell score matrix
+        if drivers.ndim == 1:
+            votes = np.bincount(codes[drivers >= 0] * n_drivers + drivers[drivers >= 0],
+                                minlength=n_cells * n_drivers).reshape(n_cells, n_drivers)
+        else:
+            votes = drivers
+        table["_driver"] = np.where(votes.max(axis=1) > 0, votes.argmax(axis=1), -1)
+    return table
+
+
+def _sample_drivers(result_path, n, explainer, scaler, final_columns, seed):
+    """Mean |SHAP| per row sample, for the driver of each cell without per-row drivers."""
+    rng   = np.random.default_rng(seed)
+    index = np.sort(rng.choice(n, min(SHAP_SAMPLE, n), replace=False))
+    rows  = read_rows(result_path, index)[final_columns]
+    return index, np.abs(shap_matrix(explainer, model_input(rows, scaler)))
+
+
+@dataclass
+class SegmentAggregates:
+    """Aggregates for every dimension (``Within`` empty) and every ordered pair of dimensions."""
+
+    table      : pd.DataFrame
+    total      : int
+    driver_note: str
+
+    def view(self, dimension, within=None):
+        """Rows for ``dimension``; with ``within=(dimension, segment)`` the breakdown inside that segment."""
+        t = self.table
+        if within is None:
+            t = t[(t["Dimension"] == dimension) & (t["Within"] == "")]
+        else:
+            t = t[(t["Dimension"] == dimension) & (t["Within"] == within[0]) & (t["Within Segment"] == within[1])]
+        return t.drop(columns=["Dimension", "Within", "Within Segment"]).reset_index(drop=True)
+
+
+def build_segments(result_path, final_columns, explainer=None, scaler=None, dimensions=DIMENSIONS, seed=0):
+    """Aggregate a stored Arrow result by every dimension and every pair of dimensions."""
+    columns = [d.column for d in dimensions] + [PROBA_COLUMN, "Risk Level"]
+    table   = read_columns(result_path, columns + [DRIVER_COLUMN])
+    probas  = table[PROBA_COLUMN].to_numpy(np.float64)
+    risk    = table["Risk Level"].cat.codes.to_numpy().astype(np.int64)
+    codes   = [np.digitize(table[d.column].to_numpy(), d.bins) for d in dimensions]
+    n_feat  = len(final_columns)
+
+    driver_rows = driver_scores = None
+    if DRIVER_COLUMN in table:
+        driver_rows = pd.Categorical(table[DRIVER_COLUMN], categories=final_columns).codes.astype(np.int64)
+        driver_note = "Top Driver 1 terbanyak per segmen"
+    elif explainer is not None and len(probas):
+        sample, abs_shap = _sample_drivers(result_path, len(probas), explainer, scaler, final_columns, seed)
+        driver_note = f"rata-rata |SHAP| terbesar pada sampel acak {len(sample):,} karyawan"
+    else:
+        driver_note = "tidak tersedia"
+
+    def cell_drivers(cell_codes, n_cells):
+        if driver_rows is not None:
+            return driver_rows
+        if explainer is None or not len(probas):
+            return None
+        sampled = cell_codes[sample]
+        sums    = np.zeros((n_cells, n_feat))
+        np.add.at(sums, sampled, abs_shap)
+        return sums
+
+    frames = []
+    for dim, dim_codes in zip(dimensions, codes):
+        n_cells = len(dim.labels)
+        agg = _aggregate(dim_codes, n_cells, probas, risk, cell_drivers(dim_codes, n_cells), n_feat)
+        frames.append(pd.DataFrame({"Dimension": dim.name, "Within": "", "Within Segment": "",
+                                    "Segment": dim.labels, **agg}))
+    for (a, a_codes), (b, b_codes) in itertools.permutations(zip(dimensions, codes), 2):
+        n_cells = len(a.labels) * len(b.labels)
+        cell    = a_codes * len(b.labels) + b_codes
+        agg = _aggregate(cell, n_cells, probas, risk, cell_drivers(cell, n_cells), n_feat)
+        frames.append(pd.DataFrame({"Dimension": b.name, "Within": a.name,
+                                    "Within Segment": np.repeat(a.labels, len(b.labels)),
+                                    "Segment": np.tile(b.labels, len(a.labels)), **agg}))
+
+    out = pd.concat(frames, ignore_index=True)
+    out = out[out["Count"] > 0]
+    if "_driver" in out.columns:
+        labels = np.asarray([*final_columns, None], dtype=object)
+        out["Top Driver"] = labels[out.pop("_driver").to_numpy()]
+    else:
+        out["Top Driver"] = None
+    return SegmentAggregates(out.reset_index(drop=True), len(probas), driver_note)
@@ -0,0 +1,236 @@
+"""Headless HTTP scoring service.
+
+Loads the model bundle once and exposes::
+
+    GET  /health
+    POST /predict         one JSON record
+    POST /predict/batch   JSON list (or {"records": [...]}) or a CSV body
+    POST /explain         one JSON record or a JSON list
+
+Concurrent requests are coalesced by ``MicroBatcher`` into a single model
+call per batch window. Tornado ships with Streamlit, so the service needs no
+extra dependency. Run from the repository root::
+
+    python -m attrition.service --port 8000
+"""
+import argparse
+import asyncio
+import io
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import tornado.web
+
+from attrition.engine import InvalidRowsError, ScoringEngine
+from attrition.scoring import MissingColumnsError
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH   = 512
+DEFAULT_MAX_WAIT_MS = 2.0
+
+
+class MicroBatcher:
+    """Collect feature matrices from concurrent requests and score them together.
+
+    The first request opens a window of ``max_wait_ms``; everything queued
+    before it closes (up to ``max_batch`` rows) is concatenated and sent to
+    the model in one call on a worker thread, then split back per request.
+    """
+
+    def __init__(self, engine, max_batch=DEFAULT_MAX_BATCH, max_wait_ms=DEFAULT_MAX_WAIT_MS, executor=None):
+        self.engine      = engine
+        self.max_batch   = max_batch
+        self.max_wait    = max_wait_ms / 1000
+        self.executor    = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="scoring")
+        self.batches     = 0
+        self.rows        = 0
+        self._queue      = None
+        self._task       = None
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._task  = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def submit(self, X):
+        if self._task is None:
+            self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((X, future))
+        return await future
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        rows  = len(batch[0][0])
+        loop  = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while rows < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            rows += len(item[0])
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch  = await self._collect()
+            frames = [X for X, _ in batch]
+            try:
+                merged = frames[0] if len(frames) == 1 else np.vstack(frames)
+                probas, labels, risks = await loop.run_in_executor(self.executor, self.engine.predict_proba, merged)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.rows    += len(merged)
+            bounds = np.cumsum([0] + [len(X) for X in frames])
+            for (_, future), lo, hi in zip(batch, bounds[:-1], bounds[1:]):
+                if not future.done():
+                    future.set_result((probas[lo:hi], labels[lo:hi], risks[lo:hi]))
+
+
+class BaseHandler(tornado.web.RequestHandler):
+    def initialize(self, engine, batcher):
+        self.engine  = engine
+        self.batcher = batcher
+
+    def write_json(self, payload, status=200):
+        self.set_status(status)
+        self.set_header("Content-Type", "application/json")
+        self.finish(json.dumps(payload))
+
+    def write_error(self, status_code, **kwargs):
+        exc = kwargs.get("exc_info", (None, None))[1]
+        message = exc.log_message if isinstance(exc, tornado.web.HTTPError) and exc.log_message else self._reason
+        self.write_json({"error": message}, status=status_code)
+
+    def json_body(self):
+        try:
+            return json.loads(self.request.body or b"null")
+        except json.JSONDecodeError as e:
+            raise tornado.web.HTTPError(400, f"invalid JSON: {e}")
+
+    def records(self, payload):
+        if isinstance(payload, dict) and "records" in payload:
+            payload = payload["records"]
+        if isinstance(payload, dict):
+            return [payload]
+        if isinstance(payload, list) and payload and all(isinstance(r, dict) for r in payload):
+            return payload
+        raise tornado.web.HTTPError(400, "expected a JSON object or a non-empty list of objects")
+
+    def features(self, data):
+        try:
+            return self.engine.features(data)
+        except MissingColumnsError as e:
+            raise tornado.web.HTTPError(422, str(e))
+        except InvalidRowsError as e:
+            # Same per-column report as the batch upload: what is wrong with which field of which row.
+            self.write_json({"error": str(e), "rows": e.problems()}, status=400)
+            raise tornado.web.Finish()
+
+    async def score(self, data):
+        X = self.features(data)
+        probas, labels, risks = await self.batcher.submit(X)
+        return self.engine.format_results(self.engine.names(data, len(X)), probas, labels, risks)
+
+
+class HealthHandler(BaseHandler):
+    def get(self):
+        self.write_json({
+            "status"  : "ok",
+            "features": self.engine.final_columns,
+            "batches" : self.batcher.batches,
+            "rows"    : self.batcher.rows,
+        })
+
+
+class PredictHandler(BaseHandler):
+    async def post(self):
+        payload = self.json_body()
+        if not isinstance(payload, dict):
+            raise tornado.web.HTTPError(400, "expected a single JSON object")
+        results = await self.score([payload])
+        self.write_json(results[0])
+
+
+class BatchPredictHandler(BaseHandler):
+    async def post(self):
+        content_type = self.request.headers.get("Content-Type", "")
+        if content_type.startswith("text/csv"):
+            try:
+                data = pd.read_csv(io.BytesIO(self.request.body))
+            except Exception as e:
+                raise tornado.web.HTTPError(400, f"invalid CSV: {e}")
+        else:
+            data = self.records(self.json_body())
+        results = await self.score(data)
+
+        wants_csv = "text/csv" in self.request.headers.get("Accept", "") or self.get_argument("format", "") == "csv"
+        if wants_csv:
+            self.set_header("Content-Type", "text/csv")
+            self.finish(pd.DataFrame(results).to_csv(index=False))
+        else:
+            self.write_json({"results": results})
+
+
+class ExplainHandler(BaseHandler):
+    async def post(self):
+        payload = self.json_body()
+        X       = self.features(self.records(payload))
+        loop    = asyncio.get_running_loop()
+        results = await loop.run_in_executor(self.batcher.executor, self.engine.explain_features, X)
+        self.write_json(results[0] if isinstance(payload, dict) and "records" not in payload else {"results": results})
+
+
+def make_app(engine=None, max_batch=DEFAULT_MAX_BATCH, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+    engine  = engine or ScoringEngine()
+    batcher = MicroBatcher(engine, max_batch=max_batch, max_wait_ms=max_wait_ms)
+    deps    = {"engine": engine, "batcher": batcher}
+    return tornado.web.Application([
+        (r"/health", HealthHandler, deps),
+        (r"/predict", PredictHandler, deps),
+        (r"/predict/batch", BatchPredictHandler, deps),
+        (r"/explain", ExplainHandler, deps),
+    ])
+
+
+async def serve(host, port, **kwargs):
+    app = make_app(**kwargs)
+    app.listen(port, address=host)
+    log.info("scoring service listening on http://%s:%d", host, port)
+    await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HR attrition scoring service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH,
+                        help="maximum rows coalesced into one model call")
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS,
+                        help="how long the first request in a batch waits for others")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    asyncio.run(serve(args.host, args.port, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Startup timing: per-import and per-artifact durations, time to first render
+and to the first single prediction.
+
+Streamlit reruns the app script on every interaction, so each stage is only
+recorded the first time it runs in the process; later reruns hit the module
+and resource caches and would only add noise.
+"""
+import importlib
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+log = logging.getLogger(__name__)
+
+REPORT_ENV = "ATTRITION_STARTUP_REPORT"
+# Imports the single-prediction fast path is meant to avoid.
+HEAVY_MODULES = ("xgboost", "sklearn", "shap", "matplotlib.pyplot")
+
+
+def _process_start():
+    """Wall-clock time the interpreter process started (Linux), else now."""
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - uptime + start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return time.time()
+
+
+PROCESS_START = _process_start()
+
+_stages           = {}
+_first_render     = None
+_first_prediction = None
+
+
+@contextmanager
+def timed(kind, name):
+    """Record how long the block takes, the first time ``(kind, name)`` runs."""
+    key = (kind, name)
+    if key in _stages:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _stages.setdefault(key, time.perf_counter() - start)
+
+
+def timed_import(module_name):
+    """Import ``module_name`` and record its cold import time."""
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    with timed("import", module_name):
+        return importlib.import_module(module_name)
+
+
+def mark_first_render():
+    """Record time from process start to the end of the first script run."""
+    global _first_render
+    if _first_render is not None:
+        return
+    _first_render = time.time() - PROCESS_START
+    path = os.environ.get(REPORT_ENV)
+    if path:
+        write_report(path)
+    log.info("first render %.2fs after process start", _first_render)
+
+
+def mark_first_prediction(started):
+    """Record the time from ``started`` (a ``perf_counter``) to the first prediction shown, and its heavy imports."""
+    global _first_prediction
+    if _first_prediction is not None:
+        return
+    _first_prediction = {"seconds": time.perf_counter() - started, "after_start": time.time() - PROCESS_START,
+                         "modules": [m for m in HEAVY_MODULES if m in sys.modules]}
+
+
+def report():
+    stages = [
+        {"kind": kind, "name": name, "seconds": round(seconds, 4)}
+        for (kind, name), seconds in _stages.items()
+    ]
+    return {
+        "first_render_seconds": None if _first_render is None else round(_first_render, 4),
+        "first_prediction"    : None if _first_prediction is None else
+                                {k: round(v, 4) if isinstance(v, float) else v for k, v in _first_prediction.items()},
+        "stages": sorted(stages, key=lambda s: -s["seconds"]),
+    }
+
+
+def write_report(path):
+    with open(path, "w") as f:
+        json.dump(report(), f, indent=2)
@@ -0,0 +1,168 @@
+"""What-if retention scenarios: the cheapest change that brings an employee below a risk threshold.
+
+A scenario sets some of the levers HR controls (salary band, monthly hours,
+number of projects, promotion) and leaves the other features as they are.
+Every employee is crossed with every scenario of the grid and the whole
+``(employees × scenarios)`` block is scored with batched ``predict_proba``
+calls of at most ``max_rows`` rows, so thousands of employees × a few
+hundred scenarios take seconds rather than one rerun per slider move.
+
+Costs are relative units (``Lever.unit_cost`` per unit of change) meant to
+rank interventions, not money; adjust ``DEFAULT_LEVERS`` to the company's
+own trade-offs.
+"""
+import itertools
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from attrition.scoring import SALARY_MAP, model_input
+
+DEFAULT_TARGET   = 0.4
+DEFAULT_MAX_ROWS = 500_000
+
+NO_CHANGE = "tanpa perubahan"
+
+
+@dataclass(frozen=True)
+class Lever:
+    """One adjustable feature: the values a scenario may set it to and the cost per unit of change.
+
+    With ``raise_only`` a target below the employee's current value leaves it
+    unchanged (salary is never cut, a promotion is never taken back).
+    """
+
+    column    : str
+    options   : tuple
+    unit_cost : float
+    raise_only: bool = False
+
+
+DEFAULT_LEVERS = (
+    Lever("salary", (1, 2), unit_cost=3.0, raise_only=True),
+    Lever("average_montly_hours", (140, 160, 180, 200, 220, 240), unit_cost=0.1),
+    Lever("number_project", (2, 3, 4, 5, 6), unit_cost=1.0),
+    Lever("promotion_last_5years", (1,), unit_cost=5.0, raise_only=True),
+)
+
+_SALARY_NAMES = {v: k for k, v in SALARY_MAP.items()}
+
+
+def scenario_targets(levers=DEFAULT_LEVERS):
+    """``(n_scenarios, n_levers)`` target values; NaN keeps the current value.
+
+    Row 0 is the all-NaN scenario (no change).
+    """
+    choices = [(np.nan, *lever.options) for lever in levers]
+    return np.array(list(itertools.product(*choices)), dtype=np.float64).reshape(-1, len(levers))
+
+
+def _expand(X, columns, targets, levers):
+    """Apply every scenario to every row: ``(n, s, f)`` features and ``(n, s)`` costs."""
+    grid = np.repeat(X[:, None, :], len(targets), axis=1)
+    cost = np.zeros(grid.shape[:2])
+    for j, lever in enumerate(levers):
+        c   = columns.index(lever.column)
+        cur = X[:, c][:, None]
+        new = np.where(np.isnan(targets[:, j]), cur, targets[:, j])
+        if lever.raise_only:
+            new = np.maximum(new, cur)
+        grid[:, :, c] = new
+        cost += np.abs(new - cur) * lever.unit_cost
+    return grid, cost
+
+
+def score_scenarios(df_proc, model, scaler, final_columns, levers=DEFAULT_LEVERS, max_rows=DEFAULT_MAX_ROWS,
+                    on_progress=None):
+    """Score every scenario for every row of ``df_proc`` (encoded features, as from ``prepare_chunk``).
+
+    Returns ``(grid, cost, probas)``: the scenario features ``(n, s, f)``, the
+    cost ``(n, s)`` and the resign probability ``(n, s)``. Rows are scored in
+    batches of whole employees totalling at most ``max_rows`` rows, with
+    ``on_progress(employees_done, fraction)`` called after each batch.
+    """
+    columns = list(final_columns)
+    X       = np.asarray(df_proc[columns], dtype=np.float64)
+    targets = scenario_targets(levers)
+    grid, cost = _expand(X, columns, targets, levers)
+    probas = np.empty(cost.shape, dtype=np.float64)
+    step   = max(1, max_rows // len(targets))
+    for start in range(0, len(X), step):
+        block = grid[start:start + step].reshape(-1, len(columns))
+        X_in  = model_input(pd.DataFrame(block, columns=columns), scaler)
+        probas[start:start + step] = model.predict_proba(X_in)[:, 1].reshape(-1, len(targets))
+        if on_progress is not None:
+            done = min(start + step, len(X))
+            on_progress(done, done / len(X))
+    return grid, cost, probas
+
+
+def _value(column, value):
+    return _SALARY_NAMES.get(int(value), value) if column == "salary" else f"{value:g}"
+
+
+def describe(old, new, final_columns, levers=DEFAULT_LEVERS):
+    """Readable list of the lever changes between two feature rows."""
+    changes = []
+    for lever in levers:
+        c = final_columns.index(lever.column)
+        if new[c] != old[c]:
+            changes.append(f"{lever.column} {_value(lever.column, old[c])} → {_value(lever.column, new[c])}")
+    return "; ".join(changes) or NO_CHANGE
+
+
+def _pick(cost, probas, target):
+    """Per row, the cheapest scenario below ``target`` (ties: lowest probability).
+
+    Rows with no such scenario get their lowest-probability scenario instead.
+    """
+    feasible  = probas < target
+    reachable = feasible.any(axis=1)
+    min_cost  = np.where(feasible, cost, np.inf).min(axis=1, keepdims=True)
+    candidate = np.where(reachable[:, None], feasible & (cost == min_cost), True)
+    return np.where(candidate, probas, np.inf).argmin(axis=1), reachable
+
+
+def cheapest_interventions(df_proc, model, scaler, final_columns, target=DEFAULT_TARGET,
+                           levers=DEFAULT_LEVERS, names=None, max_rows=DEFAULT_MAX_ROWS, on_progress=None):
+    """Cheapest scenario per employee that brings the resign probability below ``target``.
+
+    Employees already below ``target`` get the no-change scenario at cost 0.
+    Where no scenario in the grid reaches ``target``, the one with the lowest
+    probability is reported and ``Reaches Target`` is False. ``on_progress`` is
+    passed on to ``score_scenarios``.
+    """
+    final_columns = list(final_columns)
+    grid, cost, probas = score_scenarios(df_proc, model, scaler, final_columns, levers, max_rows, on_progress)
+    best, reachable = _pick(cost, probas, target)
+    rows = np.arange(len(best))
+    old  = grid[:, 0, :]
+    new  = grid[rows, best, :]
+    out  = pd.DataFrame({
+        "Nama Karyawan"            : names if names is not None else np.arange(1, len(best) + 1),
+        "Current Probability (%)"  : (probas[:, 0] * 100.0).round(1),
+        "Scenario Probability (%)" : (probas[rows, best] * 100.0).round(1),
+        "Cost"                     : cost[rows, best].round(2),
+        "Reaches Target"           : reachable,
+        "Intervention"             : [describe(o, n, final_columns, levers) for o, n in zip(old, new)],
+    })
+    for lever in levers:
+        out[f"New {lever.column}"] = new[:, final_columns.index(lever.column)]
+    return out
+
+
+def scenario_table(features, model, scaler, final_columns, target=DEFAULT_TARGET, levers=DEFAULT_LEVERS):
+    """All distinct scenarios for one employee, cheapest first (ties: lowest probability)."""
+    final_columns = list(final_columns)
+    df_proc = pd.DataFrame([features], columns=final_columns)
+    grid, cost, probas = score_scenarios(df_proc, model, scaler, final_columns, levers)
+    # raise_only levers make some scenarios identical to others; keep one of each.
+    _, first = np.unique(grid[0], axis=0, return_index=True)
+    order    = first[np.lexsort((probas[0, first], cost[0, first]))]
+    return pd.DataFrame({
+        "Intervention"          : [describe(grid[0, 0], grid[0, i], final_columns, levers) for i in order],
+        "Cost"                  : cost[0, order].round(2),
+        "Resign Probability (%)": (probas[0, order] * 100.0).round(1),
+        "Reaches Target"        : probas[0, order] < target,
+    })
@@ -0,0 +1,78 @@
+"""Load-time comparison: model bundle vs the five pickles.
+
+``open`` is what the app does on start-up: map the bundle and score one row
+through the compiled forest, without importing XGBoost. ``full`` also loads
+the booster, and ``scoring`` loads the scaler-folded booster that batch
+scoring uses (stored in the bundle; the pickles have to fold it). Each
+variant is loaded in a fresh interpreter (cold, including library imports)
+and again in-process (warm).
+
+Loading a booster from the bundle is not faster than unpickling it: the
+XGBoost import dominates both. The gains are ``open`` (no XGBoost at all)
+and ``scoring`` versus folding at start-up. Run from the repository root::
+
+    python -m benchmarks.bench_bundle --repeat 5
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+
+from attrition.artifacts import ARTIFACT_DIR, bundle_dir, load_pickles
+from attrition.bundle import ModelBundle, load_bundle, open_bundle
+
+warnings.filterwarnings("ignore")
+
+ROW  = [[0.4, 0.5, 2, 150, 3, 0, 0, 0]]
+COLD = {
+    "pickles"    : "from attrition.artifacts import load_pickles; load_pickles()",
+    "bundle full": "from attrition.artifacts import load_artifacts; load_artifacts()",
+    "bundle open": f"from attrition.artifacts import open_artifacts; open_artifacts().forest.predict_proba({ROW})",
+    "pickles scoring": "from attrition.artifacts import load_pickles; from attrition.bundle import ModelBundle; "
+                       "ModelBundle.from_artifacts(*load_pickles()).scoring_model",
+    "bundle scoring" : "from attrition.artifacts import open_artifacts; open_artifacts().scoring_model",
+}
+
+
+def cold_load(stmt):
+    code = f"import time, warnings; warnings.filterwarnings('ignore'); t = time.perf_counter(); {stmt}; print(time.perf_counter() - t)"
+    out  = subprocess.run([sys.executable, "-c", code], cwd=ARTIFACT_DIR, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def warm_load(fn, repeat):
+    fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    path = bundle_dir()
+    if path is None:
+        sys.exit("no model bundle found; run `python -m attrition.bundle build` first")
+
+    warm = {
+        "pickles"    : lambda: load_pickles(),
+        "bundle full": lambda: load_bundle(path),
+        "bundle open": lambda: open_bundle(path).forest.predict_proba(ROW),
+        "pickles scoring": lambda: ModelBundle.from_artifacts(*load_pickles()).scoring_model,
+        "bundle scoring" : lambda: open_bundle(path).scoring_model,
+    }
+    print(f"{'variant':<15} {'cold (median)':>14} {'warm (median)':>14}")
+    for name in COLD:
+        cold = statistics.median(cold_load(COLD[name]) for _ in range(args.repeat))
+        print(f"{name:<15} {cold * 1e3:>11.1f} ms {warm_load(warm[name], args.repeat * 4) * 1e3:>11.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
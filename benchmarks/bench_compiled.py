@@ -0,0 +1,66 @@
+"""Parity check and micro-benchmark: CompiledForest vs XGBClassifier.predict_proba.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_compiled
+
+The parity guarantee itself (random, missing and on-threshold values) is
+tested in ``tests/test_fast_tree.py``; this script repeats a quick check
+before timing.
+"""
+import argparse
+import time
+import warnings
+
+import numpy as np
+
+from attrition.artifacts import load_artifacts
+from attrition.fast_tree import CompiledForest
+
+warnings.filterwarnings("ignore")
+
+TOLERANCE = 1e-6
+
+
+def _time_per_call(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def check_parity(model, forest, X):
+    diff = np.abs(model.predict_proba(X)[:, 1] - forest.predict_proba(X)[:, 1]).max()
+    if diff > TOLERANCE:
+        raise AssertionError(f"CompiledForest deviates from predict_proba by {diff:.2e}")
+    return diff
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000, help="rows used for the parity check")
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    model, scaler, _, _, final_columns = load_artifacts()
+    start  = time.perf_counter()
+    forest = CompiledForest.from_model(model)
+    print(f"compile: {(time.perf_counter() - start) * 1e3:.1f} ms "
+          f"({forest.n_trees} trees, {forest.feature.shape[1]} max nodes, depth {forest.depth})")
+
+    rng = np.random.default_rng(0)
+    X   = rng.normal(size=(args.rows, len(final_columns))).astype(np.float32)
+    X[rng.random(X.shape) < 0.01] = np.nan
+    print(f"parity: max |Δp| = {check_parity(model, forest, X):.2e} over {args.rows:,} rows (tolerance {TOLERANCE:.0e})")
+
+    print(f"{'rows':>6} {'predict_proba':>15} {'compiled':>12} {'speed-up':>9}")
+    for n in (1, 8, 64, 512):
+        batch = X[:n]
+        t_xgb = _time_per_call(lambda: model.predict_proba(batch), args.repeat)
+        t_np  = _time_per_call(lambda: forest.predict_proba(batch), args.repeat)
+        print(f"{n:>6} {t_xgb * 1e6:>12.1f} µs {t_np * 1e6:>9.1f} µs {t_xgb / t_np:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Parse / score / export time for batch uploads in CSV, XLSX, Parquet and Arrow.
+
+A template-shaped roster (names, salary labels, the 8 features plus extra
+HRIS columns the model ignores) is written once per format, then read
+through ``read_chunks`` with column projection, validated, scored and
+written back in the same format. Run from the repository root::
+
+    python -m benchmarks.bench_formats --rows 200000
+"""
+import argparse
+import os
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from attrition.artifacts import open_artifacts
+from attrition.columnar import TableWriter
+from attrition.scoring import input_columns, prepare_chunk, read_chunks, result_columns, score_chunk
+from benchmarks.bench_fusion import synth_features
+
+warnings.filterwarnings("ignore")
+
+FORMATS       = ("csv", "xlsx", "parquet", "arrow")
+EXTRA_COLUMNS = 12
+
+
+def synth_roster(n, seed=0):
+    rng = np.random.default_rng(seed)
+    df  = synth_features(n, seed)
+    df["salary"] = np.array(["low", "medium", "high"])[df["salary"]]
+    df.insert(0, "nama_karyawan", [f"Karyawan {i}" for i in range(n)])
+    for i in range(EXTRA_COLUMNS):
+        df[f"hris_field_{i}"] = rng.integers(0, 1000, n) if i % 2 else rng.choice(["a", "b", "c"], n)
+    return df
+
+
+def write_input(df, path, fmt):
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+    elif fmt == "xlsx":
+        df.to_excel(path, index=False)
+    elif fmt == "parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.to_feather(path)
+
+
+def run(path, fmt, bundle):
+    final_columns = bundle.final_columns
+    model, scaler = bundle.scoring_model, bundle.input_scaler
+    parse = score = export = 0.0
+    out_path = os.path.join(os.path.dirname(path), f"scored.{fmt}")
+    columns  = result_columns(final_columns)
+
+    with open(path, "rb") as source:
+        chunks = read_chunks(source, path, columns=input_columns(final_columns))
+        writer = TableWriter(out_path, fmt, columns) if fmt != "xlsx" else None
+        frames = []
+        offset = 0
+        while True:
+            start = time.perf_counter()
+            df_chunk = next(chunks, None)
+            if df_chunk is None:
+                break
+            names, df_proc, _ = prepare_chunk(df_chunk, final_columns, row_offset=offset)
+            offset += len(df_chunk)
+            parse  += time.perf_counter() - start
+
+            start = time.perf_counter()
+            df_out, _ = score_chunk(df_proc, names, model, scaler, final_columns)
+            score += time.perf_counter() - start
+
+            start = time.perf_counter()
+            if writer is not None:
+                writer.write(df_out)
+            else:
+                frames.append(df_out)
+            export += time.perf_counter() - start
+
+    start = time.perf_counter()
+    if writer is not None:
+        writer.close()
+    else:
+        # openpyxl has no append mode worth using; Excel is written in one go.
+        pd.concat(frames, ignore_index=True).to_excel(out_path, index=False)
+    export += time.perf_counter() - start
+    size = os.path.getsize(out_path)
+    os.unlink(out_path)
+    return parse, score, export, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    args = parser.parse_args()
+
+    bundle = open_artifacts()
+    # Load and warm the booster outside the timed region.
+    bundle.scoring_model.predict_proba(np.zeros((1, len(bundle.final_columns)), dtype=np.float32))
+    roster = synth_roster(args.rows)
+
+    print(f"{args.rows:,} rows, {roster.shape[1]} columns in, {len(result_columns(bundle.final_columns))} out")
+    print(f"{'format':<8} {'input':>9} {'parse':>9} {'score':>9} {'export':>9} {'total':>9} {'output':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in args.formats:
+            path = os.path.join(tmp, f"roster.{fmt}")
+            write_input(roster, path, fmt)
+            parse, score, export, out_size = run(path, fmt, bundle)
+            print(f"{fmt:<8} {os.path.getsize(path) / 2**20:>6.1f} MB {parse:>7.2f} s {score:>7.2f} s "
+                  f"{export:>7.2f} s {parse + score + export:>7.2f} s {out_size / 2**20:>6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Parity check and timing: scaler folded into the booster vs scaler.transform.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_fusion
+"""
+import argparse
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from attrition.artifacts import load_artifacts
+from attrition.fusion import fold_scaler
+
+warnings.filterwarnings("ignore")
+
+
+def synth_features(n, seed=0):
+    """Feature frame on the same value grid as the HR survey (2-decimal scores, integer counts)."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "satisfaction_level"   : rng.integers(9, 101, n) / 100,
+        "last_evaluation"      : rng.integers(36, 101, n) / 100,
+        "number_project"       : rng.integers(2, 8, n),
+        "average_montly_hours" : rng.integers(96, 311, n),
+        "time_spend_company"   : rng.integers(2, 11, n),
+        "salary"               : rng.integers(0, 3, n),
+        "Work_accident"        : rng.integers(0, 2, n),
+        "promotion_last_5years": rng.integers(0, 2, n),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    model, scaler, _, _, final_columns = load_artifacts()
+    start = time.perf_counter()
+    fused = fold_scaler(model, scaler)
+    print(f"fold: {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    df = synth_features(args.rows)[final_columns]
+
+    start    = time.perf_counter()
+    p_scaled = model.predict_proba(scaler.transform(df))[:, 1]
+    t_scaled = time.perf_counter() - start
+
+    start    = time.perf_counter()
+    p_fused  = fused.predict_proba(df.to_numpy(dtype=np.float32))[:, 1]
+    t_fused  = time.perf_counter() - start
+
+    mismatches = int((p_scaled != p_fused).sum())
+    print(f"parity: {mismatches} of {args.rows:,} probabilities differ "
+          f"(max |Δp| = {np.abs(p_scaled - p_fused).max():.2e})")
+    print(f"scaler.transform + predict_proba: {t_scaled:.3f} s")
+    print(f"fused predict_proba:              {t_fused:.3f} s")
+    if mismatches:
+        raise AssertionError("fused model disagrees with the scaled pipeline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Cold-start report for the Streamlit app.
+
+Runs the app once in a fresh interpreter (via Streamlit's AppTest harness)
+and prints the time from process start to first render, broken down per
+import and per artifact load. It then clicks "Run Prediction" on Tab 1 and
+reports the time from the click to the probability being shown, and which
+heavy modules (XGBoost, scikit-learn, SHAP, pyplot) that needed. Run from
+the repository root::
+
+    python -m benchmarks.bench_startup --budget 6
+    python -m benchmarks.bench_startup --pickles     # the same, loading the five pickles
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from attrition.artifacts import BUNDLE_ENV
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CHILD = r"""
+import json, sys, warnings
+warnings.filterwarnings("ignore")
+from attrition import timing
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("app.py", default_timeout=300).run()
+if at.exception:
+    raise SystemExit(str(at.exception))
+# Streamlit itself imports plotly, so only shap and pyplot are checked.
+heavy = [m for m in ("shap", "matplotlib.pyplot") if m in sys.modules]
+at.button(key="single_predict").click().run()
+if at.exception:
+    raise SystemExit(str(at.exception))
+out = timing.report()
+out["heavy_modules_loaded"] = heavy
+print(json.dumps(out))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=float, default=None,
+                        help="fail if first render takes longer than this many seconds")
+    parser.add_argument("--json", metavar="PATH", help="also write the report to PATH")
+    parser.add_argument("--pickles", action="store_true",
+                        help="load the pickles instead of the model bundle, for comparison")
+    args = parser.parse_args()
+
+    env = {"PYTHONPATH": str(ROOT), **os.environ}
+    if args.pickles:
+        # A bundle override without a manifest makes the app fall back to the pickles.
+        env[BUNDLE_ENV] = str(ROOT / "no_bundle")
+    proc = subprocess.run([sys.executable, "-c", CHILD], cwd=ROOT, capture_output=True, text=True, env=env)
+    if proc.returncode:
+        sys.exit(proc.stderr or proc.stdout)
+    report = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    print(f"first render: {report['first_render_seconds']:.2f}s after process start")
+    for stage in report["stages"]:
+        print(f"  {stage['kind']:<9} {stage['name']:<32} {stage['seconds'] * 1e3:8.1f} ms")
+    first = report["first_prediction"]
+    print(f"first prediction: {first['seconds'] * 1e3:.0f} ms after the click, "
+          f"{first['after_start']:.2f}s after process start; "
+          f"heavy modules loaded: {', '.join(first['modules']) or 'none'}")
+    if report["heavy_modules_loaded"]:
+        print(f"warning: loaded on cold start: {', '.join(report['heavy_modules_loaded'])}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+    if args.budget is not None and report["first_render_seconds"] > args.budget:
+        sys.exit(f"first render {report['first_render_seconds']:.2f}s exceeds budget {args.budget:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
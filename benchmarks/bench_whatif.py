@@ -0,0 +1,51 @@
+"""Throughput of the what-if scenario engine.
+
+Scores the default scenario grid for template-shaped rosters of several
+sizes in batched ``predict_proba`` calls and reports employees × scenarios
+per second. Run from the repository root::
+
+    python -m benchmarks.bench_whatif --employees 1000 5000
+"""
+import argparse
+import time
+import warnings
+
+import numpy as np
+
+from attrition.artifacts import open_artifacts
+from attrition.scoring import prepare_chunk
+from attrition.whatif import cheapest_interventions, scenario_targets
+from benchmarks.suite import synth_template
+
+warnings.filterwarnings("ignore")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", nargs="+", type=int, default=[1_000, 5_000])
+    parser.add_argument("--budget", type=float, default=None,
+                        help="fail if any size takes longer than this many seconds")
+    args = parser.parse_args()
+
+    bundle = open_artifacts()
+    model  = bundle.scoring_model
+    model.predict_proba(np.zeros((1, len(bundle.final_columns)), dtype=np.float32))
+    n_scenarios = len(scenario_targets())
+
+    print(f"{n_scenarios} scenarios per employee")
+    slowest = 0.0
+    for n in args.employees:
+        names, df_proc, _ = prepare_chunk(synth_template(n), bundle.final_columns)
+        start   = time.perf_counter()
+        result  = cheapest_interventions(df_proc, model, bundle.input_scaler, bundle.final_columns, names=names)
+        seconds = time.perf_counter() - start
+        slowest = max(slowest, seconds)
+        at_risk = result["Current Probability (%)"] >= 40
+        print(f"{n:>8,} employees  {seconds:6.2f} s  {n * n_scenarios / seconds:>12,.0f} rows/s  "
+              f"{int(at_risk.sum()):,} at risk, {int(result.loc[at_risk, 'Reaches Target'].sum()):,} reachable")
+    if args.budget is not None and slowest > args.budget:
+        raise SystemExit(f"slowest run {slowest:.2f}s exceeds budget {args.budget:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
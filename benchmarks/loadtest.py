@@ -0,0 +1,89 @@
+"""Load test for the scoring service: p50/p99 latency and requests per second.
+
+Start the service first (``python -m attrition.service``) or pass ``--spawn``
+to run one in-process, then from the repository root::
+
+    python -m benchmarks.loadtest --requests 2000 --concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+from tornado.httpclient import AsyncHTTPClient, HTTPRequest
+
+from benchmarks.bench_fusion import synth_features
+
+SALARY_NAMES = ("low", "medium", "high")
+
+
+def make_payloads(n, batch_size):
+    df = synth_features(n * batch_size, seed=7)
+    df["salary"] = [SALARY_NAMES[s] for s in df["salary"]]
+    records = df.to_dict("records")
+    if batch_size == 1:
+        return [json.dumps(r) for r in records]
+    return [json.dumps(records[i:i + batch_size]) for i in range(0, len(records), batch_size)]
+
+
+async def run(url, payloads, concurrency):
+    client    = AsyncHTTPClient(max_clients=concurrency)
+    latencies = []
+    errors    = 0
+    queue     = asyncio.Queue()
+    for body in payloads:
+        queue.put_nowait(body)
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            body  = queue.get_nowait()
+            start = time.perf_counter()
+            resp  = await client.fetch(HTTPRequest(url, method="POST", body=body,
+                                                   headers={"Content-Type": "application/json"}),
+                                       raise_error=False)
+            latencies.append(time.perf_counter() - start)
+            errors += resp.code != 200
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return np.array(latencies), errors, time.perf_counter() - start
+
+
+async def main_async(args):
+    server = None
+    if args.spawn:
+        from attrition.service import make_app
+
+        server = make_app(max_batch=args.max_batch, max_wait_ms=args.max_wait_ms).listen(args.port)
+    base     = f"http://127.0.0.1:{args.port}"
+    endpoint = "/predict" if args.batch_size == 1 else "/predict/batch"
+    payloads = make_payloads(args.requests, args.batch_size)
+
+    await run(base + endpoint, payloads[:args.concurrency], args.concurrency)  # warm-up
+    lat, errors, elapsed = await run(base + endpoint, payloads, args.concurrency)
+
+    print(f"endpoint      {endpoint} (batch size {args.batch_size})")
+    print(f"requests      {len(lat):,} ({errors} errors), concurrency {args.concurrency}")
+    print(f"p50 latency   {np.percentile(lat, 50) * 1e3:.2f} ms")
+    print(f"p99 latency   {np.percentile(lat, 99) * 1e3:.2f} ms")
+    print(f"throughput    {len(lat) / elapsed:,.0f} req/s, {len(lat) * args.batch_size / elapsed:,.0f} rows/s")
+    if server is not None:
+        server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=1, help="records per request; >1 uses /predict/batch")
+    parser.add_argument("--spawn", action="store_true", help="start the service in-process")
+    parser.add_argument("--max-batch", type=int, default=512)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,394 @@
+"""Benchmark suite for artifact loading, scoring, SHAP and batch I/O.
+
+Synthesises rosters shaped like the Tab 2 template (same columns, value
+ranges and salary/accident/promotion frequencies) at each requested size,
+then times every stage of the batch path in isolation: artifact loading
+(cold, in a fresh interpreter), ``scaler.transform``, ``predict_proba``,
+TreeExplainer SHAP, CSV/Excel parsing, labelled-upload evaluation and
+result export. Each case also records its peak memory above the resident
+set it started from.
+
+Results are printed and optionally written as JSON. With ``--baseline``
+they are compared against a stored run and the process exits non-zero if
+any case got slower or hungrier than the tolerance allows, or ran without a
+baseline entry to compare with (``--allow-missing`` turns that into a
+warning). Run from the repository root::
+
+    python -m benchmarks.suite --baseline
+    python -m benchmarks.suite --sizes 1000000 10000000 --skip parse_xlsx shap --json big.json
+
+``--save-baseline`` writes the current run to the ``--baseline`` path.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from attrition.artifacts import ARTIFACT_DIR, load_pickles, open_artifacts
+from attrition.columnar import TableWriter
+from attrition.evaluation import EvaluationSketch, calibration, group_metrics, overall
+from attrition.explain import build_explainer, shap_matrix
+from attrition.scoring import (
+    DEFAULT_THRESHOLDS, input_columns, model_input, prepare_chunk, read_chunks, result_columns, score_chunk,
+)
+from benchmarks.bench_bundle import COLD
+
+warnings.filterwarnings("ignore")
+
+DEFAULT_SIZES = (1, 1_000, 100_000)
+BASELINE      = Path(__file__).resolve().parent / "baseline.json"
+
+# Same vocabulary and distributions as the template download in app.py.
+FIRST_NAMES = ("Budi", "Siti", "Andi", "Dewi", "Reza", "Fitri", "Hendra", "Lestari",
+               "Fajar", "Nurul", "Agus", "Ratna", "Dian", "Yusuf", "Mega")
+LAST_NAMES  = ("Santoso", "Rahayu", "Pratama", "Kusuma", "Hidayat", "Sari", "Wijaya",
+               "Nugroho", "Permata", "Utama", "Cahyono", "Lestari", "Saputra", "Wibowo", "Suryadi")
+
+
+def synth_template(n, seed=42):
+    """``n`` rows with the template's columns and value distributions."""
+    rng   = np.random.default_rng(seed)
+    first = np.array(FIRST_NAMES, dtype=object)[rng.integers(0, len(FIRST_NAMES), n)]
+    last  = np.array(LAST_NAMES, dtype=object)[rng.integers(0, len(LAST_NAMES), n)]
+    return pd.DataFrame({
+        "nama_karyawan"        : first + " " + last,
+        "satisfaction_level"   : rng.uniform(0.2, 0.9, n).round(2),
+        "last_evaluation"      : rng.uniform(0.4, 1.0, n).round(2),
+        "number_project"       : rng.integers(2, 8, n),
+        "average_montly_hours" : rng.integers(100, 281, n),
+        "time_spend_company"   : rng.integers(2, 9, n),
+        "salary"               : np.array(["low", "medium", "high"])[rng.choice(3, n, p=[0.5, 0.35, 0.15])],
+        "Work_accident"        : (rng.random(n) < 0.14).astype(np.int64),
+        "promotion_last_5years": (rng.random(n) < 0.02).astype(np.int64),
+    })
+
+
+# ── Peak memory ─────────────────────────────────────────────────────────────
+
+def _status_kb(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    raise OSError(field)
+
+
+class PeakMemory:
+    """Peak memory of a block above the resident set it started from, in MiB.
+
+    On Linux the kernel's high-water mark is reset first, so native
+    allocations (XGBoost, Arrow) count too; elsewhere only Python and NumPy
+    allocations seen by ``tracemalloc`` are.
+    """
+
+    def __enter__(self):
+        try:
+            with open("/proc/self/clear_refs", "w") as f:
+                f.write("5")
+            self._start = _status_kb("VmRSS")
+            self._rss   = True
+        except OSError:
+            tracemalloc.start()
+            self._rss = False
+        return self
+
+    def __exit__(self, *exc):
+        if self._rss:
+            self.mb = max(_status_kb("VmHWM") - self._start, 0) / 1024
+        else:
+            self.mb = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+
+
+# ── Cases ───────────────────────────────────────────────────────────────────
+# Each case takes the shared context and a roster size, does its untimed
+# setup and returns the zero-argument callable that is timed.
+
+CASES = {}
+
+
+def case(name, max_rows=None):
+    def register(setup):
+        CASES[name] = (setup, max_rows)
+        return setup
+    return register
+
+
+class Context:
+    def __init__(self, workdir):
+        self.workdir = Path(workdir)
+        self.bundle  = open_artifacts()
+        self.model, self.scaler, _, _, self.final_columns = load_pickles()
+        self._inputs = {}
+
+    def roster(self, n):
+        if ("roster", n) not in self._inputs:
+            self._inputs.clear()
+            self._inputs["roster", n] = synth_template(n)
+        return self._inputs["roster", n]
+
+    def features(self, n):
+        """The roster as the model's encoded feature frame (what ``prepare_chunk`` produces)."""
+        if ("features", n) not in self._inputs:
+            df = self.roster(n)
+            self._inputs["features", n] = prepare_chunk(df, self.final_columns)[1]
+        return self._inputs["features", n]
+
+    def scored(self, n):
+        if ("scored", n) not in self._inputs:
+            df = self.roster(n)
+            names, df_proc, _ = prepare_chunk(df, self.final_columns)
+            self._inputs["scored", n] = score_chunk(df_proc, names, self.bundle.scoring_model,
+                                                    self.bundle.input_scaler, self.final_columns)[0]
+        return self._inputs["scored", n]
+
+    def input_file(self, n, fmt):
+        path = self.workdir / f"roster_{n}.{fmt}"
+        if not path.exists():
+            df = self.roster(n)
+            if fmt == "csv":
+                df.to_csv(path, index=False)
+            else:
+                df.to_excel(path, index=False)
+        return path
+
+
+@case("scaler_transform")
+def _scaler_transform(ctx, n):
+    X = ctx.features(n)
+    ctx.scaler.transform(X.iloc[:1])
+    return lambda: ctx.scaler.transform(X)
+
+
+@case("predict_proba")
+def _predict_proba(ctx, n):
+    X = ctx.scaler.transform(ctx.features(n))
+    ctx.model.predict_proba(X[:1])
+    return lambda: ctx.model.predict_proba(X)
+
+
+@case("predict_fused")
+def _predict_fused(ctx, n):
+    model = ctx.bundle.scoring_model
+    X = model_input(ctx.features(n), ctx.bundle.input_scaler)
+    model.predict_proba(X[:1])
+    return lambda: model.predict_proba(X)
+
+
+@case("shap", max_rows=20_000)
+def _shap(ctx, n):
+    if not hasattr(ctx, "explainer"):
+        ctx.explainer = build_explainer(ctx.bundle.scoring_model)
+    X = model_input(ctx.features(n), ctx.bundle.input_scaler)
+    return lambda: shap_matrix(ctx.explainer, X, chunksize=10_000)
+
+
+def _parse(ctx, path):
+    columns = input_columns(ctx.final_columns)
+    with open(path, "rb") as source:
+        offset = 0
+        for df_chunk in read_chunks(source, path.name, columns=columns):
+            prepare_chunk(df_chunk, ctx.final_columns, row_offset=offset)
+            offset += len(df_chunk)
+
+
+@case("parse_csv")
+def _parse_csv(ctx, n):
+    path = ctx.input_file(n, "csv")
+    return lambda: _parse(ctx, path)
+
+
+@case("parse_xlsx", max_rows=100_000)
+def _parse_xlsx(ctx, n):
+    path = ctx.input_file(n, "xlsx")
+    return lambda: _parse(ctx, path)
+
+
+def _export(ctx, n, fmt):
+    df   = ctx.scored(n)
+    path = ctx.workdir / f"scored.{fmt}"
+
+    def run():
+        with TableWriter(path, fmt, result_columns(ctx.final_columns)) as writer:
+            for start in range(0, len(df), 50_000):
+                writer.write(df.iloc[start:start + 50_000])
+    return run
+
+
+@case("evaluate")
+def _evaluate(ctx, n):
+    X      = ctx.features(n)
+    probas = ctx.bundle.scoring_model.predict_proba(model_input(X, ctx.bundle.input_scaler))[:, 1]
+    labels = (np.random.default_rng(0).random(n) < probas).astype(np.int8)
+
+    def run():
+        sketch = EvaluationSketch()
+        for start in range(0, n, 50_000):
+            sketch.update(X.iloc[start:start + 50_000], probas[start:start + 50_000], labels[start:start + 50_000])
+        overall(sketch, DEFAULT_THRESHOLDS)
+        group_metrics(sketch, DEFAULT_THRESHOLDS)
+        calibration(sketch)
+    return run
+
+
+@case("export_csv")
+def _export_csv(ctx, n):
+    return _export(ctx, n, "csv")
+
+
+@case("export_parquet")
+def _export_parquet(ctx, n):
+    return _export(ctx, n, "parquet")
+
+
+# ── Runner ──────────────────────────────────────────────────────────────────
+
+LOAD_CHILD = """
+import json, time, warnings
+warnings.filterwarnings("ignore")
+t = time.perf_counter()
+{stmt}
+seconds = time.perf_counter() - t
+with open("/proc/self/status") as f:
+    hwm = next((int(l.split()[1]) for l in f if l.startswith("VmHWM:")), 0)
+print(json.dumps({{"seconds": seconds, "peak_mb": hwm / 1024}}))
+"""
+
+
+def run_load(name, stmt, repeat):
+    """Cold artifact load in a fresh interpreter; peak memory is the whole process."""
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", LOAD_CHILD.format(stmt=stmt)], cwd=ARTIFACT_DIR,
+                             env={**os.environ, "PYTHONPATH": str(ARTIFACT_DIR)},
+                             capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    seconds = [r["seconds"] for r in runs]
+    return {"case": f"load_{name.replace(' ', '_')}", "rows": 0, "seconds": min(seconds),
+            "median": statistics.median(seconds), "peak_mb": max(r["peak_mb"] for r in runs)}
+
+
+def run_case(ctx, name, n, repeat):
+    fn = CASES[name][0](ctx, n)
+    seconds = []
+    with PeakMemory() as peak:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            seconds.append(time.perf_counter() - start)
+    return {"case": name, "rows": n, "seconds": min(seconds), "median": statistics.median(seconds),
+            "peak_mb": peak.mb}
+
+
+def environment():
+    import sklearn
+    import xgboost
+
+    return {"python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count(),
+            "numpy": np.__version__, "pandas": pd.__version__, "xgboost": xgboost.__version__,
+            "scikit_learn": sklearn.__version__}
+
+
+def compare(results, baseline, tolerance, min_seconds, min_mb):
+    """``(problems, missing)``: cases slower or hungrier than the baseline allows, and
+    cases that ran but have no baseline entry (so nothing was checked for them)."""
+    stored = {(r["case"], r["rows"]): r for r in baseline["results"]}
+    problems, missing = [], []
+    for r in results:
+        base = stored.get((r["case"], r["rows"]))
+        if base is None:
+            missing.append(f"{r['case']} @ {r['rows']:,} rows")
+            continue
+        if r["seconds"] > base["seconds"] * (1 + tolerance) and r["seconds"] - base["seconds"] > min_seconds:
+            problems.append(f"{r['case']} @ {r['rows']:,} rows: {r['seconds'] * 1e3:.1f} ms "
+                            f"vs baseline {base['seconds'] * 1e3:.1f} ms (+{r['seconds'] / base['seconds'] - 1:.0%})")
+        if r["peak_mb"] > base["peak_mb"] * (1 + tolerance) and r["peak_mb"] - base["peak_mb"] > min_mb:
+            problems.append(f"{r['case']} @ {r['rows']:,} rows: peak {r['peak_mb']:.1f} MiB "
+                            f"vs baseline {base['peak_mb']:.1f} MiB")
+    return problems, missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", type=lambda s: int(float(s)), default=list(DEFAULT_SIZES),
+                        help="roster sizes in rows (1 to 10M; 1e6 notation is accepted)")
+    parser.add_argument("--cases", nargs="+", choices=[*CASES, "load"], help="run only these cases")
+    parser.add_argument("--skip", nargs="+", choices=[*CASES, "load"], default=[])
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case; the fastest is kept")
+    parser.add_argument("--json", metavar="PATH", help="write the results to PATH")
+    parser.add_argument("--baseline", metavar="PATH", nargs="?", const=str(BASELINE),
+                        help="compare against (or with --save-baseline, write) PATH; "
+                             "defaults to benchmarks/baseline.json")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown / memory growth as a fraction of the baseline")
+    parser.add_argument("--min-seconds", type=float, default=0.005,
+                        help="ignore slowdowns smaller than this in absolute terms")
+    parser.add_argument("--min-mb", type=float, default=16.0,
+                        help="ignore memory growth smaller than this in absolute terms")
+    parser.add_argument("--allow-missing", action="store_true",
+                        help="only warn about cases the baseline has no entry for (default: fail)")
+    args = parser.parse_args()
+
+    selected = [c for c in (args.cases or [*CASES, "load"]) if c not in args.skip]
+    results  = []
+    print(f"{'case':<18} {'rows':>11} {'best':>11} {'median':>11} {'rows/s':>12} {'peak':>10}")
+
+    def report(r):
+        rate = f"{r['rows'] / r['seconds']:,.0f}" if r["rows"] and r["seconds"] else "-"
+        print(f"{r['case']:<18} {r['rows']:>11,} {r['seconds'] * 1e3:>8.1f} ms {r['median'] * 1e3:>8.1f} ms "
+              f"{rate:>12} {r['peak_mb']:>6.1f} MiB")
+        results.append(r)
+
+    if "load" in selected:
+        for name, stmt in COLD.items():
+            report(run_load(name, stmt, args.repeat))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = Context(tmp)
+        for n in sorted(args.sizes):
+            for name in (c for c in selected if c != "load"):
+                max_rows = CASES[name][1]
+                if max_rows is not None and n > max_rows:
+                    print(f"{name:<18} {n:>11,}   skipped (over {max_rows:,} rows)")
+                    continue
+                report(run_case(ctx, name, n, args.repeat))
+
+    run = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "environment": environment(), "results": results}
+    if args.json:
+        Path(args.json).write_text(json.dumps(run, indent=2) + "\n")
+    if args.baseline and args.save_baseline:
+        Path(args.baseline).write_text(json.dumps(run, indent=2) + "\n")
+        print(f"baseline written to {args.baseline}")
+    elif args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        if baseline["environment"] != run["environment"]:
+            print("warning: baseline was recorded on a different environment:", baseline["environment"])
+        problems, missing = compare(results, baseline, args.tolerance, args.min_seconds, args.min_mb)
+        if missing:
+            print(f"\n{'warning' if args.allow_missing else 'error'}: {len(missing)} case(s) not in "
+                  f"{args.baseline}; re-save it with --save-baseline:")
+            for m in missing:
+                print("  " + m)
+        if problems:
+            print(f"\n{len(problems)} regression(s) against {args.baseline}:")
+            for p in problems:
+                print("  " + p)
+        if problems or (missing and not args.allow_missing):
+            sys.exit(1)
+        print(f"no regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
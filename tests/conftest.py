@@ -0,0 +1,39 @@
+import json
+import warnings
+
+import numpy as np
+import pytest
+
+from attrition.artifacts import load_pickles
+from attrition.bundle import ModelBundle
+
+
+@pytest.fixture(scope="session")
+def pickles():
+    """``(model, scaler, encoder, feature_imp, final_columns)`` from the checked-in pickles."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")     # sklearn version notice on unpickling the scaler
+        return load_pickles()
+
+
+@pytest.fixture(scope="session")
+def bundle(pickles):
+    """``ModelBundle`` over the pickles (scaler folded, forest compiled)."""
+    return ModelBundle.from_artifacts(*pickles)
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
+
+
+@pytest.fixture(scope="session")
+def split_values(pickles):
+    """Every split threshold of the model's trees, per feature index (scaled space)."""
+    trees  = json.loads(pickles[0].get_booster().save_raw("json"))["learner"]["gradient_booster"]["model"]["trees"]
+    values = {}
+    for tree in trees:
+        for left, feature, cond in zip(tree["left_children"], tree["split_indices"], tree["split_conditions"]):
+            if left != -1:
+                values.setdefault(feature, set()).add(np.float32(cond))
+    return {f: np.array(sorted(v), dtype=np.float32) for f, v in values.items()}
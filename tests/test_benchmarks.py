@@ -0,0 +1,14 @@
+from benchmarks.suite import compare
+
+
+def _result(case, rows, seconds, peak_mb=1.0):
+    return {"case": case, "rows": rows, "seconds": seconds, "peak_mb": peak_mb}
+
+
+def test_compare_reports_regressions_and_missing_cases():
+    baseline = {"results": [_result("predict_proba", 1_000, 0.010), _result("parse_csv", 1_000, 0.010)]}
+    results  = [_result("predict_proba", 1_000, 0.020), _result("parse_csv", 1_000, 0.011),
+                _result("evaluate", 1_000, 0.003), _result("parse_csv", 100_000, 0.1)]
+    problems, missing = compare(results, baseline, tolerance=0.25, min_seconds=0.005, min_mb=16)
+    assert len(problems) == 1 and problems[0].startswith("predict_proba @ 1,000 rows")
+    assert missing == ["evaluate @ 1,000 rows", "parse_csv @ 100,000 rows"]
@@ -0,0 +1,60 @@
+import io
+
+import pandas as pd
+import pytest
+
+from attrition.bulk import score_file
+from attrition.columnar import TableWriter
+from attrition.scoring import MissingColumnsError, input_columns, read_chunks, result_columns, score_stream
+
+
+@pytest.fixture
+def roster(tmp_path, rng):
+    n  = 2_000
+    df = pd.DataFrame({
+        "nama_karyawan"        : [f"E{i}" for i in range(n)],
+        "satisfaction_level"   : rng.uniform(0.1, 1.0, n).round(2),
+        "last_evaluation"      : rng.uniform(0.4, 1.0, n).round(2),
+        "number_project"       : rng.integers(2, 8, n),
+        "average_montly_hours" : rng.integers(100, 300, n),
+        "time_spend_company"   : rng.integers(2, 10, n),
+        "salary"               : rng.choice(["low", "medium", "high"], n),
+        "Work_accident"        : rng.integers(0, 2, n),
+        "promotion_last_5years": rng.integers(0, 2, n),
+    })
+    df.loc[::97, "salary"] = "unknown"
+    path = tmp_path / "roster.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+def _app_result(bundle, path):
+    out = io.StringIO()
+    with open(path, "rb") as source:
+        score_stream(read_chunks(source, path.name, columns=input_columns(bundle.final_columns)),
+                     bundle.scoring_model, bundle.input_scaler, bundle.final_columns,
+                     TableWriter(out, "csv", result_columns(bundle.final_columns)))
+    out.seek(0)
+    return pd.read_csv(out)
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet", ".arrow"])
+def test_outputs_match_the_app_in_both_orders(bundle, roster, tmp_path, suffix):
+    expected = _app_result(bundle, roster)
+    for order in ("input", "risk"):
+        out = tmp_path / f"scored_{order}{suffix}"
+        assert score_file(roster, out, workers=1, chunksize=300, order=order) == (len(expected), 21)
+        result = {".csv": pd.read_csv, ".parquet": pd.read_parquet, ".arrow": pd.read_feather}[suffix](out)
+        want   = expected if order == "input" else expected.sort_values(
+            "Resign Probability (%)", ascending=False, kind="stable", ignore_index=True)
+        pd.testing.assert_frame_equal(result, want, check_dtype=False, check_categorical=False)
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(
+        ["roster.csv", f"scored_input{suffix}", f"scored_risk{suffix}"])
+
+
+@pytest.mark.parametrize("order", ["input", "risk"])
+def test_failure_leaves_no_output(roster, tmp_path, order):
+    pd.read_csv(roster).drop(columns="salary").to_csv(roster, index=False)
+    with pytest.raises(MissingColumnsError):
+        score_file(roster, tmp_path / "scored.parquet", workers=1, order=order)
+    assert [p.name for p in tmp_path.iterdir()] == ["roster.csv"]
@@ -0,0 +1,102 @@
+import json
+import shutil
+
+import numpy as np
+import pytest
+
+from attrition.bundle import (
+    FORMAT_VERSION, FUSED_FILE, MANIFEST, BundleError, build_bundle, load_bundle, open_bundle, read_manifest,
+)
+from attrition.fusion import fold_scaler
+
+
+@pytest.fixture(scope="module")
+def built(pickles, tmp_path_factory):
+    path = tmp_path_factory.mktemp("bundle") / "model_bundle"
+    build_bundle(*pickles, path)
+    return path
+
+
+@pytest.fixture
+def bundle_dir(built, tmp_path):
+    return shutil.copytree(built, tmp_path / "model_bundle")
+
+
+def _rows(rng, n=5_000):
+    return np.column_stack([
+        rng.uniform(0, 1, n), rng.uniform(0.3, 1, n), rng.integers(2, 8, n), rng.integers(90, 320, n),
+        rng.integers(2, 11, n), rng.integers(0, 3, n), rng.integers(0, 2, n), rng.integers(0, 2, n),
+    ]).astype(np.float32)
+
+
+def test_round_trip(pickles, bundle_dir, rng):
+    model, scaler, _, _, final_columns = pickles
+    loaded, _, _, _, columns = load_bundle(bundle_dir)
+    X = scaler.transform(_rows(rng).astype(np.float64))
+    assert columns == list(final_columns)
+    np.testing.assert_array_equal(loaded.predict_proba(X), model.predict_proba(X))
+
+
+def test_stored_fused_booster_matches_folding(pickles, bundle_dir, rng):
+    model, scaler = pickles[:2]
+    bundle = open_bundle(bundle_dir)
+    X = _rows(rng)
+    assert bundle.input_scaler is None
+    np.testing.assert_array_equal(bundle.scoring_model.predict_proba(X), fold_scaler(model, scaler).predict_proba(X))
+    np.testing.assert_allclose(bundle.forest.predict_proba(X)[:, 1], bundle.scoring_model.predict_proba(X)[:, 1],
+                               atol=1e-6)
+
+
+def test_bundle_without_fused_booster_folds_on_load(pickles, bundle_dir, rng):
+    manifest = json.loads((bundle_dir / MANIFEST).read_text())
+    del manifest["files"][FUSED_FILE]
+    (bundle_dir / MANIFEST).write_text(json.dumps(manifest))
+    (bundle_dir / FUSED_FILE).unlink()
+    X = _rows(rng)
+    np.testing.assert_array_equal(open_bundle(bundle_dir).scoring_model.predict_proba(X),
+                                  fold_scaler(*pickles[:2]).predict_proba(X))
+
+
+@pytest.mark.parametrize("name", ["booster.ubj", FUSED_FILE, "forest_threshold.npy", "scaler_mean.npy"])
+def test_hash_check_rejects_modified_files(bundle_dir, name):
+    with open(bundle_dir / name, "r+b") as f:
+        f.seek(-1, 2)
+        last = f.read(1)
+        f.seek(-1, 2)
+        f.write(bytes([last[0] ^ 1]))
+    with pytest.raises(BundleError, match=f"hash mismatch for {name}"):
+        open_bundle(bundle_dir)
+    open_bundle(bundle_dir, verify=False)
+
+
+def test_missing_file_is_reported(bundle_dir):
+    (bundle_dir / "forest_value.npy").unlink()
+    with pytest.raises(BundleError, match="bundle file missing: forest_value.npy"):
+        open_bundle(bundle_dir)
+
+
+def _edit_manifest(bundle_dir, **changes):
+    manifest = json.loads((bundle_dir / MANIFEST).read_text())
+    for key, value in changes.items():
+        if value is None:
+            manifest.pop(key, None)
+        else:
+            manifest[key] = value
+    (bundle_dir / MANIFEST).write_text(json.dumps(manifest))
+
+
+def test_format_version_and_precision(bundle_dir):
+    assert json.loads((bundle_dir / MANIFEST).read_text())["format_version"] == FORMAT_VERSION == 2
+    _edit_manifest(bundle_dir, format_version=1, precision=None)
+    assert read_manifest(bundle_dir)["precision"] == "float32"
+    open_bundle(bundle_dir)
+
+    _edit_manifest(bundle_dir, format_version=FORMAT_VERSION + 1)
+    with pytest.raises(BundleError, match="unsupported bundle format"):
+        open_bundle(bundle_dir)
+    _edit_manifest(bundle_dir, format_version=FORMAT_VERSION, precision="bfloat16")
+    with pytest.raises(BundleError, match="unknown precision 'bfloat16'"):
+        open_bundle(bundle_dir)
+    _edit_manifest(bundle_dir, precision="float16")
+    with pytest.raises(BundleError, match="forest_threshold.npy is float32, manifest precision is float16"):
+        open_bundle(bundle_dir)
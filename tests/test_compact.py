@@ -0,0 +1,105 @@
+import json
+
+import numpy as np
+import pytest
+import xgboost as xgb
+
+from attrition.bundle import build_bundle, open_bundle, read_manifest
+from attrition.compact import best_iteration, learning_rate, prune, truncate
+
+
+def _data(rng, n=2_000):
+    X = rng.uniform(0, 1, (n, 4)).astype(np.float32)
+    y = ((X[:, 0] + 0.5 * X[:, 1] + rng.normal(0, 0.3, n)) > 0.8).astype(int)
+    return X, y
+
+
+@pytest.fixture(scope="module")
+def tiny():
+    """One depth-2 tree: a root and two inner nodes over four leaves."""
+    X, y = _data(np.random.default_rng(1))
+    return xgb.XGBClassifier(n_estimators=1, max_depth=2, learning_rate=0.3, min_child_weight=0).fit(X, y), X
+
+
+def _tree(model):
+    return json.loads(model.get_booster().save_raw("json"))["learner"]["gradient_booster"]["model"]["trees"][0]
+
+
+def _leaf_values(tree, X, leaf_at=()):
+    """Walk one JSON tree by hand; nodes in ``leaf_at`` answer ``base_weight * eta`` instead of splitting."""
+    out = np.empty(len(X), dtype=np.float32)
+    for i, row in enumerate(X):
+        node = 0
+        while tree["left_children"][node] != -1 and node not in leaf_at:
+            go_left = row[tree["split_indices"][node]] < np.float32(tree["split_conditions"][node])
+            node    = tree["left_children"][node] if go_left else tree["right_children"][node]
+        out[i] = leaf_at[node] if node in leaf_at else tree["split_conditions"][node]
+    return out
+
+
+def test_prune_without_gain_keeps_the_model(pickles, rng):
+    model, scaler = pickles[:2]
+    pruned, removed = prune(model, 0.0)
+    X = rng.normal(size=(2_000, len(scaler.mean_)))      # already in scaled space
+    assert removed == 0
+    np.testing.assert_array_equal(pruned.predict_proba(X), model.predict_proba(X))
+
+
+def test_pruned_tree_matches_hand_collapsed_reference(tiny, tmp_path):
+    model, X = tiny
+    tree  = _tree(model)
+    left  = tree["left_children"]
+    inner = [c for c in (left[0], tree["right_children"][0]) if left[c] != -1]
+    assert len(inner) == 2, "expected a full depth-2 tree"
+    gains = {c: tree["loss_changes"][c] for c in inner}
+    weak, strong = sorted(inner, key=gains.get)
+    assert gains[weak] < gains[strong] < tree["loss_changes"][0]
+
+    pruned, removed = prune(model, (gains[weak] + gains[strong]) / 2)
+    assert removed == 2
+    pruned.save_model(tmp_path / "pruned.ubj")
+    reloaded = type(model)()
+    reloaded.load_model(tmp_path / "pruned.ubj")
+    new = _tree(reloaded)
+    assert int(new["tree_param"]["num_nodes"]) == len(new["parents"]) == 5
+    assert new["parents"][0] == tree["parents"][0]
+
+    before   = model.get_booster().predict(xgb.DMatrix(X), output_margin=True)
+    base     = before - _leaf_values(tree, X)
+    expected = base + _leaf_values(tree, X, {weak: np.float32(tree["base_weights"][weak] * learning_rate(model))})
+    margin   = reloaded.get_booster().predict(xgb.DMatrix(X), output_margin=True)
+    np.testing.assert_allclose(margin, expected, atol=1e-6)
+    # Rows that never reach the collapsed node score exactly as before.
+    untouched = margin == before
+    assert untouched.any() and not untouched.all()
+
+
+def test_best_iteration_honours_early_stopping(rng):
+    X, y  = _data(rng)
+    model = xgb.XGBClassifier(n_estimators=200, max_depth=3, early_stopping_rounds=5)
+    model.fit(X[:1_500], y[:1_500], eval_set=[(X[1_500:], y[1_500:])], verbose=False)
+    n = best_iteration(model)
+    assert n == model.best_iteration + 1 == int(model.get_booster().attributes()["best_iteration"]) + 1
+    short = truncate(model, n)
+    assert short.get_booster().num_boosted_rounds() == n
+    np.testing.assert_array_equal(short.predict_proba(X), model.predict_proba(X, iteration_range=(0, n)))
+
+
+def test_best_iteration_without_attribute(tiny):
+    model, _ = tiny
+    assert "best_iteration" not in model.get_booster().attributes()
+    assert best_iteration(model) == 1
+
+
+def test_float16_variant_opens(pickles, tmp_path, rng):
+    model, scaler, encoder, _, final_columns = pickles
+    variant, _ = prune(truncate(model, model.get_booster().num_boosted_rounds() // 2), 1.0)
+    build_bundle(variant, scaler, encoder, variant.feature_importances_, final_columns, tmp_path / "v_f16",
+                 precision="float16")
+    bundle = open_bundle(tmp_path / "v_f16")
+    assert read_manifest(tmp_path / "v_f16")["precision"] == "float16"
+    assert bundle.forest.threshold.dtype == bundle.forest.value.dtype == np.float16
+    X = (rng.normal(size=(2_000, len(scaler.mean_))) * scaler.scale_ + scaler.mean_).astype(np.float32)
+    # Half-precision thresholds move a few splits; most rows are unaffected.
+    diff = np.abs(bundle.forest.predict_proba(X)[:, 1] - bundle.scoring_model.predict_proba(X)[:, 1])
+    assert np.median(diff) < 1e-4 and diff.mean() < 0.01
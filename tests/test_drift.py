@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from attrition.drift import FEATURE_EDGES, SCORE, DriftSketch, compare, ks, psi, report
+
+
+def _population(rng, n, satisfaction=(0.1, 1.0)):
+    features = pd.DataFrame({
+        "satisfaction_level"   : rng.uniform(*satisfaction, n),
+        "last_evaluation"      : rng.uniform(0.4, 1.0, n),
+        "number_project"       : rng.integers(2, 8, n).astype(float),
+        "average_montly_hours" : rng.integers(100, 300, n).astype(float),
+        "time_spend_company"   : rng.integers(2, 10, n).astype(float),
+        "salary"               : rng.integers(0, 3, n).astype(float),
+        "Work_accident"        : rng.integers(0, 2, n).astype(float),
+        "promotion_last_5years": rng.integers(0, 2, n).astype(float),
+    })
+    return features, rng.beta(1, 3, n)
+
+
+def test_chunks_merge_to_the_whole(rng):
+    features, probas = _population(rng, 10_000)
+    whole = DriftSketch()
+    whole.update(features, probas)
+    parts = [DriftSketch(), DriftSketch()]
+    parts[0].update(features.iloc[:3_000], probas[:3_000])
+    parts[1].update(features.iloc[3_000:], probas[3_000:])
+    merged = parts[0].merge(parts[1])
+    assert merged.rows == whole.rows == 10_000
+    for name in FEATURE_EDGES:
+        np.testing.assert_array_equal(merged.counts[name], whole.counts[name])
+        assert merged.counts[name].sum() == 10_000
+
+
+def test_psi_and_ks():
+    same = np.array([10, 20, 30, 40])
+    assert psi(same, same * 3) == pytest.approx(0) and ks(same, same * 3) == pytest.approx(0)
+    shifted = np.array([40, 30, 20, 10])
+    r, c = same / 100, shifted / 100
+    assert psi(same, shifted) == pytest.approx(np.sum((c - r) * np.log(c / r)))
+    assert ks(same, shifted) == pytest.approx(0.4)
+
+
+def test_shifted_feature_is_flagged(rng, tmp_path):
+    reference = DriftSketch(source="train.csv")
+    reference.update(*_population(rng, 20_000))
+    reference.save(tmp_path / "reference.json")
+    reference = DriftSketch.load(tmp_path / "reference.json")
+
+    current = DriftSketch(source="upload.csv")
+    current.update(*_population(rng, 5_000, satisfaction=(0.0, 0.4)))
+    table = compare(reference, current).set_index("Feature")
+    assert table.index[0] == "satisfaction_level" and table.loc["satisfaction_level", "Status"] == "DRIFT"
+    assert (table.drop(index="satisfaction_level")["Status"] == "STABLE").all()
+
+    doc = report(reference, current)
+    assert doc["drifted"] == ["satisfaction_level"]
+    assert doc["reference"] == {"rows": 20_000, "source": "train.csv"}
+    assert {f["Feature"] for f in doc["features"]} == set(FEATURE_EDGES)
+
+
+def test_sketches_with_other_bins_do_not_mix(rng):
+    a, b = DriftSketch(), DriftSketch()
+    b.edges[SCORE] = np.linspace(0.1, 0.9, 9)
+    b.counts[SCORE] = np.zeros(10, dtype=np.int64)
+    with pytest.raises(ValueError, match="different bins"):
+        a.merge(b)
@@ -0,0 +1,109 @@
+import json
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import pytest
+from tornado.testing import AsyncHTTPTestCase
+
+from attrition.engine import InvalidRowsError, ScoringEngine
+from attrition.service import make_app
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return ScoringEngine()
+
+
+def _record(**changes):
+    record = {
+        "nama_karyawan"        : "Budi",
+        "satisfaction_level"   : 0.38,
+        "last_evaluation"      : 0.53,
+        "number_project"       : 2,
+        "average_montly_hours" : 157,
+        "time_spend_company"   : 3,
+        "salary"               : "low",
+        "Work_accident"        : 0,
+        "promotion_last_5years": 0,
+    }
+    return {**record, **changes}
+
+
+def test_records_score_like_the_bundle(engine):
+    records = [_record(), _record(salary="HIGH", satisfaction_level="0.9")]
+    X = engine.features(records)
+    assert X[:, engine.final_columns.index("salary")].tolist() == [0, 2]
+    expected = engine.bundle.scoring_model.predict_proba(X.astype(np.float32))[:, 1]
+    results  = engine.predict(records)
+    assert [r["nama_karyawan"] for r in results] == ["Budi", "Budi"]
+    np.testing.assert_allclose([r["probability"] for r in results], expected, atol=1e-6)
+
+
+def test_encoded_salary_as_string(engine):
+    X = engine.features([_record(salary="1"), _record(salary=2), _record(salary=" 0 ")])
+    assert X[:, engine.final_columns.index("salary")].tolist() == [1, 2, 0]
+
+
+@pytest.mark.parametrize("field, value, problem", [
+    ("satisfaction_level", 1.5, "di luar rentang 0–1"),
+    ("average_montly_hours", -3, "di luar rentang 0–744"),
+    ("number_project", [2, 3], "bukan angka"),
+    ("salary", {"level": "low"}, "label tidak dikenal"),
+    ("last_evaluation", None, "kosong"),
+    ("Work_accident", 0.5, "bukan bilangan bulat"),
+    ("salary", "1.5", "bukan bilangan bulat"),
+])
+def test_invalid_values_are_reported_per_column(engine, field, value, problem):
+    with pytest.raises(InvalidRowsError) as info:
+        engine.features([_record(), _record(nama_karyawan="Sari", **{field: value})])
+    assert info.value.rows == [1]
+    assert info.value.problems() == [{"row": 1, "name": "Sari", "errors": {field: problem}}]
+
+
+def test_fractional_codes_are_rejected_in_frames(engine):
+    df = pd.DataFrame([_record(salary=0), _record(nama_karyawan="Sari", promotion_last_5years=0.3, salary=1.5)])
+    with pytest.raises(InvalidRowsError) as info:
+        engine.features(df)
+    assert info.value.problems() == [{"row": 1, "name": "Sari", "errors": {
+        "salary": "bukan bilangan bulat", "promotion_last_5years": "bukan bilangan bulat"}}]
+
+
+class ServiceValidationTest(AsyncHTTPTestCase):
+    def get_app(self):
+        self.engine = ScoringEngine()
+        return make_app(self.engine)
+
+    def post(self, path, payload):
+        return self.fetch(path, method="POST", body=json.dumps(payload))
+
+    def test_valid_record(self):
+        response = self.post("/predict", _record())
+        assert response.code == 200
+        assert json.loads(response.body)["prediction"] in ("STAY", "RESIGN")
+
+    def test_invalid_records_are_a_400_with_the_report(self):
+        response = self.post("/predict/batch", [_record(), _record(number_project={"n": 2}, Work_accident=4)])
+        assert response.code == 400
+        assert json.loads(response.body)["rows"] == [{
+            "row": 1, "name": "Budi",
+            "errors": {"number_project": "bukan angka", "Work_accident": "di luar rentang 0–1"},
+        }]
+
+    def test_invalid_csv_rows_are_a_400(self):
+        csv = "nama_karyawan,satisfaction_level,last_evaluation,number_project,average_montly_hours," \
+              "time_spend_company,salary,Work_accident,promotion_last_5years\n" \
+              "Budi,0.38,0.53,2,157,3,low,0,0\nSari,0.5,0.7,3,900,4,gold,0,0\n"
+        response = self.fetch("/predict/batch", method="POST", body=csv, headers={"Content-Type": "text/csv"})
+        assert response.code == 400
+        assert json.loads(response.body)["rows"] == [{
+            "row": 1, "name": "Sari",
+            "errors": {"average_montly_hours": "di luar rentang 0–744", "salary": "label tidak dikenal"},
+        }]
+
+    def test_explain_validates_once(self):
+        with mock.patch.object(self.engine, "features", wraps=self.engine.features) as features:
+            response = self.post("/explain", _record())
+        assert response.code == 200
+        assert features.call_count == 1
+        assert set(json.loads(response.body)["shap_values"]) == set(_record()) - {"nama_karyawan"}
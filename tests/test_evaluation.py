@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import roc_auc_score
+
+from attrition.evaluation import (
+    SCORE_BINS, EvaluationSketch, bootstrap, confusion, group_metrics, overall, report,
+)
+from attrition.scoring import DEFAULT_THRESHOLDS
+
+
+@pytest.fixture
+def labelled(rng):
+    n = 20_000
+    features = pd.DataFrame({"salary": rng.integers(0, 3, n), "promotion_last_5years": rng.integers(0, 2, n)})
+    probas   = rng.beta(1, 3, n)
+    labels   = (rng.uniform(0, 1, n) < probas).astype(int)
+    return features, probas, labels
+
+
+def _sketch(features, probas, labels, chunk=3_000):
+    sketch = EvaluationSketch()
+    for start in range(0, len(probas), chunk):
+        rows = slice(start, start + chunk)
+        sketch.update(features.iloc[rows], probas[rows], labels[rows])
+    return sketch
+
+
+def _binned(probas):
+    return np.minimum((probas * SCORE_BINS).astype(np.int64), SCORE_BINS - 1)
+
+
+def test_overall_matches_row_level_metrics(labelled):
+    features, probas, labels = labelled
+    m = overall(_sketch(features, probas, labels), DEFAULT_THRESHOLDS)
+    assert m["rows"] == len(labels)
+    assert m["roc_auc"] == pytest.approx(roc_auc_score(labels, _binned(probas)), abs=1e-12)
+    assert m["brier"] == pytest.approx(np.mean((probas - labels) ** 2), abs=1e-12)
+    predicted = probas >= DEFAULT_THRESHOLDS.moderate
+    assert m["tpr@0.4"] == pytest.approx(predicted[labels == 1].mean())
+    assert m["fpr@0.4"] == pytest.approx(predicted[labels == 0].mean())
+
+
+def test_groups_and_confusion(labelled):
+    features, probas, labels = labelled
+    sketch = _sketch(features, probas, labels)
+    groups = group_metrics(sketch, DEFAULT_THRESHOLDS).set_index(["Group", "Level"])
+    low    = features["salary"].to_numpy() == 0
+    assert groups.loc[("salary", "low"), "rows"] == low.sum()
+    assert groups.loc[("salary", "low"), "roc_auc"] == pytest.approx(roc_auc_score(labels[low], _binned(probas[low])))
+
+    matrix = confusion(sketch, DEFAULT_THRESHOLDS.critical).to_numpy()
+    flagged = probas >= DEFAULT_THRESHOLDS.critical
+    assert matrix.tolist() == [[int((~flagged & (labels == 0)).sum()), int((flagged & (labels == 0)).sum())],
+                               [int((~flagged & (labels == 1)).sum()), int((flagged & (labels == 1)).sum())]]
+
+
+def test_unlabelled_rows_are_skipped(labelled):
+    features, probas, labels = labelled
+    raw = labels.astype(object)
+    raw[:10] = "?"
+    raw[10:15] = 2
+    sketch = _sketch(features, probas, raw)
+    assert sketch.unlabelled == 15 and sketch.rows == len(labels) - 15
+
+
+def test_bootstrap_is_reproducible_and_covers_the_estimate(labelled):
+    features, probas, labels = labelled
+    sketch    = _sketch(features, probas, labels)
+    intervals = bootstrap(sketch, DEFAULT_THRESHOLDS, n_boot=100, workers=1, seed=3)
+    again     = bootstrap(sketch, DEFAULT_THRESHOLDS, n_boot=100, workers=2, seed=3)
+    assert intervals.keys() == again.keys()
+    for name in intervals:
+        np.testing.assert_array_equal(intervals[name][0], again[name][0])
+    low, high = intervals["roc_auc"]
+    assert low < overall(sketch, DEFAULT_THRESHOLDS)["roc_auc"] < high
+
+    doc = report(sketch, DEFAULT_THRESHOLDS, intervals, source="upload.csv")
+    assert doc["rows"] == len(labels) and len(doc["metrics_ci"]["roc_auc"]) == 2
+    assert all("ci" in row for row in doc["groups"])
@@ -0,0 +1,82 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from attrition.evaluation import BOOT_BLOCK, EvaluationSketch, bootstrap
+from attrition.executor import CANCELLED, DONE, FAILED, InferenceExecutor, JobCancelled
+from attrition.scoring import DEFAULT_THRESHOLDS
+
+
+@pytest.fixture
+def executor():
+    executor = InferenceExecutor(workers=2)
+    yield executor
+    executor.shutdown()
+
+
+def test_cancel_stops_a_job_at_its_next_check(executor):
+    started, blocks = threading.Event(), []
+
+    def work(job):
+        started.set()
+        for i in range(1_000):
+            job.check()
+            blocks.append(i)
+            threading.Event().wait(0.005)
+        return "finished"
+
+    job = executor.submit("s", work, kind="whatif")
+    started.wait(5)
+    executor.cancel("s", "whatif")
+    job.wait(5)
+    assert job.state == CANCELLED and len(blocks) < 1_000
+    with pytest.raises(JobCancelled):
+        job.result()
+
+
+def test_job_cancelled_after_its_last_check_ends_cancelled(executor):
+    release = threading.Event()
+
+    def work(job):
+        release.wait(5)
+        return "finished"
+
+    job = executor.submit("s", work)
+    job.cancel()
+    release.set()
+    job.wait(5)
+    assert job.state == CANCELLED
+    with pytest.raises(JobCancelled):
+        job.result()
+
+
+def test_failures_and_results_are_kept(executor):
+    ok  = executor.submit("s", lambda job: 42)
+    bad = executor.submit("t", lambda job: 1 / 0)
+    assert ok.result(5) == 42 and ok.state == DONE
+    with pytest.raises(ZeroDivisionError):
+        bad.result(5)
+    assert bad.state == FAILED
+
+
+def test_bootstrap_stops_when_progress_raises(rng):
+    sketch = EvaluationSketch()
+    p      = rng.uniform(0, 1, 5_000)
+    sketch.update(pd.DataFrame({"salary": rng.integers(0, 3, 5_000), "promotion_last_5years": rng.integers(0, 2, 5_000)}), p,
+                  (rng.uniform(0, 1, 5_000) < p).astype(int))
+    seen = []
+
+    def progress(done, fraction):
+        seen.append(done)
+        raise JobCancelled("stop")
+
+    with pytest.raises(JobCancelled):
+        bootstrap(sketch, DEFAULT_THRESHOLDS, n_boot=4 * BOOT_BLOCK, workers=1, on_progress=progress)
+    assert seen == [BOOT_BLOCK]
+
+    seen.clear()
+    full = bootstrap(sketch, DEFAULT_THRESHOLDS, n_boot=2 * BOOT_BLOCK, workers=1,
+                     on_progress=lambda done, fraction: seen.append(fraction))
+    assert seen == [0.5, 1.0] and np.isfinite(full["roc_auc"]).all()
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from attrition.fast_tree import CompiledForest
+
+TOLERANCE = 1e-6
+
+
+@pytest.fixture(scope="module")
+def model(pickles):
+    return pickles[0]
+
+
+@pytest.fixture(scope="module")
+def forest(model):
+    return CompiledForest.from_model(model)
+
+
+def _assert_parity(model, forest, X):
+    expected = model.predict_proba(X)[:, 1]
+    actual   = forest.predict_proba(X)[:, 1]
+    assert np.abs(actual - expected).max() <= TOLERANCE
+
+
+def test_random_rows(model, forest, rng):
+    X = rng.normal(size=(5_000, model.n_features_in_)).astype(np.float32)
+    _assert_parity(model, forest, X)
+
+
+def test_missing_values(model, forest, rng):
+    X = rng.normal(size=(2_000, model.n_features_in_)).astype(np.float32)
+    X[rng.random(X.shape) < 0.2] = np.nan
+    X[0] = np.nan
+    _assert_parity(model, forest, X)
+
+
+def test_values_on_split_thresholds(model, forest, split_values, rng):
+    # Each threshold exactly, and the float32 just below it, must take the same branch as XGBoost.
+    rows = []
+    for feature, values in split_values.items():
+        for v in np.concatenate([values, np.nextafter(values, np.float32(-np.inf))]):
+            row = rng.normal(size=model.n_features_in_).astype(np.float32)
+            row[feature] = v
+            rows.append(row)
+    _assert_parity(model, forest, np.array(rows, dtype=np.float32))
+
+
+def test_single_row_shapes(model, forest):
+    row = np.zeros(model.n_features_in_, dtype=np.float32)
+    assert forest.predict_proba(row).shape == (1, 2)
+    np.testing.assert_allclose(forest.predict_proba(row[None, :]), model.predict_proba(row[None, :]), atol=TOLERANCE)
+
+
+def test_prefix(model):
+    n = model.get_booster().num_boosted_rounds() // 2
+    X = np.random.default_rng(1).normal(size=(500, model.n_features_in_)).astype(np.float32)
+    expected = model.get_booster()[:n].inplace_predict(X)
+    np.testing.assert_allclose(CompiledForest.from_model(model, n_trees=n).predict_proba(X)[:, 1], expected,
+                               atol=TOLERANCE)
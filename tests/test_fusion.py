@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from attrition.fusion import fold_scaler, raw_thresholds
+
+
+@pytest.fixture(scope="module")
+def fused(pickles):
+    model, scaler = pickles[0], pickles[1]
+    return fold_scaler(model, scaler)
+
+
+def _raw_rows(scaler, n, rng):
+    return (rng.normal(size=(n, len(scaler.mean_))) * scaler.scale_ + scaler.mean_).astype(np.float32)
+
+
+def test_fused_matches_scaled_path(pickles, fused, rng):
+    model, scaler = pickles[0], pickles[1]
+    X = _raw_rows(scaler, 5_000, rng)
+    X[rng.random(X.shape) < 0.05] = np.nan
+    expected = model.predict_proba(scaler.transform(X.astype(np.float64)))[:, 1]
+    np.testing.assert_allclose(fused.predict_proba(X)[:, 1], expected, atol=1e-6)
+
+
+def test_raw_values_at_folded_thresholds(pickles, fused, split_values, rng):
+    # Raw values that land exactly on, or next to, a folded threshold take the scaled path's branch.
+    model, scaler = pickles[0], pickles[1]
+    rows = []
+    for feature, values in split_values.items():
+        raw = raw_thresholds(values, scaler.mean_[feature], scaler.scale_[feature])
+        for v in np.concatenate([raw, np.nextafter(raw, np.float32(-np.inf)), np.nextafter(raw, np.float32(np.inf))]):
+            row = _raw_rows(scaler, 1, rng)[0]
+            row[feature] = v
+            rows.append(row)
+    X = np.array(rows, dtype=np.float32)
+    expected = model.predict_proba(scaler.transform(X.astype(np.float64)))[:, 1]
+    np.testing.assert_allclose(fused.predict_proba(X)[:, 1], expected, atol=1e-6)
+
+
+def test_raw_thresholds_boundary():
+    t     = np.array([-1.5, 0.0, 0.25, 2.0], dtype=np.float32)
+    mean  = np.array([10.0, 0.5, 200.0, 3.0])
+    scale = np.array([2.0, 0.1, 50.0, 1.3])
+    raw   = raw_thresholds(t, mean, scale).astype(np.float64)
+    below = np.nextafter(raw.astype(np.float32), np.float32(-np.inf)).astype(np.float64)
+    assert np.all(((raw - mean) / scale).astype(np.float32) >= t)
+    assert np.all(((below - mean) / scale).astype(np.float32) < t)
+
+
+def test_non_positive_scale_rejected(pickles):
+    model, scaler = pickles[0], pickles[1]
+
+    class Degenerate:
+        mean_  = scaler.mean_
+        scale_ = np.where(np.arange(len(scaler.scale_)) == 0, 0.0, scaler.scale_)
+
+    with pytest.raises(ValueError):
+        fold_scaler(model, Degenerate())
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from attrition.explain import build_explainer, shap_matrix
+from attrition.global_shap import MIN_PER_STRATUM, ShapSummary, stratified_sample
+
+
+def _strata(rng):
+    # 9 000 LOW, 900 MODERATE, 100 CRITICAL, shuffled.
+    return rng.permutation(np.repeat([0, 1, 2], [9_000, 900, 100]))
+
+
+def test_small_strata_get_the_floor(rng):
+    strata = _strata(rng)
+    index, _ = stratified_sample(strata, 1_000)
+    assert (np.diff(index) > 0).all()
+    taken = np.bincount(strata[index], minlength=3)
+    np.testing.assert_array_equal(taken, [900, 90, MIN_PER_STRATUM])
+
+
+def test_weights_are_inverse_inclusion(rng):
+    strata = _strata(rng)
+    index, weights = stratified_sample(strata, 1_000)
+    counts = np.bincount(strata)
+    taken  = np.bincount(strata[index])
+    np.testing.assert_allclose(weights, counts[strata[index]] / taken[strata[index]])
+    # The weights of each stratum add up to its population.
+    np.testing.assert_allclose(np.bincount(strata[index], weights=weights), counts)
+
+
+def test_stratum_smaller_than_floor_is_taken_whole(rng):
+    strata = rng.permutation(np.repeat([0, 1], [5_000, 20]))
+    index, weights = stratified_sample(strata, 500)
+    assert (strata[index] == 1).sum() == 20
+    np.testing.assert_array_equal(weights[strata[index] == 1], 1.0)
+
+
+def test_small_population_is_taken_whole(rng):
+    index, weights = stratified_sample(_strata(rng)[:300], 1_000)
+    np.testing.assert_array_equal(index, np.arange(300))
+    np.testing.assert_array_equal(weights, 1.0)
+
+
+@pytest.fixture(scope="module")
+def explainer(pickles):
+    return build_explainer(pickles[0])
+
+
+def test_whole_upload_has_no_error_bound(explainer, pickles, rng):
+    X      = rng.normal(size=(200, len(pickles[4])))       # already in scaled space
+    strata = rng.integers(0, 3, len(X))
+    index, weights = stratified_sample(strata, 1_000)
+    done = []
+    summary = ShapSummary.compute(explainer, X[index], X[index], weights, strata[index], pickles[4], chunksize=64,
+                                  on_progress=lambda n, _: done.append(n))
+    assert done == [64, 128, 192, 200]
+    assert summary.exact and summary.population == summary.sample_size == 200
+    np.testing.assert_array_equal(summary.error_bound, 0.0)
+    np.testing.assert_allclose(summary.mean_abs, np.abs(shap_matrix(explainer, X)).mean(axis=0), rtol=1e-6)
+
+
+def test_sampled_summary_has_a_bound(explainer, pickles, rng):
+    X      = rng.normal(size=(2_000, len(pickles[4])))
+    strata = rng.integers(0, 3, len(X))
+    index, weights = stratified_sample(strata, 300)
+    summary = ShapSummary.compute(explainer, X[index], X[index], weights, strata[index], pickles[4])
+    assert not summary.exact and summary.population == 2_000
+    full = np.abs(shap_matrix(explainer, X)).mean(axis=0)
+    assert (summary.error_bound > 0).all()
+    # Loose check: every feature's estimate is within a few bounds of the truth.
+    assert (np.abs(summary.mean_abs - full) <= 3 * summary.error_bound + 1e-9).all()
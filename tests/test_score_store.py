@@ -0,0 +1,129 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from attrition.columnar import TableWriter, read_rows
+from attrition.score_store import DuplicateKeysError, ScoreStore, feature_hash
+from attrition.scoring import (
+    HISTORY_COLUMNS, Thresholds, apply_thresholds, input_columns, read_chunks, result_columns, score_stream,
+)
+
+
+def _roster(names, rng):
+    n = len(names)
+    return pd.DataFrame({
+        "nama_karyawan"        : names,
+        "satisfaction_level"   : rng.uniform(0.1, 1.0, n).round(2),
+        "last_evaluation"      : rng.uniform(0.4, 1.0, n).round(2),
+        "number_project"       : rng.integers(2, 8, n),
+        "average_montly_hours" : rng.integers(100, 300, n),
+        "time_spend_company"   : rng.integers(2, 10, n),
+        "salary"               : rng.choice(["low", "medium", "high"], n),
+        "Work_accident"        : rng.integers(0, 2, n),
+        "promotion_last_5years": rng.integers(0, 2, n),
+    })
+
+
+def _score(bundle, df, store, chunksize=50_000):
+    out = io.StringIO()
+    summary = score_stream(
+        read_chunks(io.BytesIO(df.to_csv(index=False).encode()), "roster.csv", chunksize,
+                    columns=input_columns(bundle.final_columns)),
+        bundle.scoring_model, bundle.input_scaler, bundle.final_columns, out, store=store)
+    out.seek(0)
+    return summary, pd.read_csv(out)
+
+
+def _last_week(path):
+    # Scores written today keep today's earlier baseline; date them back to get a new week.
+    stored = pd.read_parquet(path)
+    stored["scored_on"] = "2000-01-03"
+    stored.to_parquet(path, index=False)
+
+
+def test_reuse_and_history(bundle, tmp_path, rng):
+    df    = _roster([f"E{i}" for i in range(300)], rng)
+    path  = tmp_path / "store.parquet"
+    first, _ = _score(bundle, df, ScoreStore(path, "v1"))
+    assert first.new == 300 and first.reused == 0
+    _last_week(path)
+
+    df.loc[:9, "satisfaction_level"] = 0.05
+    second, result = _score(bundle, df, ScoreStore(path, "v1"))
+    assert second.reused == 290 and second.new == 0
+    assert result[HISTORY_COLUMNS[0]].notna().all()
+
+
+def test_model_version_invalidates(bundle, tmp_path, rng):
+    df   = _roster([f"E{i}" for i in range(50)], rng)
+    path = tmp_path / "store.parquet"
+    _score(bundle, df, ScoreStore(path, "v1"))
+    summary, _ = _score(bundle, df, ScoreStore(path, "v2"))
+    assert summary.reused == 0
+
+
+@pytest.mark.parametrize("chunksize", [50_000, 7])
+def test_duplicate_key_is_rejected_before_recording(bundle, tmp_path, rng, chunksize):
+    # "Budi" twice, in the same chunk or (chunksize 7) in different chunks.
+    names = [f"E{i}" for i in range(20)]
+    names[3] = names[15] = "Budi"
+    path  = tmp_path / "store.parquet"
+    with pytest.raises(DuplicateKeysError) as exc:
+        _score(bundle, _roster(names, rng), ScoreStore(path, "v1"), chunksize)
+    assert exc.value.key == "nama_karyawan" and exc.value.examples == ["Budi"]
+    assert not path.exists()
+
+
+def test_duplicate_name_does_not_take_another_baseline(bundle, tmp_path, rng):
+    path  = tmp_path / "store.parquet"
+    week1 = _roster(["Budi", "Siti", "Andi"], rng)
+    _score(bundle, week1, ScoreStore(path, "v1"))
+    _last_week(path)
+    stored = pd.read_parquet(path).set_index("employee_id")
+
+    # A second "Budi" joins: the upload is refused by the store, which stays as it was.
+    week2 = pd.concat([week1, _roster(["Budi"], rng)], ignore_index=True)
+    with pytest.raises(DuplicateKeysError):
+        _score(bundle, week2, ScoreStore(path, "v1"))
+    pd.testing.assert_frame_equal(pd.read_parquet(path).set_index("employee_id"), stored)
+
+    # Next week without the duplicate: every employee keeps their own baseline.
+    summary, result = _score(bundle, week1, ScoreStore(path, "v1"))
+    assert summary.reused == 3 and summary.new == 0
+    expected = (stored.loc[result["Nama Karyawan"], "proba"].to_numpy() * 100).round(1)
+    np.testing.assert_allclose(result[HISTORY_COLUMNS[0]], expected)
+
+
+def test_apply_thresholds_rebuckets_stored_result(bundle, tmp_path, rng):
+    df   = _roster([f"E{i}" for i in range(400)], rng)
+    path = tmp_path / "store.parquet"
+    _score(bundle, df, ScoreStore(path, "v1"))
+    _last_week(path)
+    df["satisfaction_level"] = rng.uniform(0.1, 1.0, len(df)).round(2)
+
+    result_path = tmp_path / "result.arrow"
+    columns     = result_columns(bundle.final_columns, history=True)
+    with TableWriter(result_path, "arrow", columns) as writer:
+        summary = score_stream(
+            read_chunks(io.BytesIO(df.to_csv(index=False).encode()), "roster.csv", 50_000,
+                        columns=input_columns(bundle.final_columns)),
+            bundle.scoring_model, bundle.input_scaler, bundle.final_columns, writer, store=ScoreStore(path, "v1"))
+    stored_before = pd.read_parquet(path)
+
+    thresholds = Thresholds(0.3, 0.2, 0.5)
+    updated    = apply_thresholds(result_path, summary, thresholds)
+    result     = read_rows(result_path, np.arange(summary.total))
+    probas     = result["Resign Probability (%)"].to_numpy() / 100
+    codes      = thresholds.risk_codes(probas)
+    assert list(result.columns) == columns
+    assert (result["Risk Level"].cat.codes.to_numpy() == codes).all()
+    assert (result["Prediction"].cat.codes.to_numpy() == (probas > 0.3)).all()
+    assert (updated.low_risk, updated.moderate, updated.high_risk) == tuple(np.bincount(codes, minlength=3))
+    assert updated.thresholds == thresholds and summary.thresholds != thresholds
+
+    previous = result[HISTORY_COLUMNS[0]].to_numpy() / 100
+    move     = codes.astype(np.int64) - thresholds.risk_codes(previous)
+    assert (updated.risk_up, updated.risk_down) == ((move > 0).sum(), (move < 0).sum())
+    pd.testing.assert_frame_equal(pd.read_parquet(path), stored_before)
@@ -0,0 +1,100 @@
+import io
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from attrition.columnar import TableWriter, read_rows
+from attrition.explain import build_explainer
+from attrition.scoring import RISK_LABELS, input_columns, read_chunks, result_columns, score_stream
+from attrition.segments import DIMENSIONS, DRIVER_COLUMN, PROBA_COLUMN, SHARE_COLUMNS, build_segments
+
+
+def _upload(rng, n=600):
+    return pd.DataFrame({
+        "satisfaction_level"   : rng.uniform(0.1, 1.0, n).round(2),
+        "last_evaluation"      : rng.uniform(0.4, 1.0, n).round(2),
+        "number_project"       : rng.integers(2, 8, n),
+        "average_montly_hours" : rng.integers(100, 300, n),
+        "time_spend_company"   : rng.integers(2, 10, n),
+        "salary"               : rng.choice(["low", "medium", "high"], n),
+        "Work_accident"        : rng.integers(0, 2, n),
+        "promotion_last_5years": rng.integers(0, 2, n),
+    })
+
+
+def _store(bundle, df, path, top_k=0):
+    explainer = build_explainer(bundle.scoring_model) if top_k else None
+    with TableWriter(path, "arrow", result_columns(bundle.final_columns, top_k)) as writer:
+        summary = score_stream(
+            read_chunks(io.BytesIO(df.to_csv(index=False).encode()), "roster.csv", 250,
+                        columns=input_columns(bundle.final_columns)),
+            bundle.scoring_model, bundle.input_scaler, bundle.final_columns, writer,
+            explainer=explainer, top_k=top_k)
+    return read_rows(path, np.arange(summary.total))
+
+
+def _labelled(result):
+    """The stored rows with each dimension's segment label, as the groupby keys."""
+    out = result.copy()
+    for d in DIMENSIONS:
+        out[d.name] = np.asarray(d.labels, dtype=object)[np.digitize(result[d.column].to_numpy(), d.bins)]
+    out[PROBA_COLUMN] = result[PROBA_COLUMN].astype(np.float64)
+    out["_risk"]      = result["Risk Level"].astype(str)
+    return out
+
+
+def _expected(rows, keys):
+    grouped = rows.groupby(keys, sort=False)
+    out     = pd.DataFrame({"Count": grouped.size(),
+                            "Mean Probability (%)": grouped[PROBA_COLUMN].mean().round(1)})
+    shares  = pd.crosstab([rows[k] for k in keys], rows["_risk"], normalize="index") * 100
+    for level, col in zip(RISK_LABELS, SHARE_COLUMNS):
+        out[col] = (shares[level] if level in shares else 0.0).round(1)
+    return out
+
+
+@pytest.fixture(scope="module")
+def stored(bundle, tmp_path_factory):
+    path = tmp_path_factory.mktemp("segments") / "result.arrow"
+    return path, _store(bundle, _upload(np.random.default_rng(3)), path)
+
+
+def test_dimensions_match_groupby(bundle, stored):
+    path, result = stored
+    segments = build_segments(path, bundle.final_columns)
+    rows     = _labelled(result)
+    assert segments.total == len(result)
+    for d in DIMENSIONS:
+        got = segments.view(d.name).set_index("Segment")
+        exp = _expected(rows, [d.name])
+        assert set(got.index) == set(exp.index)
+        pd.testing.assert_frame_equal(got.loc[exp.index, exp.columns], exp, check_names=False, check_dtype=False,
+                                      atol=0.051)
+
+
+def test_pairs_match_groupby(bundle, stored):
+    path, result = stored
+    segments = build_segments(path, bundle.final_columns)
+    rows     = _labelled(result)
+    for a, b in itertools.permutations(DIMENSIONS, 2):
+        exp = _expected(rows, [a.name, b.name])
+        for segment in exp.index.get_level_values(0).unique():
+            got = segments.view(b.name, within=(a.name, segment)).set_index("Segment")
+            want = exp.loc[segment]
+            assert set(got.index) == set(want.index)
+            pd.testing.assert_frame_equal(got.loc[want.index, want.columns], want, check_names=False,
+                                          check_dtype=False, atol=0.051)
+    assert segments.driver_note == "tidak tersedia" and segments.table["Top Driver"].isna().all()
+
+
+def test_driver_is_most_frequent_top_driver(bundle, tmp_path, rng):
+    result   = _store(bundle, _upload(rng, 300), tmp_path / "result.arrow", top_k=1)
+    segments = build_segments(tmp_path / "result.arrow", bundle.final_columns)
+    rows     = _labelled(result)
+    for d in DIMENSIONS:
+        got    = segments.view(d.name).set_index("Segment")["Top Driver"]
+        counts = rows.groupby([d.name, DRIVER_COLUMN], observed=True).size().unstack(fill_value=0)
+        counts = counts[[c for c in bundle.final_columns if c in counts.columns]]     # ties: first feature
+        pd.testing.assert_series_equal(got.loc[counts.index], counts.idxmax(axis=1), check_names=False)
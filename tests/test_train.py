@@ -0,0 +1,69 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from attrition.artifacts import TRAINING_REPORT, load_pickles, open_artifacts
+from attrition.drift import REFERENCE_FILE, DriftSketch
+from attrition.train import FINAL_COLUMNS, TRAIN, VALIDATION, TrainingData, scan_dataset, split, train
+
+
+@pytest.fixture(scope="module")
+def dataset(tmp_path_factory):
+    """A small HR_comma_sep-shaped CSV whose target depends on satisfaction and hours."""
+    rng = np.random.default_rng(7)
+    n   = 3_000
+    df  = pd.DataFrame({
+        "satisfaction_level"   : rng.uniform(0.09, 1.0, n).round(2),
+        "last_evaluation"      : rng.uniform(0.36, 1.0, n).round(2),
+        "number_project"       : rng.integers(2, 8, n),
+        "average_montly_hours" : rng.integers(96, 311, n),
+        "time_spend_company"   : rng.integers(2, 11, n),
+        "Work_accident"        : rng.integers(0, 2, n),
+        "promotion_last_5years": rng.integers(0, 2, n),
+        "Department"           : rng.choice(["sales", "technical", "support"], n),
+        "salary"               : rng.choice(["low", "medium", "high"], n),
+    })
+    risk = 2.5 * (0.5 - df["satisfaction_level"]) + (df["average_montly_hours"] - 200) / 60
+    df.insert(6, "left", (risk + rng.normal(0, 0.5, n) > 0.3).astype(int))
+    df.loc[5, "salary"] = "unknown"          # rejected like an upload
+    path = tmp_path_factory.mktemp("data") / "HR_comma_sep.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+def test_train_writes_loadable_artifacts(dataset, tmp_path):
+    grid   = {"max_depth": [3, 4], "learning_rate": [0.3], "subsample": [1.0], "colsample_bytree": [1.0],
+              "min_child_weight": [1]}
+    report = train(dataset, tmp_path, grid, workers=1, chunksize=700)
+
+    assert report["dataset"]["rows"] == 2_999 and report["dataset"]["rejected"] == 1
+    assert len(report["trials"]) == 2 and report["test_roc_auc"] > 0.8
+    assert {"load", "prepare", "search", "refit", "evaluate", "write", "total"} <= set(report["seconds"])
+    assert json.loads((tmp_path / TRAINING_REPORT).read_text())["test_roc_auc"] == report["test_roc_auc"]
+
+    model, scaler, encoder, feature_imp, final_columns = load_pickles(tmp_path)
+    assert list(final_columns) == FINAL_COLUMNS and len(feature_imp) == len(FINAL_COLUMNS)
+    assert model.get_booster().num_boosted_rounds() == report["n_estimators"]
+    bundle = open_artifacts(tmp_path)
+    X = np.array([[0.1, 0.8, 6, 280, 4, 0, 0, 0], [0.9, 0.6, 3, 150, 3, 2, 0, 1]], dtype=np.float32)
+    np.testing.assert_allclose(bundle.forest.predict_proba(X)[:, 1],
+                               model.predict_proba(scaler.transform(X.astype(np.float64)))[:, 1], atol=1e-6)
+
+    reference = DriftSketch.load(tmp_path / REFERENCE_FILE)
+    assert reference.rows == report["splits"]["train"] + report["splits"]["validation"]
+
+
+def test_batches_cover_the_splits_once(dataset):
+    y, scaler, _ = scan_dataset(dataset, chunksize=500)
+    train_idx, val_idx, test_idx = split(y)
+    part = np.full(len(y), 2, dtype=np.int8)
+    part[train_idx], part[val_idx] = TRAIN, VALIDATION
+    data = TrainingData(dataset, part, scaler.mean_, scaler.scale_, chunksize=500)
+
+    labels = np.concatenate([b[2] for b in data.batches([VALIDATION])])
+    np.testing.assert_array_equal(labels, y[np.sort(val_idx)])
+    matrix = data.matrix([TRAIN])
+    assert matrix.num_row() == len(train_idx) and matrix.num_col() == len(FINAL_COLUMNS)
+    np.testing.assert_array_equal(matrix.get_label(), y[np.sort(train_idx)])
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+from attrition.whatif import DEFAULT_LEVERS, _pick, cheapest_interventions, scenario_targets, score_scenarios
+
+
+def _employees(final_columns, rng, n=40):
+    df = pd.DataFrame({
+        "satisfaction_level"   : rng.uniform(0.1, 1.0, n).round(2),
+        "last_evaluation"      : rng.uniform(0.4, 1.0, n).round(2),
+        "number_project"       : rng.integers(2, 8, n),
+        "average_montly_hours" : rng.integers(100, 300, n),
+        "time_spend_company"   : rng.integers(2, 10, n),
+        "salary"               : rng.integers(0, 3, n),
+        "Work_accident"        : rng.integers(0, 2, n),
+        "promotion_last_5years": rng.integers(0, 2, n),
+    })
+    return df[list(final_columns)].astype(np.float64)
+
+
+def test_every_employee_gets_every_scenario(bundle, rng):
+    df_proc = _employees(bundle.final_columns, rng)
+    n_scen  = np.prod([len(lever.options) + 1 for lever in DEFAULT_LEVERS])
+    assert n_scen == len(scenario_targets()) == 252
+
+    calls = []
+    grid, cost, probas = score_scenarios(df_proc, bundle.scoring_model, bundle.input_scaler, bundle.final_columns,
+                                         max_rows=252 * 15, on_progress=lambda done, _: calls.append(done))
+    assert grid.shape == (len(df_proc), 252, len(bundle.final_columns))
+    assert cost.shape == probas.shape == (len(df_proc), 252)
+    assert calls == [15, 30, 40]
+    # Scenario 0 is no change, at cost 0.
+    np.testing.assert_array_equal(grid[:, 0, :], df_proc.to_numpy())
+    assert not cost[:, 0].any()
+    # Batched scores equal scoring each expanded row on its own.
+    flat = pd.DataFrame(grid[:3].reshape(-1, grid.shape[2]), columns=list(bundle.final_columns))
+    np.testing.assert_allclose(probas[:3].ravel(), bundle.scoring_model.predict_proba(flat.to_numpy())[:, 1])
+
+
+def test_scenarios_never_cut_salary_or_promotion(bundle, rng):
+    df_proc = _employees(bundle.final_columns, rng)
+    columns = list(bundle.final_columns)
+    grid, cost, _ = score_scenarios(df_proc, bundle.scoring_model, bundle.input_scaler, columns)
+    for column in ("salary", "promotion_last_5years"):
+        c = columns.index(column)
+        assert (grid[:, :, c] >= df_proc[column].to_numpy()[:, None]).all()
+    assert (cost >= 0).all()
+
+
+def test_pick_cheapest_below_target_else_lowest_probability():
+    cost   = np.array([[0.0, 1.0, 2.0, 1.0],
+                       [0.0, 1.0, 2.0, 3.0],
+                       [0.0, 1.0, 2.0, 3.0]])
+    probas = np.array([[0.9, 0.3, 0.1, 0.2],      # two at cost 1 reach: the lower probability wins
+                       [0.3, 0.2, 0.1, 0.1],      # already below: no change
+                       [0.9, 0.7, 0.6, 0.8]])     # none reach: lowest probability
+    best, reachable = _pick(cost, probas, 0.4)
+    np.testing.assert_array_equal(best, [3, 0, 2])
+    np.testing.assert_array_equal(reachable, [True, True, False])
+
+
+def test_cheapest_interventions_report(bundle, rng):
+    df_proc = _employees(bundle.final_columns, rng)
+    out     = cheapest_interventions(df_proc, bundle.scoring_model, bundle.input_scaler, bundle.final_columns,
+                                     target=0.4)
+    assert len(out) == len(df_proc)
+    below = out["Current Probability (%)"] < 40
+    assert (out.loc[below, "Cost"] == 0).all()
+    assert (out.loc[out["Reaches Target"], "Scenario Probability (%)"] <= 40).all()
+    assert (out["Scenario Probability (%)"] <= out["Current Probability (%)"]).all()